@@ -0,0 +1,63 @@
+// 자산 데이터 델타 적용기 (scripts/delta.py의 apply_delta와 동일)
+// 사용법:
+//   <script src="delta.js"></script>
+//   const data = await loadAssets();  // {lastUpdated, totalAssets, assets}
+// 직전 데이터를 localStorage에 보관해 두고, 델타의 기준과 같으면 변경분만 받아 적용한다.
+
+const DELTA_FORMAT = 'delta-v1';
+const ASSETS_CACHE_KEY = 'assets-marketcap:assets';
+
+function applyDelta(base, delta) {
+    if (delta.format !== DELTA_FORMAT) throw new Error(`지원하지 않는 포맷: ${delta.format}`);
+    if (delta.base !== base.lastUpdated) throw new Error(`기준 데이터가 다릅니다: ${base.lastUpdated}`);
+
+    const removed = new Set(delta.removed);
+    const assets = new Array(delta.totalAssets).fill(null);
+
+    // 이동/추가된 자산은 ranks 자리에, 나머지는 base 순서대로 빈자리에 배치
+    const stable = [];
+    for (const asset of base.assets) {
+        if (removed.has(asset.id)) continue;
+        const patched = Object.assign({}, asset, delta.changed[asset.id]);
+        for (const key of delta.unset[asset.id] || []) delete patched[key];
+        if (asset.id in delta.ranks) assets[delta.ranks[asset.id] - 1] = patched;
+        else stable.push(patched);
+    }
+    for (const asset of delta.added) assets[delta.ranks[asset.id] - 1] = asset;
+
+    let next = 0;
+    for (let i = 0; i < assets.length; i++) {
+        if (!assets[i]) assets[i] = stable[next++] || null;
+        if (!assets[i]) throw new Error('델타 순위 정보가 올바르지 않습니다');
+    }
+    if (next !== stable.length) throw new Error('델타 순위 정보가 올바르지 않습니다');
+    return { lastUpdated: delta.lastUpdated, totalAssets: assets.length, assets };
+}
+
+async function fetchJson(url) {
+    const response = await fetch(url, { cache: 'no-cache' });
+    if (!response.ok) throw new Error(`${url}: ${response.status}`);
+    return response.json();
+}
+
+async function loadAssets(baseUrl = 'data/') {
+    let data = null;
+    try {
+        const cached = JSON.parse(localStorage.getItem(ASSETS_CACHE_KEY));
+        if (cached) {
+            const delta = await fetchJson(`${baseUrl}assets.delta.json`);
+            if (delta.lastUpdated === cached.lastUpdated) data = cached;
+            else if (delta.base === cached.lastUpdated) data = applyDelta(cached, delta);
+        }
+    } catch (e) {
+        data = null;  // 캐시/델타를 쓸 수 없으면 전체 파일
+    }
+
+    if (!data) data = await fetchJson(`${baseUrl}assets.json`);
+    try {
+        localStorage.setItem(ASSETS_CACHE_KEY, JSON.stringify(data));
+    } catch (e) {
+        // 저장 공간 부족 등은 무시 (다음에 전체 파일을 다시 받음)
+    }
+    return data;
+}
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+수집 → 순위 → 저장 → HTML 생성 파이프라인 벤치마크
+- 합성 데이터(암호화폐 7일 168포인트 스파크라인 포함)로 100 / 1k / 10k / 100k 자산 측정
+- 단계별 실행 시간(여러 번 중 최소값 - 짧은 단계는 합계가 MIN_MEASURE_SECONDS가 될 때까지 반복)과
+  최대 메모리(tracemalloc)
+- 크기마다 고정된 보정 작업을 단계 사이사이에 섞어 재서, 시간은 보정 작업 대비 비율로 기준값과 비교
+  (머신 속도/부하 차이를 상쇄 → CI 러너에서도 저장소의 기준값 사용)
+- 기준값(benchmark_baseline.json)보다 크기별 허용 비율 이상 느려지거나 메모리를 더 쓰면 종료 코드 1
+  (작은 크기는 밀리초 이하 단계가 많아 허용 비율이 크고, 보정 작업 시간의 일정 비율보다 작은 차이는 무시,
+   느려진 크기는 한 번 더 재서 두 번 다 느려야 실패)
+
+사용법:
+  python scripts/benchmark.py                    # 기준값과 비교
+  python scripts/benchmark.py --save-baseline    # 현재 결과를 기준값으로 저장
+  python scripts/benchmark.py --sizes 100 1000   # 일부 크기만
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import ranking
+from fetch_data import normalize_crypto
+from generate_html import generate_html
+from json_stream import write_assets
+from records import Asset, validate
+from sparkline import SPARKLINE_POINTS, downsample_sparklines
+
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+SIZES = (100, 1_000, 10_000, 100_000)
+DEFAULT_THRESHOLD = 0.25  # 25% 이상 나빠지면 실패
+SIZE_THRESHOLDS = {100: 1.0, 1_000: 0.5, 10_000: 0.5}  # 크기별 허용 비율 (짧은 단계는 흔들림이 큼)
+MIN_SECONDS_DELTA = 0.5  # 보정 작업 시간의 이 비율보다 작은 시간 차이(보정 후)는 측정 오차로 봄
+MIN_BYTES_DELTA = 64 * 1024
+MIN_MEASURE_SECONDS = 0.3  # 단계마다 최소 이만큼은 반복 실행 (짧은 단계의 최소값 안정화)
+MAX_REPEATS = 50
+RECHECKS = 1  # 느려진 크기는 다시 재서 두 번 다 느려야 실패 (짧은 부하로 인한 오탐 방지)
+CALIBRATION_VALUES = 5_000
+
+SPARKLINE_RAW_POINTS = 168  # CoinGecko 7일 시간별
+CRYPTO_SHARE = 0.6
+METAL_SHARE = 0.02
+
+
+def synthetic_coins(count, rng):
+    """CoinGecko /coins/markets 형식의 합성 응답 (시가총액 내림차순)"""
+    coins = []
+    for i in range(count):
+        price = 10 ** rng.uniform(-4, 5)
+        sparkline = [price]
+        for _ in range(SPARKLINE_RAW_POINTS - 1):
+            sparkline.append(sparkline[-1] * (1 + rng.gauss(0, 0.01)))
+        coins.append({
+            "id": f"coin-{i}",
+            "name": f"Coin {i}",
+            "symbol": f"c{i}",
+            "current_price": price,
+            "market_cap": price * 10 ** rng.uniform(6, 10),
+            "price_change_percentage_24h": rng.gauss(0, 4),
+            "price_change_percentage_7d_in_currency": rng.gauss(0, 10),
+            "image": f"https://example.com/coins/{i}.png",
+            "sparkline_in_7d": {"price": sparkline},
+        })
+    coins.sort(key=lambda coin: coin["market_cap"], reverse=True)  # order=market_cap_desc
+    return coins
+
+
+def synthetic_others(count, rng):
+    """스파크라인 없는 주식/귀금속 자산 레코드"""
+    assets = []
+    metals = max(1, int(count * METAL_SHARE / (1 - CRYPTO_SHARE)))
+    for i in range(count):
+        change = round(rng.gauss(0, 2), 2)
+        metal = i < metals
+        assets.append(Asset(
+            id=f"metal-{i}" if metal else f"stock-{i}",
+            name=f"금속 {i}" if metal else f"주식 {i}",
+            symbol=f"M{i}" if metal else f"S{i}",
+            price=round(10 ** rng.uniform(0, 4), 2),
+            marketCap=10 ** rng.uniform(9, 13),
+            change24h=change,
+            change7d=round(change * 1.5, 2),
+            type="metal" if metal else "stock",
+            country="-" if metal else rng.choice(["US", "KR", "JP", "TW", "SA", "NL"]),
+        ))
+    return assets
+
+
+def repeats(size):
+    return 9 if size <= 1_000 else 5 if size <= 10_000 else 1
+
+
+def calibration_workload():
+    """머신 속도 보정용 고정 작업 (정렬, 문자열 포맷, dict, JSON - 파이프라인과 비슷한 순수 파이썬 연산)"""
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(CALIBRATION_VALUES)]
+    values.sort()
+    index = {f"{value:.6g}": i for i, value in enumerate(values)}
+    json.dumps(values)
+    return index
+
+
+def peak_memory(func, arg):
+    """func(arg) 한 번 실행의 최대 메모리"""
+    tracemalloc.start()
+    func(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def measure(stages, repeat):
+    """단계별 (실행 시간 최소값, 최대 메모리)와 보정 작업 시간 최소값 - 실행마다 prepare()로 새 입력 준비
+
+    모든 단계와 보정 작업을 한 번씩 돌리는 라운드를 반복한다
+    (몇 초짜리 부하가 한 단계나 보정 작업에만 몰리지 않게 시간상 섞음).
+    단계마다(보정 작업 포함) repeat번 이상, 실행 시간 합이 MIN_MEASURE_SECONDS가 될 때까지
+    (최대 MAX_REPEATS번) 반복한다. 부하는 시간을 늘리기만 하므로 최소값이 중앙값보다 흔들림이 적다.
+    """
+    runs = dict(stages, calibrate=(lambda _: calibration_workload(), lambda: None))
+    times = {stage: [] for stage in runs}
+    while True:
+        pending = [stage for stage, samples in times.items()
+                   if len(samples) < repeat or (sum(samples) < MIN_MEASURE_SECONDS and len(samples) < MAX_REPEATS)]
+        if not pending:
+            break
+        for stage in pending:
+            func, prepare = runs[stage]
+            arg = prepare()
+            start = time.perf_counter()
+            func(arg)
+            times[stage].append(time.perf_counter() - start)
+
+    results = {stage: (min(times[stage]), peak_memory(func, prepare())) for stage, (func, prepare) in stages.items()}
+    return results, min(times["calibrate"])
+
+
+def run_size(size, workdir):
+    """자산 size개 기준 (단계별 측정 결과, 보정 작업 시간)"""
+    rng = random.Random(size)
+    crypto_count = int(size * CRYPTO_SHARE)
+    coins = synthetic_coins(crypto_count, rng)
+    others = synthetic_others(size - crypto_count, rng)
+
+    # 단계별 입력은 앞 단계 결과를 한 번 만들어 두고 재사용
+    crypto = validate(normalize_crypto(coins))
+    streams = [downsample_sparklines([asset.copy() for asset in crypto], SPARKLINE_POINTS), others]
+
+    def rank_all(streams):
+        return ranking.rank([ranking.presorted(stream) for stream in streams], top_n=size, top_per_type=size)[0]
+
+    assets = rank_all(streams)
+    data_path = workdir / "assets.json"
+    last_updated = datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat()
+
+    def serialize(data):
+        write_assets(data_path, last_updated, data)
+
+    serialize(assets)
+
+    def render(_):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_html(force=True, data_path=data_path, output_path=workdir / "index.html", logo_sprite=False)
+
+    results, calibration = measure({
+        "normalize": (lambda coins: validate(normalize_crypto(coins)), lambda: coins),
+        "downsample": (lambda assets: downsample_sparklines(assets, SPARKLINE_POINTS),
+                       lambda: [asset.copy() for asset in crypto]),
+        "rank": (rank_all, lambda: streams),
+        "serialize": (serialize, lambda: assets),
+        "render": (render, lambda: None),
+    }, repeats(size))
+    stages = {stage: {"seconds": seconds, "peakBytes": peak} for stage, (seconds, peak) in results.items()}
+    return stages, calibration
+
+
+def threshold_for(size, threshold=None):
+    """크기별 허용 비율 (threshold를 주면 모든 크기에 그 값)"""
+    if threshold is not None:
+        return threshold
+    return SIZE_THRESHOLDS.get(int(size), DEFAULT_THRESHOLD)
+
+
+def speed_factor(size, calibration, base_calibration):
+    """이번 머신 시간을 기준값 머신 시간으로 바꾸는 배율 (보정 값이 없으면 1)"""
+    current, base = calibration.get(size), base_calibration.get(size)
+    return base / current if current and base else 1.0
+
+
+def compare(results, baseline, calibration, base_calibration, threshold=None):
+    """기준값보다 나빠진 항목 목록 (시간은 보정 작업 대비로 환산해 비교)"""
+    regressions = []
+    for size, stages in results.items():
+        factor = speed_factor(size, calibration, base_calibration)
+        allowed = threshold_for(size, threshold)
+        # 시간 차이 하한은 기준 머신의 보정 작업 시간에 비례 (보정 값이 없으면 2ms)
+        min_seconds = MIN_SECONDS_DELTA * base_calibration.get(size, 0.004)
+        for stage, current in stages.items():
+            base = baseline.get(size, {}).get(stage)
+            if base is None:
+                continue
+            for metric, min_delta, scale in (("seconds", min_seconds, factor), ("peakBytes", MIN_BYTES_DELTA, 1)):
+                value = current[metric] * scale
+                if value > base[metric] * (1 + allowed) and value - base[metric] > min_delta:
+                    regressions.append((size, stage, metric, base[metric], value))
+    return regressions
+
+
+def format_row(size, stage, result, base=None, factor=1.0):
+    seconds = f"{result['seconds'] * 1000:>10.2f}ms"
+    peak = f"{result['peakBytes'] / 1024 / 1024:>9.1f}MB"
+    if base:
+        ratio = result["seconds"] * factor / base["seconds"] if base["seconds"] else 1
+        return f"  {size:>8} {stage:<11} {seconds} {peak}  (기준 대비 {ratio:.2f}x)"
+    return f"  {size:>8} {stage:<11} {seconds} {peak}"
+
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="파이프라인 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="자산 개수 목록")
+    parser.add_argument("--threshold", type=float,
+                        help="허용하는 성능 저하 비율 (0.25 = 25%%, 기본은 크기별: 100개 100%%, 1k/10k 50%%, 그 이상 25%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="기준값 파일")
+    parser.add_argument("--save-baseline", action="store_true", help="현재 결과를 기준값으로 저장")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """벤치마크 실행 (성능 저하가 있으면 1 반환)"""
+    args = parse_args(argv)
+    baseline, base_calibration = {}, {}
+    if args.baseline.exists():
+        doc = json.loads(args.baseline.read_text(encoding="utf-8"))
+        baseline, base_calibration = doc["results"], doc.get("calibration", {})
+
+    print(f"⏱️ 파이프라인 벤치마크 (Python {platform.python_version()}, {platform.machine()})")
+    results = {}
+    calibration = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            key = str(size)
+            results[key], calibration[key] = run_size(size, Path(tmp))
+            factor = speed_factor(key, calibration, base_calibration)
+            print(f"  {size:>8} {'calibrate':<11} {calibration[key] * 1000:>10.2f}ms"
+                  + (f"  (기준 머신 대비 {1 / factor:.2f}x)" if factor != 1.0 else ""))
+            for stage, result in results[key].items():
+                print(format_row(size, stage, result, baseline.get(key, {}).get(stage), factor))
+
+    if args.save_baseline:
+        merged = dict(baseline, **results)
+        merged_calibration = dict(base_calibration, **calibration)
+        doc = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "calibration": {key: merged_calibration[key] for key in sorted(merged_calibration, key=int)},
+            "results": {key: merged[key] for key in sorted(merged, key=int)},
+        }
+        args.baseline.write_text(json.dumps(doc, indent=2) + "\n", encoding="utf-8")
+        print(f"💾 기준값 저장: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, calibration, base_calibration, args.threshold)
+    for _ in range(RECHECKS):
+        if not regressions:
+            break
+        with tempfile.TemporaryDirectory() as tmp:
+            for key in sorted({size for size, *_ in regressions}, key=int):
+                print(f"🔁 {key}개 다시 측정")
+                stages, again = run_size(int(key), Path(tmp))
+                for stage, result in stages.items():
+                    best = results[key][stage]
+                    # 시간과 보정 값은 함께 골라야 비율이 맞으므로 보정 후 시간이 작은 쪽을 택함
+                    if result["seconds"] / again < best["seconds"] / calibration[key]:
+                        best["seconds"] = result["seconds"] * calibration[key] / again
+                    best["peakBytes"] = min(best["peakBytes"], result["peakBytes"])
+        regressions = compare(results, baseline, calibration, base_calibration, args.threshold)
+    for size, stage, metric, base, current in regressions:
+        print(f"❌ {size}개 {stage} {metric}: {base:.6g} → {current:.6g}")
+    if regressions:
+        return 1
+    print("✅ 기준값 대비 성능 저하 없음" if baseline else "ℹ️ 기준값 없음 (--save-baseline으로 저장)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
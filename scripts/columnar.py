@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+컬럼형(columnar) 데이터 포맷
+- 필드마다 배열 하나, type/country는 사전 인코딩
+- 스파크라인은 Float32 버퍼 하나(base64) + 오프셋 배열로 압축 (sparkline=False면 넣지 않음 - 페이지 임베드용)
+- .gz / .br 사전 압축 파일 생성
+- 직접 실행하면 기존 포맷과 크기/파싱 시간 비교
+"""
+
+import base64
+import gzip
+import json
+import sys
+import time
+from array import array
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # brotli는 선택 사항
+    brotli = None
+
+FORMAT = "columnar-v1"
+DICT_FIELDS = ("type", "country")
+SPARKLINE_FIELD = "sparkline"
+
+
+def _pack_float32(values):
+    """float 목록을 리틀 엔디언 Float32 바이트로 변환 (브라우저 TypedArray와 동일)"""
+    buffer = array("f", values)
+    if sys.byteorder == "big":
+        buffer.byteswap()
+    return buffer.tobytes()
+
+
+def _unpack_float32(data):
+    buffer = array("f")
+    buffer.frombytes(data)
+    if sys.byteorder == "big":
+        buffer.byteswap()
+    return buffer
+
+
+def to_columnar(data, sparkline=True):
+    """{lastUpdated, totalAssets, assets: [...]} → 컬럼형 문서 (sparkline=False면 스파크라인 버퍼 없이)"""
+    assets = data["assets"]
+
+    fields = []
+    for asset in assets:
+        for key in asset:
+            if key not in fields and key != SPARKLINE_FIELD:
+                fields.append(key)
+
+    columns = {}
+    dictionaries = {}
+    for field in fields:
+        values = [asset.get(field) for asset in assets]
+        if field in DICT_FIELDS:
+            dictionary = list(dict.fromkeys(values))
+            codes = {value: i for i, value in enumerate(dictionary)}
+            dictionaries[field] = dictionary
+            values = [codes[value] for value in values]
+        columns[field] = values
+
+    doc = {
+        "format": FORMAT,
+        "lastUpdated": data["lastUpdated"],
+        "totalAssets": len(assets),
+        "fields": fields,
+        "columns": columns,
+        "dictionaries": dictionaries,
+    }
+    if sparkline:
+        offsets = [0]
+        flat = []
+        for asset in assets:
+            flat.extend(asset.get(SPARKLINE_FIELD) or [])
+            offsets.append(len(flat))
+        doc[SPARKLINE_FIELD] = {
+            "offsets": offsets,
+            "float32": base64.b64encode(_pack_float32(flat)).decode("ascii"),
+        }
+    return doc
+
+
+def from_columnar(doc):
+    """컬럼형 문서 → 기존 포맷 (스파크라인은 Float32 정밀도)"""
+    if doc.get("format") != FORMAT:
+        raise ValueError(f"지원하지 않는 포맷: {doc.get('format')}")
+
+    columns = doc["columns"]
+    dictionaries = doc["dictionaries"]
+    sparkline = doc.get(SPARKLINE_FIELD)
+    if sparkline:
+        offsets = sparkline["offsets"]
+        flat = _unpack_float32(base64.b64decode(sparkline["float32"]))
+
+    assets = []
+    for i in range(doc["totalAssets"]):
+        asset = {}
+        for field in doc["fields"]:
+            value = columns[field][i]
+            if field in dictionaries:
+                value = dictionaries[field][value]
+            if value is not None:
+                asset[field] = value
+        if sparkline:
+            asset[SPARKLINE_FIELD] = flat[offsets[i]:offsets[i + 1]].tolist()
+        assets.append(asset)
+
+    return {"lastUpdated": doc["lastUpdated"], "totalAssets": len(assets), "assets": assets}
+
+
+def dumps_columnar(data, sparkline=True):
+    """컬럼형 JSON 문자열 (공백 없이)"""
+    return json.dumps(to_columnar(data, sparkline), ensure_ascii=False, separators=(",", ":"))
+
+
+def write_precompressed(path):
+    """파일 옆에 .gz (및 brotli가 있으면 .br) 사전 압축본 생성"""
+    path = Path(path)
+    raw = path.read_bytes()
+    written = [path.with_name(path.name + ".gz")]
+    # mtime=0으로 고정해 같은 입력이면 같은 결과
+    written[0].write_bytes(gzip.compress(raw, compresslevel=9, mtime=0))
+    if brotli is not None:
+        br_path = path.with_name(path.name + ".br")
+        br_path.write_bytes(brotli.compress(raw, quality=11))
+        written.append(br_path)
+    return written
+
+
+def write_columnar(data, path):
+    """컬럼형 파일과 사전 압축본 저장"""
+    path = Path(path)
+    path.write_text(dumps_columnar(data), encoding="utf-8")
+    return [path] + write_precompressed(path)
+
+
+def load_columnar(path):
+    """컬럼형 파일 읽기 헬퍼 (.gz도 지원)"""
+    path = Path(path)
+    raw = path.read_bytes()
+    if path.suffix == ".gz":
+        raw = gzip.decompress(raw)
+    return from_columnar(json.loads(raw))
+
+
+def _best_of(func, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(data):
+    """기존 포맷 vs 컬럼형: 크기(원본/gzip/brotli)와 파싱 시간"""
+    verbose = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    compact = dumps_columnar(data).encode("utf-8")
+
+    rows = []
+    for label, raw, parse in [
+        ("기존 (indent=2)", verbose, lambda: json.loads(verbose)),
+        ("컬럼형", compact, lambda: from_columnar(json.loads(compact))),
+    ]:
+        row = {
+            "format": label,
+            "bytes": len(raw),
+            "gzip": len(gzip.compress(raw, compresslevel=9, mtime=0)),
+            "brotli": len(brotli.compress(raw, quality=11)) if brotli else None,
+            "parseMs": _best_of(parse) * 1000,
+        }
+        rows.append(row)
+    return rows
+
+
+def main():
+    """data/assets.json 기준 포맷 비교 출력"""
+    data_path = Path(__file__).parent.parent / "data" / "assets.json"
+    with open(data_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    print(f"📊 포맷 비교 ({data['totalAssets']}개 자산)")
+    print(f"  {'포맷':<16} {'원본':>10} {'gzip':>10} {'brotli':>10} {'파싱':>10}")
+    for row in compare(data):
+        br = f"{row['brotli']:,}" if row["brotli"] is not None else "-"
+        print(f"  {row['format']:<16} {row['bytes']:>10,} {row['gzip']:>10,} {br:>10} {row['parseMs']:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+실행 마감 시간 / 소스별 예산 / 서킷 브레이커
+- 전체 실행 마감(--deadline)에서 마무리(순위, 히스토리, 저장) 몫을 뺀 구간을 수집에 쓰고, 소스마다 비율만큼 예산 부여
+- 예산은 소스를 실행하는 스레드에 걸리고, http_client가 rate limit 대기, 백오프, Retry-After, 요청 타임아웃을
+  남은 시간 안으로 자름 (남은 시간으로 부족하면 DeadlineExceeded → 소스 실패, 마지막 정상 값 사용)
+- 요청 타임아웃은 소켓 읽기마다 걸리므로 (조금씩 보내는 서버는 넘을 수 있음) 수집 구간이 끝나면
+  fetch_data.run_sources가 끝나지 않은 소스를 기다리지 않고 실패로 처리 (마지막 정상 값 사용)
+- 서킷 브레이커: 연속 FAILURE_THRESHOLD회 실행에서 실패한 소스는 열림 상태 → 재시도 없이 짧은 타임아웃의
+  탐색 요청 1회만 보내고, 성공하면 닫혀 나머지 요청은 평소대로 진행
+- 브레이커 상태는 data/.cache/circuit_breakers.json에 저장 (실행 간 유지)
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import metrics
+
+DEFAULT_DEADLINE = 240  # 전체 실행 마감 (초)
+FINISH_RESERVE = 0.2  # 마감 중 수집 뒤 처리/저장 몫
+FAILURE_THRESHOLD = 3  # 이 횟수만큼 연속 실패하면 브레이커 열림
+PROBE_TIMEOUT = 5.0  # 탐색 요청 타임아웃 (초)
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    """예산 안에 요청을 끝낼 수 없음"""
+
+
+class CircuitOpen(DeadlineExceeded):
+    """브레이커 탐색 요청이 실패해 이번 실행에서 더 요청하지 않음"""
+
+
+class Budget:
+    """소스 하나의 시간 예산 (스레드 간 공유 가능)
+
+    probe=True면 첫 요청이 탐색 요청: 재시도 없이 PROBE_TIMEOUT 안에 끝나야 하고,
+    탐색 중에 시작한 다른 요청은 결과를 기다렸다가 실패했으면 CircuitOpen.
+    """
+
+    def __init__(self, name, seconds, probe=False):
+        self.name = name
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.successes = 0
+        self.failures = 0
+        self._state = "probe" if probe else "closed"  # probe → probing → closed | open
+        self._probed = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def probe(self):
+        return self._state != "closed"
+
+    @property
+    def failed(self):
+        """이번 실행에서 실패한 요청이 있었는지 (요청이 없었으면 None)"""
+        if not self.successes and not self.failures:
+            return None
+        return self.failures > 0
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self, wait=0.0):
+        """wait초 기다린 뒤에도 요청할 시간이 남는지 (아니면 DeadlineExceeded)"""
+        if wait >= self.remaining():
+            metrics.count("deadlineExceeded")
+            raise DeadlineExceeded(f"{self.name} 예산 {self.seconds:.0f}초 초과 (남은 {self.remaining():.1f}초, 필요 {wait:.1f}초)")
+
+    def timeout(self, timeout):
+        """요청 타임아웃을 남은 시간 안으로 (연결 + 읽기 합이 남은 시간을 넘지 않도록 절반씩)"""
+        self.check()
+        limit = self.remaining() / 2
+        if self.probe:
+            limit = min(limit, PROBE_TIMEOUT / 2)
+        return (min(timeout, limit), min(timeout, limit))
+
+    def start(self):
+        """요청 하나 시작 → 탐색 요청이면 True (재시도 없음)"""
+        with self._lock:
+            if self._state == "probe":
+                self._state = "probing"
+                return True
+            waiting = self._state == "probing"
+        if waiting:
+            self._probed.wait(self.remaining())
+        if self._state != "closed":
+            raise CircuitOpen(f"{self.name} 서킷 브레이커 열림 - 탐색 요청 실패")
+        return False
+
+    def finish(self, ok, probe=False):
+        """요청 결과 기록 (탐색 요청이 성공하면 닫힘)"""
+        with self._lock:
+            if ok:
+                self.successes += 1
+            else:
+                self.failures += 1
+            if probe:
+                self._state = "closed" if ok else "open"
+                self._probed.set()
+
+
+def current():
+    """현재 스레드의 예산 (없으면 None)"""
+    return getattr(_local, "budget", None)
+
+
+@contextmanager
+def scope(budget):
+    """이 블록(현재 스레드)의 요청에 budget 적용"""
+    previous = current()
+    _local.budget = budget
+    try:
+        yield budget
+    finally:
+        _local.budget = previous
+
+
+def bind(func):
+    """현재 스레드의 예산을 다른 스레드(스레드 풀 작업)에서도 쓰도록 func 감싸기"""
+    budget = current()
+
+    def run(*args, **kwargs):
+        with scope(budget):
+            return func(*args, **kwargs)
+
+    return run
+
+
+class RunDeadline:
+    """전체 실행 마감 (수집 구간 = 마감 - 마무리 몫)"""
+
+    def __init__(self, seconds=DEFAULT_DEADLINE, reserve=FINISH_RESERVE):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.fetch_window = seconds * (1 - reserve)
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def fetch_remaining(self):
+        """수집 구간에 남은 시간"""
+        return max(0.0, self.fetch_window - self.elapsed())
+
+    def source_seconds(self, share):
+        """수집 구간의 share 비율 (순차 실행이면 수집 구간에 남은 시간까지만)"""
+        return max(0.0, min(self.fetch_window * share, self.fetch_window - self.elapsed()))
+
+
+class CircuitBreakers:
+    """소스별 연속 실패 기록 (JSON 파일)
+
+    {소스: {"failures": 연속 실패 횟수, "lastFailure": 시각, "lastSuccess": 시각}}
+    """
+
+    def __init__(self, path, threshold=FAILURE_THRESHOLD):
+        self.path = Path(path)
+        self.threshold = threshold
+        try:
+            self.sources = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.sources = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, name):
+        return self.sources.get(name, {}).get("failures", 0) >= self.threshold
+
+    def run(self, name, seconds, func):
+        """예산 seconds초(브레이커가 열려 있으면 탐색 모드)로 func 실행 후 결과 기록"""
+        budget = Budget(name, seconds, probe=self.is_open(name))
+        if budget.probe:
+            failures = self.sources[name]["failures"]
+            print(f"🔌 {name} 서킷 브레이커 열림 (연속 {failures}회 실패) - 탐색 요청 1회만 시도")
+        with scope(budget):
+            try:
+                return func()
+            finally:
+                self.record(budget)
+
+    def record(self, budget, now=None):
+        """실패한 요청이 있었으면 연속 실패 +1, 요청이 모두 성공했으면 0으로 (요청이 없었으면 그대로)"""
+        failed = budget.failed
+        if failed is None:
+            return
+        now = now if now is not None else time.time()
+        with self._lock:
+            entry = self.sources.setdefault(budget.name, {"failures": 0})
+            was_open = entry["failures"] >= self.threshold
+            if failed:
+                entry["failures"] += 1
+                entry["lastFailure"] = now
+                if not was_open and entry["failures"] >= self.threshold:
+                    print(f"🔌 {budget.name} 연속 {entry['failures']}회 실패 - 다음 실행부터 탐색 요청만 시도")
+            else:
+                entry["failures"] = 0
+                entry["lastSuccess"] = now
+                if was_open:
+                    print(f"🔌 {budget.name} 탐색 요청 성공 - 서킷 브레이커 닫힘")
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with self._lock:
+            data = json.dumps(self.sources, separators=(",", ":"))
+        tmp_path.write_text(data, encoding="utf-8")
+        tmp_path.replace(self.path)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+델타(변경분) 포맷
+- 직전 실행 결과(base)와 비교해 자산별 바뀐 필드, 순위 이동, 추가/삭제 자산만 기록
+- 순위는 base 순서를 벗어난 자산만 기록 (나머지는 base 순서대로 빈자리를 채움)
+- base의 lastUpdated가 같을 때만 적용 가능 (다르면 전체 파일을 받아야 함)
+- 브라우저용 적용기는 저장소 루트의 delta.js
+- 직접 실행하면 data/assets.delta.json 요약 출력
+"""
+
+import json
+from pathlib import Path
+
+FORMAT = "delta-v1"
+
+
+def _stable_ids(ids, base_positions):
+    """base 순서를 유지한 가장 긴 자산 부분 수열 (LIS) - 이 자산들은 순위를 기록하지 않음"""
+    tails = []  # 길이별 마지막 원소의 (base 위치, ids 인덱스)
+    previous = [None] * len(ids)
+    for i, asset_id in enumerate(ids):
+        position = base_positions[asset_id]
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tails[mid][0] < position:
+                lo = mid + 1
+            else:
+                hi = mid
+        previous[i] = tails[lo - 1][1] if lo else None
+        if lo == len(tails):
+            tails.append((position, i))
+        else:
+            tails[lo] = (position, i)
+
+    stable = set()
+    i = tails[-1][1] if tails else None
+    while i is not None:
+        stable.add(ids[i])
+        i = previous[i]
+    return stable
+
+
+def diff(base, current):
+    """{lastUpdated, totalAssets, assets} 두 개 → 델타 문서"""
+    base_assets = {asset["id"]: asset for asset in base["assets"]}
+    base_positions = {asset["id"]: i for i, asset in enumerate(base["assets"])}
+    current_ids = {asset["id"] for asset in current["assets"]}
+    kept_ids = [asset["id"] for asset in current["assets"] if asset["id"] in base_assets]
+    stable = _stable_ids(kept_ids, base_positions)
+
+    changed = {}
+    unset = {}
+    added = []
+    ranks = {}
+    for rank, asset in enumerate(current["assets"], 1):
+        old = base_assets.get(asset["id"])
+        if old is None:
+            added.append(asset)
+            ranks[asset["id"]] = rank
+            continue
+
+        fields = {key: value for key, value in asset.items() if key not in old or old[key] != value}
+        if fields:
+            changed[asset["id"]] = fields
+        missing = [key for key in old if key not in asset]
+        if missing:
+            unset[asset["id"]] = missing
+        if asset["id"] not in stable:
+            ranks[asset["id"]] = rank
+
+    return {
+        "format": FORMAT,
+        "base": base["lastUpdated"],
+        "lastUpdated": current["lastUpdated"],
+        "totalAssets": len(current["assets"]),
+        "changed": changed,
+        "unset": unset,
+        "added": added,
+        "removed": [asset_id for asset_id in base_assets if asset_id not in current_ids],
+        "ranks": ranks,
+    }
+
+
+def apply_delta(base, delta):
+    """base에 델타를 적용한 새 문서 반환 (base는 수정하지 않음)"""
+    if delta.get("format") != FORMAT:
+        raise ValueError(f"지원하지 않는 포맷: {delta.get('format')}")
+    if delta["base"] != base["lastUpdated"]:
+        raise ValueError(f"기준 데이터가 다릅니다: {base['lastUpdated']} (델타 기준 {delta['base']})")
+
+    removed = set(delta["removed"])
+    ranks = delta["ranks"]
+    assets = [None] * delta["totalAssets"]
+
+    # 이동/추가된 자산은 ranks 자리에, 나머지는 base 순서대로 빈자리에 배치
+    stable = []
+    for asset in base["assets"]:
+        asset_id = asset["id"]
+        if asset_id in removed:
+            continue
+        asset = dict(asset, **delta["changed"].get(asset_id, {}))
+        for key in delta["unset"].get(asset_id, []):
+            asset.pop(key, None)
+        if asset_id in ranks:
+            assets[ranks[asset_id] - 1] = asset
+        else:
+            stable.append(asset)
+    for asset in delta["added"]:
+        assets[ranks[asset["id"]] - 1] = asset
+
+    stable = iter(stable)
+    for i, asset in enumerate(assets):
+        if asset is None:
+            assets[i] = next(stable, None)
+
+    if any(asset is None for asset in assets) or next(stable, None) is not None:
+        raise ValueError("델타 순위 정보가 올바르지 않습니다")
+    return {"lastUpdated": delta["lastUpdated"], "totalAssets": len(assets), "assets": assets}
+
+
+def dumps_delta(delta):
+    """델타 JSON 문자열 (공백 없이)"""
+    return json.dumps(delta, ensure_ascii=False, separators=(",", ":"))
+
+
+def write_delta(base_path, current, path):
+    """base_path의 직전 결과와 비교해 델타 저장, 델타 크기 반환 (직전 결과가 없으면 None)"""
+    path = Path(path)
+    try:
+        with open(base_path, "r", encoding="utf-8") as f:
+            base = json.load(f)
+    except (OSError, ValueError):
+        path.unlink(missing_ok=True)  # 적용할 수 없는 델타를 남기지 않음
+        return None
+
+    text = dumps_delta(diff(base, current))
+    path.write_text(text, encoding="utf-8")
+    return len(text.encode("utf-8"))
+
+
+def main():
+    """data/assets.delta.json 요약 출력"""
+    data_dir = Path(__file__).parent.parent / "data"
+    with open(data_dir / "assets.delta.json", "r", encoding="utf-8") as f:
+        delta = json.load(f)
+
+    print(f"📦 {delta['base']} → {delta['lastUpdated']}")
+    print(f"  변경 {len(delta['changed'])}개, 추가 {len(delta['added'])}개, "
+          f"삭제 {len(delta['removed'])}개, 순위 이동 {len(delta['ranks']) - len(delta['added'])}개")
+
+
+if __name__ == "__main__":
+    main()
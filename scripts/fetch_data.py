@@ -2,15 +2,35 @@
 """
 시가총액 데이터 수집 스크립트
 - 암호화폐: CoinGecko API (무료)
-- 주식: FMP API (무료 티어) 또는 하드코딩
+- 주식: FMP API (무료 티어), API 키가 없으면 마지막으로 공개한 시세 (asOf 표시)
 - 귀금속: 가격 API + 공급량 계산
 """
 
+import argparse
 import json
-import requests
+import math
+import os
+import shutil
+import sys
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-import time
+
+import deadline
+import history
+import fmp_batch
+import http_client
+import last_known
+import metrics
+import ranking
+import rolling
+from columnar import write_columnar
+from delta import write_delta
+from http_cache import ENDPOINT_TTLS, ResponseCache
+from json_stream import AssetWriter, write_assets
+from records import Asset, validate
+from sparkline import SPARKLINE_POINTS, downsample_sparklines
 
 # ============================================
 # 상수 정의
@@ -21,8 +41,22 @@ GOLD_TONNES = 216265  # World Gold Council 2025
 SILVER_TONNES = 1751000  # CPM Group Silver Yearbook
 TROY_OZ_PER_TONNE = 32150.7
 
-# API 엔드포인트
-COINGECKO_API = "https://api.coingecko.com/api/v3"
+# 귀금속 1온스 페깅 토큰 (CoinGecko /simple/price)
+METAL_COINS = {
+    "gold": "tether-gold",  # XAUT
+    "silver": "kinesis-silver",  # KAG
+}
+
+# API 엔드포인트 (환경 변수로 바꿀 수 있음 - 예: scripts/mock_api.py 대역 서버)
+COINGECKO_API = os.environ.get("COINGECKO_API", "https://api.coingecko.com/api/v3")
+FMP_API = os.environ.get("FMP_API", "https://financialmodelingprep.com/api/v3")
+
+# 캐시/진행 상태 저장 위치 (커밋하지 않음)
+CACHE_DIR = Path(__file__).parent.parent / "data" / ".cache"
+
+# CoinGecko 페이지 수집
+CRYPTO_PAGE_SIZE = 250  # /coins/markets per_page 최대값
+PAGE_PROGRESS_MAX_AGE = ENDPOINT_TTLS["/coins/markets"]  # 이보다 오래된 페이지는 이어받지 않고 다시 수집 (초)
 
 # 주요 주식 목록 (심볼, 이름, 국가)
 TOP_STOCKS = [
@@ -54,42 +88,166 @@ TOP_STOCKS = [
     ("AVGO", "Broadcom", "🇺🇸 미국", "https://logo.clearbit.com/broadcom.com"),
     ("NVO", "Novo Nordisk", "🇩🇰 덴마크", "https://logo.clearbit.com/novonordisk.com"),
 ]
+STOCK_INFO = {s[0]: s for s in TOP_STOCKS}
 
+# 기존 자산 ID 유지 (히스토리/델타 연속성)
+STOCK_IDS = {
+    "005930.KS": "samsung",
+    "000660.KS": "skhynix",
+}
 
-def fetch_crypto_data(limit=50):
-    """CoinGecko에서 암호화폐 데이터 가져오기"""
-    print(f"📡 암호화폐 데이터 수집 중... (상위 {limit}개)")
-    
+# FMP 일일 호출 수 / 심볼별 마지막 시세 장부
+FMP_LEDGER_PATH = CACHE_DIR / "fmp_ledger.json"
+
+# 결과 파일
+OUTPUT_PATH = Path(__file__).parent.parent / "data" / "assets.json"
+
+# 자산별 마지막 정상 값 (소스 실패 시 사용)
+LAST_KNOWN_PATH = CACHE_DIR / "last_known_good.json"
+
+# 소스별 서킷 브레이커 상태 / 수집 구간 중 소스별 예산 비율 (소스는 동시에 실행되므로 합이 1을 넘어도 됨)
+BREAKER_PATH = CACHE_DIR / "circuit_breakers.json"
+SOURCE_SHARES = {
+    "metals": 0.25,
+    "crypto": 1.0,
+    "stocks": 0.5,
+}
+SOURCE_TYPES = {"metals": "metal", "crypto": "crypto", "stocks": "stock"}  # 소스 이름 → 자산 유형
+
+
+def _load_page_progress(progress_dir, key, now=None):
+    """중단된 페이지 수집 기록 불러오기 → ({페이지: 코인 목록}, {페이지: 받은 시각})
+
+    조건이 다르면 전부 폐기하고, PAGE_PROGRESS_MAX_AGE보다 오래된 페이지는 다시 받도록 뺀다
+    (그 사이 순위가 바뀐 코인이 페이지 경계에서 빠지거나 겹치지 않도록).
+    """
+    now = now if now is not None else time.time()
     try:
-        url = f"{COINGECKO_API}/coins/markets"
+        manifest = json.loads((progress_dir / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}, {}
+    
+    if manifest.get("key") != key or not isinstance(manifest.get("pages"), dict):
+        shutil.rmtree(progress_dir, ignore_errors=True)
+        return {}, {}
+    
+    pages, fetched_at = {}, {}
+    for page, fetched in manifest["pages"].items():
+        if now - fetched > PAGE_PROGRESS_MAX_AGE:
+            continue
+        try:
+            pages[int(page)] = json.loads((progress_dir / f"page_{page}.json").read_text(encoding="utf-8"))
+            fetched_at[int(page)] = fetched
+        except (OSError, ValueError):
+            pass
+    return pages, fetched_at
+
+
+def _save_page_progress(progress_dir, key, fetched_at, pages, page):
+    """수집한 페이지 기록 (manifest는 임시 파일 후 교체로 원자적으로 갱신)"""
+    progress_dir.mkdir(parents=True, exist_ok=True)
+    (progress_dir / f"page_{page}.json").write_text(json.dumps(pages[page]), encoding="utf-8")
+    manifest_path = progress_dir / "manifest.json"
+    tmp_path = manifest_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"key": key, "pages": {str(p): fetched_at[p] for p in sorted(pages)}}),
+                        encoding="utf-8")
+    tmp_path.replace(manifest_path)
+
+
+def unique_coins(pages):
+    """페이지 순서대로 이어 붙인 코인 목록 (수집 중 순위가 바뀌어 두 페이지에 나온 코인은 처음 것만)"""
+    seen = set()
+    coins = []
+    for page in sorted(pages):
+        for coin in pages[page]:
+            if coin["id"] not in seen:
+                seen.add(coin["id"])
+                coins.append(coin)
+    return coins
+
+
+def fetch_crypto_pages(limit, progress_dir=None, session=None):
+    """CoinGecko /coins/markets를 페이지 단위로 수집 (중단 시 최근에 받은 페이지는 건너뜀)"""
+    per_page = min(limit, CRYPTO_PAGE_SIZE)
+    num_pages = math.ceil(limit / per_page)
+    progress_dir = progress_dir or CACHE_DIR / "crypto_pages"
+    key = f"{limit}:{per_page}"
+    
+    pages, fetched_at = _load_page_progress(progress_dir, key)
+    if pages:
+        print(f"↩️ 이전 수집 이어받기: {len(pages)}/{num_pages} 페이지 완료됨")
+    
+    url = f"{COINGECKO_API}/coins/markets"
+    fetched = 0
+    wall_start = time.monotonic()
+    
+    for page in range(1, num_pages + 1):
+        if page in pages:
+            if len(pages[page]) < per_page:
+                break
+            continue
+        
         params = {
             "vs_currency": "usd",
             "order": "market_cap_desc",
-            "per_page": limit,
-            "page": 1,
+            "per_page": per_page,
+            "page": page,
             "sparkline": "true",
             "price_change_percentage": "24h,7d"
         }
-        
-        response = requests.get(url, params=params, timeout=30)
+        response = http_client.get(url, params=params, timeout=30, session=session)
         response.raise_for_status()
         data = response.json()
         
-        assets = []
-        for coin in data:
-            assets.append({
-                "id": coin["id"],
-                "name": coin["name"],
-                "symbol": coin["symbol"].upper(),
-                "price": coin["current_price"] or 0,
-                "marketCap": coin["market_cap"] or 0,
-                "change24h": round(coin["price_change_percentage_24h"] or 0, 2),
-                "change7d": round(coin.get("price_change_percentage_7d_in_currency") or 0, 2),
-                "type": "crypto",
-                "country": "-",
-                "image": coin["image"],
-                "sparkline": coin.get("sparkline_in_7d", {}).get("price", [])
-            })
+        pages[page] = data
+        fetched_at[page] = time.time()
+        _save_page_progress(progress_dir, key, fetched_at, pages, page)
+        
+        fetched += len(data)
+        latency_ms = response.elapsed.total_seconds() * 1000
+        print(f"  📄 페이지 {page}/{num_pages}: {len(data)}개, {latency_ms:.0f}ms")
+        
+        if len(data) < per_page:  # 마지막 페이지
+            break
+    
+    if num_pages > 1:
+        elapsed = time.monotonic() - wall_start
+        rate = fetched / elapsed if elapsed > 0 else 0
+        print(f"  ⏱️ {fetched}개 신규 수집, {elapsed:.1f}초 ({rate:.1f}개/초)")
+    
+    shutil.rmtree(progress_dir, ignore_errors=True)
+    coins = unique_coins(pages)
+    duplicates = sum(len(data) for data in pages.values()) - len(coins)
+    if duplicates:
+        print(f"  ⚠️ 페이지 경계 중복 코인 {duplicates}개 제외")
+    return coins[:limit]
+
+
+def normalize_crypto(coins):
+    """CoinGecko /coins/markets 응답 → 자산 목록"""
+    return [
+        Asset(
+            id=coin["id"],
+            name=coin["name"],
+            symbol=coin["symbol"].upper(),
+            price=coin["current_price"],
+            marketCap=coin["market_cap"],
+            change24h=coin["price_change_percentage_24h"],
+            change7d=coin.get("price_change_percentage_7d_in_currency"),
+            type="crypto",
+            image=coin["image"],
+            sparkline=(coin.get("sparkline_in_7d") or {}).get("price"),
+        )
+        for coin in coins
+    ]
+
+
+def fetch_crypto_data(limit=50, session=None):
+    """CoinGecko에서 암호화폐 데이터 가져오기"""
+    print(f"📡 암호화폐 데이터 수집 중... (상위 {limit}개)")
+    
+    try:
+        assets = normalize_crypto(fetch_crypto_pages(limit, session=session))
         
         print(f"✅ 암호화폐 {len(assets)}개 수집 완료")
         return assets
@@ -99,278 +257,402 @@ def fetch_crypto_data(limit=50):
         return []
 
 
-def fetch_gold_price():
-    """금 가격 가져오기 (CoinGecko의 Tether Gold 또는 대체 소스)"""
-    print("📡 금 가격 수집 중...")
+def fetch_metal_prices(session=None):
+    """귀금속 1온스 가격 {"gold"|"silver": (가격, 24시간 변동)} (받지 못한 금속은 빠짐)"""
+    print("📡 금/은 가격 수집 중...")
     
     try:
-        # Tether Gold (XAUT)는 금 1온스와 1:1 페깅
         url = f"{COINGECKO_API}/simple/price"
         params = {
-            "ids": "tether-gold",
+            "ids": ",".join(METAL_COINS.values()),
             "vs_currencies": "usd",
             "include_24hr_change": "true"
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10, session=session)
         response.raise_for_status()
         data = response.json()
-        
-        if "tether-gold" in data:
-            price = data["tether-gold"]["usd"]
-            change24h = data["tether-gold"].get("usd_24h_change", 0)
-            print(f"✅ 금 가격: ${price:.2f}")
-            return price, round(change24h, 2)
-            
     except Exception as e:
-        print(f"⚠️ Tether Gold 가격 수집 실패: {e}")
-    
-    # 폴백: 대략적인 가격 사용
-    print("⚠️ 금 가격 폴백 사용: $2950")
-    return 2950, 0.1
-
-
-def fetch_silver_price():
-    """은 가격 가져오기"""
-    print("📡 은 가격 수집 중...")
+        print(f"⚠️ 금/은 가격 수집 실패: {e}")
+        return {}
     
-    # CoinGecko에는 은 직접 추적이 없으므로 폴백 사용
-    # 실제 프로덕션에서는 metals-api.com 등 사용
-    print("⚠️ 은 가격 폴백 사용: $33")
-    return 33.0, -0.3
+    prices = {}
+    for metal, coin in METAL_COINS.items():
+        quote = data.get(coin) or {}
+        if quote.get("usd"):
+            prices[metal] = (quote["usd"], quote.get("usd_24h_change"))
+            print(f"✅ {metal} 가격: ${quote['usd']:.2f}")
+    return prices
 
 
-def calculate_metal_market_caps():
-    """귀금속 시가총액 계산"""
+def calculate_metal_market_caps(session=None):
+    """귀금속 시가총액 계산 (가격을 받지 못한 금속은 빠짐 - 마지막 정상 값으로 채움)"""
     print("\n🥇 귀금속 시가총액 계산 중...")
     
-    gold_price, gold_change = fetch_gold_price()
-    silver_price, silver_change = fetch_silver_price()
-    
-    # 시가총액 계산: 매장량(톤) × 온스/톤 × 가격
-    gold_market_cap = GOLD_TONNES * TROY_OZ_PER_TONNE * gold_price
-    silver_market_cap = SILVER_TONNES * TROY_OZ_PER_TONNE * silver_price
-    
-    print(f"✅ 금 시가총액: ${gold_market_cap / 1e12:.2f}T")
-    print(f"✅ 은 시가총액: ${silver_market_cap / 1e12:.2f}T")
-    
-    return [
-        {
-            "id": "gold",
-            "name": "금 (Gold)",
-            "symbol": "GOLD",
-            "price": gold_price,
-            "marketCap": gold_market_cap,
-            "change24h": gold_change,
-            "change7d": gold_change * 2,  # 추정치
-            "type": "metal",
-            "country": "-",
-            "emoji": "🥇",
-            "sparkline": []
-        },
-        {
-            "id": "silver",
-            "name": "은 (Silver)",
-            "symbol": "SILVER",
-            "price": silver_price,
-            "marketCap": silver_market_cap,
-            "change24h": silver_change,
-            "change7d": silver_change * 3,  # 추정치
-            "type": "metal",
-            "country": "-",
-            "emoji": "🥈",
-            "sparkline": []
-        }
+    prices = fetch_metal_prices(session)
+    metals = [
+        # (id, 이름, 심볼, 매장량(톤), 이모지, 7일 변동 추정 배수)
+        ("gold", "금 (Gold)", "GOLD", GOLD_TONNES, "🥇", 2),
+        ("silver", "은 (Silver)", "SILVER", SILVER_TONNES, "🥈", 3),
     ]
+    
+    assets = []
+    for metal_id, name, symbol, tonnes, emoji, change7d_factor in metals:
+        if metal_id not in prices:
+            continue
+        price, change24h = prices[metal_id]
+        # 시가총액 계산: 매장량(톤) × 온스/톤 × 가격
+        market_cap = tonnes * TROY_OZ_PER_TONNE * price
+        print(f"✅ {name} 시가총액: ${market_cap / 1e12:.2f}T")
+        assets.append(Asset(
+            id=metal_id,
+            name=name,
+            symbol=symbol,
+            price=price,
+            marketCap=market_cap,
+            change24h=change24h,
+            change7d=(change24h or 0) * change7d_factor,  # 추정치 (히스토리가 쌓이면 rolling.py가 실제 값으로 대체)
+            type="metal",
+            emoji=emoji,
+        ))
+    return assets
+
+
+def stock_id(symbol):
+    """TOP_STOCKS 심볼 → 자산 id"""
+    return STOCK_IDS.get(symbol, symbol.lower())
+
+
+STOCK_SYMBOLS = {stock_id(symbol): symbol for symbol, *_ in TOP_STOCKS}  # 자산 id → 심볼
+
+
+def stock_asset(symbol, local_price, market_cap, change24h, fx_quotes=None):
+    """TOP_STOCKS 심볼의 자산 레코드
+
+    local_price는 거래 통화(.KS 원화, .SR 리얄) 가격, market_cap은 달러.
+    가격도 달러로 환산하고, 현지 통화 주식은 currency/localPrice를 함께 남긴다.
+    """
+    _, name, country, image = STOCK_INFO[symbol]
+    currency = fmp_batch.currency_of(symbol)
+    local = {} if currency == "USD" else {"currency": currency, "localPrice": local_price}
+    return Asset(
+        id=stock_id(symbol),
+        name=name,
+        symbol=symbol.removesuffix(".KS"),
+        price=local_price / fmp_batch.fx_rate(currency, fx_quotes),
+        marketCap=market_cap,
+        change24h=change24h,
+        change7d=change24h * 1.5,  # 추정 (히스토리가 쌓이면 rolling.py가 실제 값으로 대체)
+        type="stock",
+        country=country,
+        image=image,
+        **local,
+    )
+
+
+def seed_row(row):
+    """직전 assets.json의 행 → 마지막 정상 값 (주식은 stock_asset으로 다시 만듦, TOP_STOCKS에 없는 주식은 제외)
+
+    통화 필드가 생기기 전의 행은 .KS/.SR 주식도 price가 현지 통화이고 currency가 없다.
+    """
+    if row["type"] != "stock":
+        return row
+    symbol = STOCK_SYMBOLS.get(row["id"])
+    if symbol is None:
+        return None
+    local_price = row["localPrice"] if row.get("currency") else row["price"]
+    asset = stock_asset(symbol, local_price, row["marketCap"], row["change24h"])
+    asset["change7d"] = row["change7d"]
+    return asset.to_dict()
 
 
-def fetch_stock_data_fmp(api_key=None):
-    """FMP API에서 주식 데이터 가져오기 (API 키 필요)"""
+def fetch_stock_data_fmp(api_key=None, session=None, max_calls=None, market_caps=None):
+    """FMP API에서 주식 데이터 가져오기 (API 키 필요)
+    
+    TOP_STOCKS 전체를 배치로 나눠 요청하고, 일일 호출 한도 때문에 이번에 갱신하지 못한 심볼은
+    장부의 마지막 시세(asOf 표시)를 사용한다. 장부에도 없거나 너무 오래된 심볼은 빠진다
+    (main에서 마지막 정상 값으로 채움). market_caps는 갱신 우선순위용 {심볼: 시가총액}.
+    """
     if not api_key:
-        print("⚠️ FMP API 키 없음 - 하드코딩된 데이터 사용")
-        return fetch_stock_data_fallback()
+        print("⚠️ FMP API 키 없음 - 주식은 마지막 정상 값 사용 (기간 제한 없음)")
+        return []
     
     print("📡 FMP API에서 주식 데이터 수집 중...")
     
-    assets = []
-    symbols = [s[0] for s in TOP_STOCKS if not s[0].endswith('.KS') and not s[0].endswith('.SR')]
+    symbols = [s[0] for s in TOP_STOCKS]
+    ledger = fmp_batch.Ledger(FMP_LEDGER_PATH)
+    started = time.time()
     
     try:
-        # 배치 요청
-        symbols_str = ",".join(symbols[:20])  # 무료 티어 제한
-        url = f"https://financialmodelingprep.com/api/v3/quote/{symbols_str}?apikey={api_key}"
-        
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        stock_info = {s[0]: s for s in TOP_STOCKS}
-        
-        for stock in data:
-            symbol = stock["symbol"]
-            if symbol in stock_info:
-                _, name, country, image = stock_info[symbol]
-                assets.append({
-                    "id": symbol.lower(),
-                    "name": name,
-                    "symbol": symbol,
-                    "price": stock["price"],
-                    "marketCap": stock["marketCap"],
-                    "change24h": round(stock["changesPercentage"], 2),
-                    "change7d": round(stock["changesPercentage"] * 1.5, 2),  # 추정
-                    "type": "stock",
-                    "country": country,
-                    "image": image,
-                    "sparkline": []
-                })
-        
-        print(f"✅ 주식 {len(assets)}개 수집 완료 (FMP)")
-        
+        batches = fmp_batch.refresh_quotes(symbols, api_key, FMP_API, ledger, session, max_calls, market_caps)
     except Exception as e:
         print(f"❌ FMP API 오류: {e}")
-        return fetch_stock_data_fallback()
+        batches = 0
     
-    # 한국/사우디 주식 추가 (별도 API 필요하므로 하드코딩)
-    assets.extend(get_korean_stocks_fallback())
+    max_age = last_known.POLICIES["stock"][1]
+    assets = []
+    missing = []
+    for symbol in symbols:
+        quote = ledger.quotes.get(symbol)
+        if not quote or started - quote["fetchedAt"] > max_age:
+            missing.append(symbol)
+            continue
+        asset = stock_asset(symbol, quote["price"], quote["marketCap"], quote["changesPercentage"], ledger.quotes)
+        if quote["fetchedAt"] < started:
+            asset["asOf"] = last_known.to_iso(quote["fetchedAt"])
+        assets.append(asset)
     
+    if missing:
+        print(f"⚠️ FMP 시세 없음: {', '.join(missing)}")
+    print(f"✅ 주식 {len(assets)}개 수집 완료 (FMP 배치 {batches}회, 오늘 {ledger.calls}/{ledger.daily_limit}회 사용)")
     return assets
 
 
-def fetch_stock_data_fallback():
-    """API 없을 때 사용하는 폴백 데이터"""
-    print("📊 주식 폴백 데이터 사용")
-    
-    # 2026년 1월 기준 대략적인 시가총액 (실제 데이터로 교체 필요)
-    fallback_data = {
-        "AAPL": (229.86, 3.45e12, 0.87),
-        "NVDA": (142.62, 3.49e12, 2.34),
-        "MSFT": (420.55, 3.12e12, 1.23),
-        "GOOG": (192.46, 2.35e12, -0.45),
-        "AMZN": (222.12, 2.32e12, 1.56),
-        "META": (645.23, 1.64e12, 2.12),
-        "TSLA": (351.34, 1.12e12, -1.23),
-        "BRK-B": (502.12, 1.08e12, 0.34),
-        "TSM": (189.45, 0.98e12, -0.89),
-        "V": (342.67, 0.65e12, 0.45),
-        "JPM": (252.34, 0.72e12, 0.67),
-        "WMT": (92.45, 0.74e12, 0.12),
-        "UNH": (512.78, 0.47e12, -0.34),
-        "MA": (528.45, 0.52e12, 0.78),
-        "JNJ": (152.34, 0.37e12, 0.23),
-        "PG": (172.56, 0.41e12, 0.45),
-        "HD": (412.34, 0.38e12, 1.12),
-        "ORCL": (178.90, 0.49e12, 2.34),
-        "COST": (945.67, 0.42e12, 0.89),
-        "BAC": (42.56, 0.33e12, 0.56),
-        "2222.SR": (27.85, 1.85e12, 0.22),
-        "ASML": (745.23, 0.30e12, 1.45),
-        "LLY": (782.34, 0.74e12, 3.21),
-        "AVGO": (235.67, 0.98e12, 1.89),
-        "NVO": (98.45, 0.42e12, 0.67),
-    }
+def _run_source(name, func):
+    """소스 하나 수집 + 숫자 필드 검증 (실행한 스레드에서 fetch.<name> 단계로 지표 기록)"""
+    with metrics.stage(f"fetch.{name}") as record:
+        assets = validate(func())
+        record["assets"] = len(assets)
+    return assets
+
+
+def run_sources(sources, serial=False, timeout=None, fallback=None):
+    """소스별 수집 실행 (기본은 동시 실행, serial=True면 순차 실행)
+
+    결과는 실행 순서와 무관하게 sources 순서대로 반환한다.
+    timeout초(전체) 안에 끝나지 않은 소스는 기다리지 않고 fallback(소스 이름)의 결과(기본 빈 목록)를 쓴다.
+    소스는 데몬 스레드에서 실행하므로 끝나지 않은 요청이 프로세스 종료를 막지 않는다.
+    """
+    deadline_at = None if timeout is None else time.monotonic() + timeout
+    results = [None] * len(sources)
+    errors = [None] * len(sources)
     
-    stock_info = {s[0]: s for s in TOP_STOCKS}
-    assets = []
+    def run(i, name, func):
+        try:
+            results[i] = _run_source(name, func)
+        except BaseException as e:
+            errors[i] = e
     
-    for symbol, (price, market_cap, change) in fallback_data.items():
-        if symbol in stock_info:
-            _, name, country, image = stock_info[symbol]
-            assets.append({
-                "id": symbol.lower(),
-                "name": name,
-                "symbol": symbol,
-                "price": price,
-                "marketCap": market_cap,
-                "change24h": change,
-                "change7d": change * 1.5,
-                "type": "stock",
-                "country": country,
-                "image": image,
-                "sparkline": []
-            })
-    
-    # 한국 주식 추가
-    assets.extend(get_korean_stocks_fallback())
+    def remaining():
+        return None if deadline_at is None else max(0.0, deadline_at - time.monotonic())
     
-    return assets
+    threads = []
+    for i, (name, func) in enumerate(sources):
+        if serial and remaining() == 0:  # 앞 소스가 마감을 다 씀
+            threads.append(None)
+            continue
+        thread = threading.Thread(target=run, args=(i, name, func), name=f"fetch.{name}", daemon=True)
+        thread.start()
+        threads.append(thread)
+        if serial:
+            thread.join(remaining())
+    for thread in threads:
+        if thread is not None:
+            thread.join(remaining())
+    
+    for i, ((name, _), thread) in enumerate(zip(sources, threads)):
+        if thread is None or thread.is_alive():
+            print(f"⌛ {name} 수집 마감 초과 - 기다리지 않고 마지막 정상 값 사용")
+            metrics.count("deadlineExceeded")
+            results[i] = fallback(name) if fallback else []
+        elif errors[i] is not None:
+            raise errors[i]
+    return results
+
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="시가총액 데이터 수집")
+    parser.add_argument("--serial", action="store_true",
+                        help="소스를 동시에 수집하지 않고 순서대로 수집")
+    parser.add_argument("--crypto-limit", type=int, default=50,
+                        help="수집할 암호화폐 개수 (250개 단위로 페이지 수집)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="HTTP 응답 캐시를 읽지도 쓰지도 않음")
+    parser.add_argument("--refresh", action="store_true",
+                        help="캐시된 응답을 무시하고 새로 받아 캐시 갱신")
+    parser.add_argument("--sparkline-points", type=int, default=SPARKLINE_POINTS,
+                        help="스파크라인을 LTTB로 줄일 포인트 수 (0이면 원본 유지)")
+    parser.add_argument("--columnar", action="store_true",
+                        help="컬럼형 assets.columnar.json(+.gz/.br)도 함께 저장")
+    parser.add_argument("--top", type=int, default=ranking.DEFAULT_TOP_N,
+                        help="assets.json에 넣을 전체 상위 자산 수 (나머지는 assets.longtail.json)")
+    parser.add_argument("--top-per-type", type=int, default=ranking.DEFAULT_TOP_PER_TYPE,
+                        help="전체 순위와 관계없이 assets.json에 넣을 유형별 상위 자산 수")
+    parser.add_argument("--no-history", action="store_true",
+                        help="data/history.sqlite에 이번 결과를 추가하지 않음")
+    parser.add_argument("--deadline", type=float, default=deadline.DEFAULT_DEADLINE,
+                        help="전체 실행 마감 (초) - 소스별 수집 예산은 이 중 일부")
+    parser.add_argument("--allow-partial", action="store_true",
+                        help="자산이 하나도 없는 소스가 있어도 나머지만으로 결과 저장")
+    return parser.parse_args(argv)
+
+
+def missing_sources(sources, source_assets):
+    """자산이 하나도 없는 소스 이름 (실패했고 마지막 정상 값도 없거나 만료)"""
+    return [name for (name, _), assets in zip(sources, source_assets) if not assets]
+
 
+def create_sources(args, known, breakers, run_deadline, session=None):
+    """(소스 이름, 수집 함수) 목록 - 소스 예산/서킷 브레이커 안에서 수집하고 실패한 자산은 마지막 정상 값으로 채움
 
-def get_korean_stocks_fallback():
-    """한국 주식 폴백 데이터"""
+    FMP API 키가 없으면 주식은 받을 수단이 없으므로 MAX_AGE와 관계없이 마지막 정상 값(asOf 표시)을 쓴다.
+    """
+    fmp_key = os.environ.get("FMP_API_KEY")
+    stock_caps = {
+        symbol: known.assets[stock_id(symbol)]["asset"]["marketCap"]
+        for symbol, *_ in TOP_STOCKS if stock_id(symbol) in known.assets
+    }
+    
+    def budgeted(name, func):
+        return lambda: breakers.run(name, run_deadline.source_seconds(SOURCE_SHARES[name]), func)
+    
+    # 1. 귀금속 / 2. 암호화폐 / 3. 주식 (호스트별 rate limit은 http_client가 처리)
     return [
-        {
-            "id": "samsung",
-            "name": "삼성전자",
-            "symbol": "005930",
-            "price": 53200,
-            "marketCap": 318e9,
-            "change24h": -1.2,
-            "change7d": -3.5,
-            "type": "stock",
-            "country": "🇰🇷 한국",
-            "image": "https://logo.clearbit.com/samsung.com",
-            "sparkline": []
-        },
-        {
-            "id": "skhynix",
-            "name": "SK하이닉스",
-            "symbol": "000660",
-            "price": 178500,
-            "marketCap": 130e9,
-            "change24h": -0.8,
-            "change7d": -2.1,
-            "type": "stock",
-            "country": "🇰🇷 한국",
-            "image": "https://logo.clearbit.com/skhynix.com",
-            "sparkline": []
-        }
+        ("metals", lambda: known.fetch(
+            "metal", budgeted("metals", lambda: calculate_metal_market_caps(session)), per_asset=True)),
+        ("crypto", lambda: known.fetch(
+            "crypto", budgeted("crypto", lambda: fetch_crypto_data(limit=args.crypto_limit, session=session)),
+            signature=args.crypto_limit)),
+        ("stocks", lambda: known.fetch(
+            "stock", budgeted("stocks", lambda: fetch_stock_data_fmp(fmp_key, session, market_caps=stock_caps)),
+            per_asset=True, max_age=max_age_for("stocks"))),
     ]
 
 
-def main():
+def max_age_for(name):
+    """소스의 마지막 정상 값 최대 나이 (None이면 유형별 MAX_AGE, FMP API 키가 없는 주식은 제한 없음)"""
+    if name == "stocks" and not os.environ.get("FMP_API_KEY"):
+        return math.inf
+    return None
+
+
+def source_fallback(known):
+    """마감 안에 끝나지 않은 소스 이름 → 그 소스의 마지막 정상 값 (run_sources의 fallback)"""
+    return lambda name: known.fallback(SOURCE_TYPES[name], max_age=max_age_for(name))
+
+
+def publish(source_assets, args, output_path=OUTPUT_PATH, append_history=True,
+            history_interval=rolling.SNAPSHOT_INTERVAL):
+    """소스별 자산 목록 → 순위 계산, 히스토리, assets.json / 롱테일 / 변경분 저장 → 공개한 상위 목록
+
+    append_history=False면 히스토리에 이번 결과를 추가하지 않고 기존 히스토리로 변동률만 계산한다.
+    history_interval은 히스토리 스냅샷 간격 (초, 기간 변동률 기준점의 허용 오차에 사용).
+    """
+    output_path.parent.mkdir(exist_ok=True)
+    longtail_path = output_path.with_name("assets.longtail.json")
+    last_updated = datetime.now(timezone.utc).isoformat()
+    
+    # 소스별 정렬 목록을 병합해 순위 계산 (상위 N개 밖은 롱테일 파일로)
+    with metrics.stage("rank") as record:
+        with AssetWriter(longtail_path, last_updated) as longtail:
+            all_assets, _ = ranking.rank(
+                [ranking.presorted(assets) for assets in source_assets],
+                top_n=args.top, top_per_type=args.top_per_type, spill=longtail.write,
+            )
+        if longtail.count:
+            metrics.count_file(longtail_path)
+        else:
+            longtail_path.unlink()
+        record["assets"] = len(all_assets)
+    
+    # 히스토리 추가 후 7일/30일/YTD 변동률, 순위 변동 계산 (하루 한 번 오래된 포인트 다운샘플링)
+    if not args.no_history:
+        with metrics.stage("history"):
+            if not history.HISTORY_PATH.exists():
+                print(f"⚠️ 히스토리 DB 없음 ({history.HISTORY_PATH}) - 새로 시작 (7일/30일/YTD 변동률, 순위 변동 기준 없음)")
+            conn = history.connect()
+            if append_history:
+                history.append_snapshot(conn, all_assets, last_updated)
+            covered = rolling.apply_windows(conn, all_assets, last_updated, history_interval)
+            history.compact(conn)
+            conn.close()
+        print(f"\n📈 히스토리 기준 변동률: " + ", ".join(f"{field} {count}개" for field, count in covered.items()))
+    
+    # 결과 저장 (공개하는 상위 목록만 dict로 변환)
+    output = {
+        "lastUpdated": last_updated,
+        "totalAssets": len(all_assets),
+        "assets": [asset.to_dict() for asset in all_assets]
+    }
+    
+    with metrics.stage("write"):
+        # 덮어쓰기 전에 직전 결과와 비교해 변경분 저장
+        delta_bytes = write_delta(output_path, output, output_path.with_name("assets.delta.json"))
+        if delta_bytes is not None:
+            metrics.count("bytesOut", delta_bytes)
+        
+        # 자산 단위로 직렬화해 임시 파일에 쓴 뒤 교체
+        write_assets(output_path, last_updated, output["assets"])
+        metrics.count_file(output_path)
+        
+        if args.columnar:
+            for path in write_columnar(output, output_path.with_name("assets.columnar.json")):
+                metrics.count_file(path)
+    
+    print("\n" + "=" * 50)
+    print(f"✅ 완료! 총 {len(all_assets)}개 자산 저장됨")
+    print(f"📁 저장 위치: {output_path}")
+    if longtail.count:
+        print(f"🗂️ 상위 {args.top}개 / 유형별 {args.top_per_type}개 밖 {longtail.count}개 → {longtail_path.name}")
+    if delta_bytes is not None:
+        print(f"📦 변경분 {delta_bytes:,} bytes (전체 {output_path.stat().st_size:,} bytes)")
+    return all_assets
+
+
+def main(argv=None):
     """메인 실행 함수"""
+    args = parse_args(argv)
+    run_deadline = deadline.RunDeadline(args.deadline)
+    
+    if not args.no_cache:
+        http_client.cache = ResponseCache(CACHE_DIR / "http", refresh=args.refresh)
+    
     print("=" * 50)
     print("🚀 시가총액 데이터 수집 시작")
     print(f"📅 {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC")
     print("=" * 50)
     
-    all_assets = []
-    
-    # 1. 귀금속 데이터
-    metals = calculate_metal_market_caps()
-    all_assets.extend(metals)
-    time.sleep(1)  # Rate limit 방지
+    session = http_client.get_session()
     
-    # 2. 암호화폐 데이터
-    crypto = fetch_crypto_data(limit=50)
-    all_assets.extend(crypto)
-    time.sleep(1)
+    # 실패한 소스/자산은 마지막 정상 값으로 채우고, 최근에 받아 둔 소스는 건너뜀
+    known = last_known.LastKnownGood(LAST_KNOWN_PATH, seed_path=OUTPUT_PATH, force=args.refresh or args.no_cache,
+                                     seed_row=seed_row)
+    # 소스마다 시간 예산 안에서 요청하고, 최근 계속 실패한 소스는 탐색 요청만
+    breakers = deadline.CircuitBreakers(BREAKER_PATH)
     
-    # 3. 주식 데이터
-    import os
-    fmp_key = os.environ.get("FMP_API_KEY")
-    stocks = fetch_stock_data_fmp(fmp_key)
-    all_assets.extend(stocks)
+    sources = create_sources(args, known, breakers, run_deadline, session)
+    source_assets = run_sources(sources, serial=args.serial, timeout=run_deadline.fetch_remaining(),
+                                fallback=source_fallback(known))
+    breakers.save()
+    print(f"⌛ 수집 {run_deadline.elapsed():.1f}초 (마감 {args.deadline:.0f}초)")
     
-    # 시가총액 순 정렬
-    all_assets.sort(key=lambda x: x["marketCap"], reverse=True)
+    # 스파크라인 다운샘플링 (7일 168포인트 → 차트에 필요한 만큼)
+    if args.sparkline_points:
+        with metrics.stage("downsample"):
+            downsample_sparklines([asset for assets in source_assets for asset in assets], args.sparkline_points)
     
-    # 결과 저장
-    output = {
-        "lastUpdated": datetime.now(timezone.utc).isoformat(),
-        "totalAssets": len(all_assets),
-        "assets": all_assets
-    }
+    # 받은 값은 결과를 공개하지 않더라도 저장
+    known.record([asset for assets in source_assets for asset in assets])
+    known.save()
     
-    output_path = Path(__file__).parent.parent / "data" / "assets.json"
-    output_path.parent.mkdir(exist_ok=True)
+    # 소스 하나가 통째로 빠진 목록은 공개하지 않음 (순위가 조용히 줄어들지 않도록)
+    missing = missing_sources(sources, source_assets)
+    if missing and (not args.allow_partial or not any(source_assets)):
+        print(f"❌ {', '.join(missing)} 자산이 없습니다 (소스 실패, 마지막 정상 값도 없거나 만료) - 기존 결과 유지"
+              + ("" if args.allow_partial else " (--allow-partial이면 나머지만 저장)"))
+        metrics.write("fetch_data")
+        return 1
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    all_assets = publish(source_assets, args)
     
-    print("\n" + "=" * 50)
-    print(f"✅ 완료! 총 {len(all_assets)}개 자산 저장됨")
-    print(f"📁 저장 위치: {output_path}")
+    stats = http_client.get_stats(session)
+    print(f"🔌 HTTP 요청 {stats['requests']}회 (새 연결 {stats['newConnections']}, "
+          f"재사용 {stats['reusedConnections']}), 재시도 {stats['retries']}회, 캐시 적중 {stats['cacheHits']}회")
+    run = metrics.write("fetch_data")
+    if run_deadline.elapsed() > args.deadline:
+        print(f"⚠️ 마감 {args.deadline:.0f}초 초과 ({run_deadline.elapsed():.1f}초)")
+    print(f"⏱️ 전체 {run['seconds']:.1f}초 - " + ", ".join(f"{record['name']} {record['seconds']:.2f}초" for record in run["stages"]))
     print("=" * 50)
     
     # 상위 10개 출력
@@ -384,5 +666,14 @@ def main():
         print(f"  {i:2}. {asset['name'][:20]:<20} {mc_str:>10}")
 
 
+def finish(code=None):
+    """프로세스 종료 (마감을 넘겨 버린 소스 스레드가 남아 있으면 그 스레드와 스레드 풀을 기다리지 않음)"""
+    if any(thread.name.startswith("fetch.") and thread.is_alive() for thread in threading.enumerate()):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code or 0)
+    sys.exit(code)
+
+
 if __name__ == "__main__":
-    main()
+    finish(main())
@@ -0,0 +1,212 @@
+"""
+FMP 배치 요청 계획 / 일일 호출 한도 관리
+- 심볼 목록을 균등한 크기의 배치 요청으로 나눠 동시에 실행 (호스트 rate limit은 http_client가 처리)
+- 일일 호출 수(250회/일)와 심볼별 마지막 시세를 장부(ledger) 파일에 저장
+- 한도가 부족하면 오래된 심볼, 시가총액이 큰 심볼부터 갱신하고 나머지는 장부의 마지막 시세 사용
+- 원화/리얄 시세(.KS/.SR)는 같은 배치에 환율(USDKRW/USDSAR)을 넣어 시가총액을 달러로 환산
+"""
+
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import deadline
+import http_client
+import metrics
+
+DAILY_CALL_LIMIT = 250  # FMP 무료 티어
+CALL_RESERVE = 10  # 수동 실행/재시도용으로 남겨 둘 호출 수
+MAX_SYMBOLS_PER_BATCH = 20
+FRESH_FOR = 15 * 60  # 이보다 최근에 받은 시세는 다시 요청하지 않음 (초)
+STALE_AFTER = 24 * 3600  # 이보다 오래된 시세는 시가총액과 관계없이 먼저 갱신 (초)
+
+# 심볼 접미사 → (통화, FMP 환율 심볼: 1달러당 현지 통화)
+LOCAL_CURRENCIES = {
+    ".KS": ("KRW", "USDKRW"),
+    ".SR": ("SAR", "USDSAR"),
+}
+FALLBACK_FX_RATES = {"USDKRW": 1400.0, "USDSAR": 3.75}  # 장부에 환율이 없을 때
+
+
+def currency_of(symbol):
+    """심볼의 거래 통화 (접미사 기준, 기본 USD)"""
+    for suffix, (currency, _) in LOCAL_CURRENCIES.items():
+        if symbol.endswith(suffix):
+            return currency
+    return "USD"
+
+
+def fx_symbols(symbols):
+    """symbols를 달러로 환산하는 데 필요한 환율 심볼"""
+    needed = []
+    for suffix, (_, fx_symbol) in LOCAL_CURRENCIES.items():
+        if any(symbol.endswith(suffix) for symbol in symbols) and fx_symbol not in needed:
+            needed.append(fx_symbol)
+    return needed
+
+
+def fx_rate(currency, quotes=None):
+    """1달러당 currency (장부 quotes의 환율, 없으면 FALLBACK_FX_RATES)"""
+    if currency == "USD":
+        return 1.0
+    fx_symbol = next(fx for cur, fx in LOCAL_CURRENCIES.values() if cur == currency)
+    quote = (quotes or {}).get(fx_symbol)
+    return quote["price"] if quote and quote.get("price") else FALLBACK_FX_RATES[fx_symbol]
+
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class Ledger:
+    """일일 호출 수와 심볼별 마지막 시세 장부 (JSON 파일)
+
+    날짜(UTC)가 바뀌면 호출 수를 0으로 되돌린다.
+    quotes: {심볼: {"price", "marketCap"(달러), "changesPercentage", "fetchedAt"}}
+    """
+
+    def __init__(self, path, daily_limit=DAILY_CALL_LIMIT, reserve=CALL_RESERVE):
+        self.path = Path(path)
+        self.daily_limit = daily_limit
+        self.reserve = reserve
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        self.date = data.get("date", _today())
+        self.calls = data.get("calls", 0)
+        self.quotes = data.get("quotes", {})
+        self._roll_over()
+
+    def _roll_over(self):
+        if self.date != _today():
+            self.date = _today()
+            self.calls = 0
+
+    def remaining(self):
+        """오늘 더 쓸 수 있는 호출 수 (예비분 제외)"""
+        self._roll_over()
+        return max(0, self.daily_limit - self.reserve - self.calls)
+
+    def record_call(self):
+        self._roll_over()
+        self.calls += 1
+
+    def store(self, symbol, quote, fetched_at):
+        self.quotes[symbol] = dict(quote, fetchedAt=fetched_at)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        data = {"date": self.date, "calls": self.calls, "quotes": self.quotes}
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+def split_batches(symbols, max_size=MAX_SYMBOLS_PER_BATCH):
+    """최소 요청 수로 나누되 배치 크기는 최대한 균등하게"""
+    if not symbols:
+        return []
+    count = math.ceil(len(symbols) / max_size)
+    size, extra = divmod(len(symbols), count)
+    batches = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        batches.append(symbols[start:end])
+        start = end
+    return batches
+
+
+def plan(symbols, ledger, now=None, max_calls=None, market_caps=None, max_size=MAX_SYMBOLS_PER_BATCH):
+    """이번 실행에 갱신할 배치 목록
+
+    FRESH_FOR 안에 받은 심볼은 건너뛰고, 호출 한도 안에서 STALE_AFTER보다 오래된(또는 처음인)
+    심볼을 먼저, 그다음 시가총액(장부 또는 market_caps 기준)이 큰 순서로 고른다.
+    환율 심볼은 환산이 필요한 심볼과 함께 요청한다 (장부의 환율이 FRESH_FOR 안이면 생략).
+    """
+    now = now if now is not None else time.time()
+    market_caps = market_caps or {}
+    calls = ledger.remaining() if max_calls is None else min(max_calls, ledger.remaining())
+
+    def age(symbol):
+        quote = ledger.quotes.get(symbol)
+        return now - quote["fetchedAt"] if quote else math.inf
+
+    def cap(symbol):
+        quote = ledger.quotes.get(symbol)
+        return (quote or {}).get("marketCap") or market_caps.get(symbol) or 0
+
+    due = [symbol for symbol in symbols if age(symbol) >= FRESH_FOR]
+    due.sort(key=lambda symbol: (age(symbol) < STALE_AFTER, -cap(symbol)))
+
+    fx = [symbol for symbol in fx_symbols(due) if age(symbol) >= FRESH_FOR]
+    selected = due[:max(0, calls * max_size - len(fx))]
+    fx = [symbol for symbol in fx_symbols(selected) if symbol in fx]
+    return split_batches(selected + fx, max_size)[:calls]
+
+
+def fetch_batch(symbols, api_key, base_url, session=None):
+    """배치 하나 요청 → (시세 목록, 실제 호출 여부)"""
+    url = f"{base_url}/quote/{','.join(symbols)}?apikey={api_key}"
+    response = http_client.get(url, timeout=30, session=session)
+    response.raise_for_status()
+    return response.json(), not getattr(response, "from_cache", False)
+
+
+def to_usd(quote, symbol, rates):
+    """현지 통화 시가총액을 달러로 환산한 시세 (환율을 모르면 None)"""
+    currency = currency_of(symbol)
+    if currency == "USD":
+        return dict(quote, currency="USD")
+    fx_symbol = next(fx for cur, fx in LOCAL_CURRENCIES.values() if cur == currency)
+    rate = rates.get(fx_symbol)
+    if not rate:
+        return None
+    return dict(quote, marketCap=(quote.get("marketCap") or 0) / rate, currency=currency)
+
+
+def refresh_quotes(symbols, api_key, base_url, ledger, session=None, max_calls=None, market_caps=None):
+    """계획한 배치를 동시에 요청해 장부 갱신, 요청한 배치 수 반환 (실패한 배치는 건너뜀)"""
+    batches = plan(symbols, ledger, max_calls=max_calls, market_caps=market_caps)
+    if not batches:
+        return 0
+
+    def run(batch):
+        try:
+            data, called = fetch_batch(batch, api_key, base_url, session)
+            return batch, data, called
+        except deadline.CircuitOpen:
+            return batch, None, False  # 탐색 요청이 실패해 보내지 않은 배치
+        except Exception as e:
+            print(f"⚠️ FMP 배치 실패 ({len(batch)}개 심볼): {e}")
+            return batch, None, True  # 실패한 요청도 한도에서 차감됨
+
+    fetched = {}
+    requested_at = time.time()  # 시세 시각은 요청을 보낸 시각 (다음 FRESH_FOR 판단이 요청 간격과 맞도록)
+    with ThreadPoolExecutor(max_workers=min(len(batches), http_client.MAX_CONNECTIONS_PER_HOST)) as executor:
+        for batch, data, called in executor.map(metrics.bind(deadline.bind(run)), batches):
+            if called:
+                ledger.record_call()
+            for quote in data or []:
+                if quote.get("symbol") in batch and quote.get("price") is not None:
+                    fetched[quote["symbol"]] = quote
+
+    # 이번에 받은 환율이 없으면 장부의 마지막 환율 사용
+    rates = {symbol: quote["price"] for symbol, quote in ledger.quotes.items()}
+    rates.update({symbol: quote["price"] for symbol, quote in fetched.items()})
+    for symbol, quote in fetched.items():
+        quote = to_usd(quote, symbol, rates)
+        if quote is None:
+            continue
+        ledger.store(symbol, {
+            "price": quote["price"],
+            "marketCap": quote.get("marketCap"),
+            "changesPercentage": quote.get("changesPercentage") or 0,
+            "currency": quote["currency"],
+        }, requested_at)
+    ledger.save()
+    return len(batches)
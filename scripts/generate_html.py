@@ -1,27 +1,406 @@
 #!/usr/bin/env python3
 """
 JSON 데이터를 읽어서 HTML 파일에 임베드하는 스크립트
+- 입력(정규화된 자산 데이터 + 템플릿 소스) 해시가 지난 빌드와 같으면 생성 건너뜀
+- 같은 입력이면 항상 같은 바이트를 출력
+- 로고는 빌드 시 한 장의 스프라이트(static/logos.<hash>.webp)로 묶어 CSS background-position으로 표시 (logos.py)
 """
 
+import argparse
+import hashlib
 import json
+import os
+import re
 from pathlib import Path
 from datetime import datetime
 
-def generate_html():
+import json_stream
+import logos
+import metrics
+from columnar import dumps_columnar
+from search_index import CHOSEONG, build_search_index
+from sparkline import has_chart_data, sparkline_paths
+
+# 출력에 영향을 주는 소스 (바뀌면 템플릿 버전이 바뀐 것으로 간주)
+SCRIPTS_DIR = Path(__file__).parent
+TEMPLATE_SOURCES = (
+    SCRIPTS_DIR / "generate_html.py",
+    SCRIPTS_DIR / "columnar.py",
+    SCRIPTS_DIR / "sparkline.py",
+    SCRIPTS_DIR / "search_index.py",
+    SCRIPTS_DIR / "json_stream.py",
+    SCRIPTS_DIR / "logos.py",
+)
+BUILD_HASH_PATTERN = re.compile(r'<meta name="build-hash" content="([0-9a-f]+)">')
+LOGO_ATLAS_PATTERN = re.compile(r'url\(static/(logos\.[0-9a-f]+\.(?:webp|png))\)')
+FLOAT_DIGITS = 10  # 정규화 시 유효숫자
+
+# 미리 계산할 정렬 인덱스 (필터 × 정렬 키, 내림차순)
+FILTERS = ("all", "stock", "metal", "crypto")
+SORT_KEYS = ("marketCap", "change24h")
+
+SEARCH_DEBOUNCE_MS = 120
+
+PER_PAGE = 50
+DATA_PATH = Path(__file__).parent.parent / "data" / "assets.json"
+OUTPUT_PATH = Path(__file__).parent.parent / "index.html"
+STATIC_DIR = Path(__file__).parent.parent / "static"  # split 모드 해시 파일 위치
+STATIC_INDEX = STATIC_DIR / "build.json"  # 직전 빌드가 참조하는 파일 목록
+
+# 컬럼형 임베드 시 클라이언트 디코더 (차트는 빌드 시 렌더링한 sparkPath 열이라 스파크라인 버퍼 없음)
+COLUMNAR_DECODER_JS = """
+        function decodeColumnar(doc) {
+            const assets = new Array(doc.totalAssets);
+            for (let i = 0; i < doc.totalAssets; i++) {
+                const asset = {};
+                for (const field of doc.fields) {
+                    let value = doc.columns[field][i];
+                    if (field in doc.dictionaries) value = doc.dictionaries[field][value];
+                    if (value !== null) asset[field] = value;
+                }
+                assets[i] = asset;
+            }
+            return assets;
+        }
+"""
+
+# split 모드 클라이언트 로더: 전체 데이터와 스파크라인 페이지를 필요할 때 가져옴
+SPLIT_LOADER_JS = """
+        let fullDataRequest = null;
+        const sparkRequests = {};
+
+        function needsFullData() {
+            return currentPage > 1 || currentFilter !== 'all' || searchQuery !== '' ||
+                currentSort !== 'marketCap' || sortDirection !== 'desc';
+        }
+
+        function loadFullData() {
+            if (!fullDataRequest) {
+                fullDataRequest = fetch(DATA_MANIFEST.data)
+                    .then(r => r.json())
+                    .then(doc => {
+                        ASSETS_DATA = doc.assets;
+                        SORT_INDEXES = doc.indexes;
+                        SEARCH_INDEX = doc.search;
+                        searchKeys = searchGrams = null;
+                        searchCache.clear();
+                        Object.assign(DATA_MANIFEST.spark, doc.spark);
+                        fullDataLoaded = true;
+                        renderTable();
+                    });
+            }
+            return fullDataRequest;
+        }
+
+        function loadSparklines(rows) {
+            rows.forEach(asset => {
+                if (asset.sparkPath || SPARKLINES[asset.rank]) return;
+                const page = Math.ceil(asset.rank / perPage);
+                const url = DATA_MANIFEST.spark[page];
+                if (!url || sparkRequests[page]) return;
+                sparkRequests[page] = fetch(url)
+                    .then(r => r.json())
+                    .then(lines => {
+                        lines.forEach((line, i) => {
+                            if (line) SPARKLINES[(page - 1) * perPage + i + 1] = line;
+                        });
+                        renderTable();
+                    });
+            });
+        }
+"""
+
+# 검색: 빌드 시 만든 3-gram 인덱스(압축)를 처음 검색할 때 풀어 후보를 좁히고 부분 문자열로 확인 (검색어별 결과 캐시)
+SEARCH_JS = """
+        let searchKeys = null;
+        let searchGrams = null;
+        const searchCache = new Map();
+
+        function toChoseong(text) {
+            let out = '';
+            for (const ch of text) {
+                const code = ch.charCodeAt(0) - 0xAC00;
+                out += code >= 0 && code <= 11171 ? CHOSEONG[Math.floor(code / 588)] : ch;
+            }
+            return out;
+        }
+
+        // name / symbol / Hangul initial consonants (삼성전자 → ㅅㅅㅈㅈ), built once
+        function buildSearchKeys() {
+            return ASSETS_DATA.map(a => {
+                const name = a.name.toLowerCase();
+                return [name, a.symbol.toLowerCase(), toChoseong(name)].join('\\u0001');
+            });
+        }
+
+        // Prebuilt index {postings: {base-36 position deltas: concatenated grams}} → Map gram → positions
+        function decodeSearchIndex(index) {
+            const size = index.gramSize;
+            const grams = new Map();
+            for (const [encoded, joined] of Object.entries(index.postings)) {
+                let position = 0;
+                const positions = encoded.split(',').map(delta => (position += parseInt(delta, 36)));
+                for (let s = 0; s < joined.length; s += size) grams.set(joined.slice(s, s + size), positions);
+            }
+            return grams;
+        }
+
+        function prepareSearch() {
+            if (!searchKeys) searchKeys = buildSearchKeys();
+            if (!searchGrams) searchGrams = decodeSearchIndex(SEARCH_INDEX);
+        }
+
+        function searchMatches(query) {
+            if (searchCache.has(query)) return searchCache.get(query);
+            prepareSearch();
+
+            // Characters outside the BMP (emoji) are not indexed: scan everything for those queries
+            let candidates = null;
+            const size = SEARCH_INDEX.gramSize;
+            if (query.length >= size && !/[\\uD800-\\uDFFF]/.test(query)) {
+                let smallest = null;
+                for (let i = 0; i + size <= query.length; i++) {
+                    const list = searchGrams.get(query.slice(i, i + size));
+                    if (!list) {
+                        smallest = [];
+                        break;
+                    }
+                    if (!smallest || list.length < smallest.length) smallest = list;
+                }
+                candidates = smallest;
+            }
+
+            const matched = new Set();
+            if (candidates) {
+                for (const i of candidates) if (searchKeys[i].includes(query)) matched.add(i);
+            } else {
+                searchKeys.forEach((key, i) => {
+                    if (key.includes(query)) matched.add(i);
+                });
+            }
+            searchCache.set(query, matched);
+            return matched;
+        }
+"""
+
+
+def normalize(value):
+    """키 정렬 + float 유효숫자 고정 (정수 값 float는 int로)"""
+    if isinstance(value, float):
+        value = float(f"{value:.{FLOAT_DIGITS}g}")
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {key: normalize(value[key]) for key in sorted(value)}
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    return value
+
+
+def build_hash(assets, options):
+    """정규화된 자산 + 템플릿 소스 + 옵션의 SHA-256 (lastUpdated 시각은 제외)"""
+    digest = hashlib.sha256()
+    for source in TEMPLATE_SOURCES:
+        digest.update(source.read_bytes())
+    digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    digest.update(json.dumps(assets, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def previous_build_hash(output_path):
+    """기존 index.html에 기록된 빌드 해시"""
+    try:
+        match = BUILD_HASH_PATTERN.search(output_path.read_text(encoding="utf-8"))
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+
+def previous_logo_atlas(output_path):
+    """기존 index.html이 참조하는 로고 스프라이트 파일 이름"""
+    try:
+        match = LOGO_ATLAS_PATTERN.search(output_path.read_text(encoding="utf-8"))
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+
+def logo_css(atlas):
+    """스프라이트 한 장을 배경으로 쓰는 .logo-sprite 규칙 (칸 위치는 행마다 background-position)"""
+    if not atlas:
+        return ""
+    return f"""
+        .logo-sprite {{
+            background-image: url({STATIC_DIR.name}/{atlas["file"]});
+            background-size: {atlas["width"]}px {atlas["height"]}px;
+            background-repeat: no-repeat;
+        }}"""
+
+
+def set_github_output(name, value):
+    """GitHub Actions 스텝 출력 설정 (로컬 실행 시 무시)"""
+    output_file = os.environ.get("GITHUB_OUTPUT")
+    if output_file:
+        with open(output_file, "a", encoding="utf-8") as f:
+            f.write(f"{name}={value}\n")
+
+
+def compact_json(value):
+    """공백 없는 JSON 문자열 (orjson이 있으면 사용)"""
+    return json_stream.dumps(value).decode("utf-8")
+
+
+def build_sort_indexes(assets):
+    """필터 × 정렬 키별 내림차순 순열 (값이 같으면 원래 순서 유지, 오름차순은 역순으로 읽음)"""
+    indexes = {}
+    for name in FILTERS:
+        members = [i for i, asset in enumerate(assets) if name == "all" or asset["type"] == name]
+        indexes[name] = {
+            key: sorted(members, key=lambda i: -(assets[i].get(key) or 0))
+            for key in SORT_KEYS
+        }
+    return indexes
+
+
+def type_counts(assets):
+    """전체/유형별 자산 수"""
+    counts = {"total": len(assets)}
+    for name in FILTERS[1:]:
+        counts[name] = 0
+    for asset in assets:
+        counts[asset["type"]] = counts.get(asset["type"], 0) + 1
+    return counts
+
+
+def hashed(stem, payload):
+    """(static/ 상대 URL, bytes) - 내용 해시를 이름에 넣음 (같은 내용이면 같은 이름)"""
+    raw = json_stream.dumps(payload)
+    return f"{STATIC_DIR.name}/{stem}.{hashlib.sha256(raw).hexdigest()[:12]}.json", raw
+
+
+def write_static(files):
+    """hashed()로 만든 {URL: bytes}를 static/에 저장 (이미 있는 파일은 그대로)"""
+    STATIC_DIR.mkdir(exist_ok=True)
+    for url, raw in files.items():
+        path = STATIC_DIR / Path(url).name
+        if not path.exists():
+            path.write_bytes(raw)
+            metrics.count_file(path)
+
+
+def prerender_sparklines(assets):
+    """sparkline 배열을 빌드 시 렌더링한 SVG path 문자열(sparkPath)로 교체한 목록"""
+    rows = []
+    for asset, path in zip(assets, sparkline_paths(assets)):
+        row = {key: value for key, value in asset.items() if key != "sparkline"}
+        row["sparkPath"] = path
+        rows.append(row)
+    return rows
+
+
+def write_split_data(assets, per_page=PER_PAGE):
+    """split 모드 데이터 파일 저장
+
+    전체 목록은 data.<hash>.json, 실제 가격 차트 path는 페이지별 spark.<page>.<hash>.json.
+    (추정 차트 path는 짧으므로 행에 그대로 둔다)
+    index.html에 넣을 (첫 페이지 행, 매니페스트)를 반환한다.
+    """
+    rows = []
+    spark_pages = {}
+    for i, (asset, row) in enumerate(zip(assets, prerender_sparklines(assets))):
+        row["rank"] = i + 1
+        if has_chart_data(asset.get("sparkline")):
+            page, offset = divmod(i, per_page)
+            spark_pages.setdefault(page + 1, [None] * per_page)[offset] = row.pop("sparkPath")
+        rows.append(row)
+    
+    # 모두 직렬화한 뒤에 저장 (중간에 실패하면 static/에 아무것도 남기지 않음)
+    files = {}
+    spark_urls = {}
+    for page, lines in sorted(spark_pages.items()):
+        url, files[url] = hashed(f"spark.{page}", lines)
+        spark_urls[str(page)] = url  # JSON 키는 문자열 (orjson은 숫자 키를 쓰지 않음)
+    data_url, files[data_url] = hashed("data", {
+        "assets": rows,
+        "spark": spark_urls,
+        "indexes": build_sort_indexes(rows),
+        "search": build_search_index(rows),
+    })
+    write_static(files)
+    
+    # 현재 빌드와 직전 빌드가 참조하는 파일만 남김 (열려 있던 이전 페이지용)
+    current = [data_url] + list(spark_urls.values())
+    try:
+        previous = json.loads(STATIC_INDEX.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        previous = []
+    keep = {Path(url).name for url in current + previous}
+    for path in STATIC_DIR.glob("*.json"):
+        if path != STATIC_INDEX and path.name not in keep:
+            path.unlink()
+    STATIC_INDEX.write_text(json.dumps(current, indent=2), encoding="utf-8")
+    
+    manifest = {
+        "data": data_url,
+        "spark": {"1": spark_urls["1"]} if "1" in spark_urls else {},  # 나머지는 data 파일에 포함
+    }
+    return rows[:per_page], manifest
+
+
+def generate_html(columnar=False, split=False, force=False, data_path=DATA_PATH, output_path=OUTPUT_PATH,
+                  logo_sprite=True, logo_dir=None):
+    """index.html 생성 (입력이 바뀌지 않았으면 건너뛰고 False 반환)
+
+    logo_sprite=True면 로고를 받아 스프라이트로 묶는다 (logo_dir: 로컬 로고 폴더, 네트워크 없이 빌드할 때).
+    """
     # 데이터 로드
-    data_path = Path(__file__).parent.parent / "data" / "assets.json"
+    with metrics.stage("load") as record:
+        # 자산을 한 줄씩 읽어 바로 정규화 (원본 목록을 통째로 들고 있지 않음)
+        data_last_updated, records = json_stream.iter_assets(data_path)
+        assets = [normalize(asset) for asset in records]
+        record["assets"] = len(assets)
     
-    with open(data_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    atlas = None
+    if logo_sprite:
+        with metrics.stage("logos") as record:
+            atlas = logos.build(assets, STATIC_DIR, logo_dir=logo_dir)
+            record["assets"] = len(atlas["cells"]) if atlas else 0
+    content_hash = build_hash(assets, {"columnar": columnar, "split": split, "logos": atlas})
     
-    last_updated = data["lastUpdated"][:10]  # YYYY-MM-DD만
-    assets_json = json.dumps(data["assets"], ensure_ascii=False)
+    if not force and previous_build_hash(output_path) == content_hash:
+        print(f"⏭️ 데이터 변경 없음 - HTML 생성 건너뜀 ({content_hash[:12]})")
+        set_github_output("changed", "false")
+        return False
+    
+    last_updated = data_last_updated[:10]  # YYYY-MM-DD만
+    with metrics.stage("build"):
+        columnar_decoder = ""
+        split_loader = ""
+        manifest = None
+        indexes = build_sort_indexes(assets)
+        search = build_search_index(assets)
+        if columnar:
+            columnar_decoder = COLUMNAR_DECODER_JS
+            normalized = {"lastUpdated": data_last_updated, "assets": prerender_sparklines(assets)}
+            assets_json = f"decodeColumnar({dumps_columnar(normalized, sparkline=False)})"
+        elif split:
+            split_loader = SPLIT_LOADER_JS
+            first_page, manifest = write_split_data(assets)
+            assets_json = compact_json(first_page)
+            indexes = search = None  # 전체 데이터와 함께 받음
+        else:
+            assets_json = compact_json(prerender_sparklines(assets))
+        manifest_json = compact_json(manifest)
+        indexes_json = compact_json(indexes)
+        search_json = compact_json(search)
+        counts_json = compact_json(type_counts(assets))
+        logos_json = compact_json(atlas and {key: atlas[key] for key in ("size", "columns", "cells")})
     
     html_content = f'''<!DOCTYPE html>
 <html lang="ko">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="build-hash" content="{content_hash}">
     <title>시가총액 순위 | 전세계 자산</title>
     <meta name="description" content="전세계 자산 시가총액 순위 - 주식, 암호화폐, 귀금속 포함">
     <script src="https://cdn.tailwindcss.com"></script>
@@ -41,7 +420,7 @@ def generate_html():
             background: linear-gradient(135deg, #374151, #1f2937);
             display: flex; align-items: center; justify-content: center;
             font-size: 14px; font-weight: bold; color: #9ca3af;
-        }}
+        }}{logo_css(atlas)}
     </style>
 </head>
 <body class="text-gray-100">
@@ -145,16 +524,28 @@ def generate_html():
     <script>
         // ============================================
         // 📦 임베드된 데이터
-        // ============================================
-        const ASSETS_DATA = {assets_json};
+        // ============================================{columnar_decoder}
+        let ASSETS_DATA = {assets_json};
+        // split mode: only the first page is inline, the rest is fetched on demand
+        const DATA_MANIFEST = {manifest_json};
+        let fullDataLoaded = !DATA_MANIFEST;
+        const SPARKLINES = {{}};
+        // Precomputed at build time: descending permutations per filter × sort key, and type counts
+        let SORT_INDEXES = {indexes_json};
+        const TYPE_COUNTS = {counts_json};
+        // Search index (3-grams, grouped by posting list) is decoded on first focus of the search box
+        let SEARCH_INDEX = {search_json};
+        const CHOSEONG = '{CHOSEONG}';
+        // Logo sprite: asset id → cell in one atlas image (null when built without Pillow)
+        const LOGOS = {logos_json};
         
         let currentFilter = 'all';
         let currentSort = 'marketCap';
         let sortDirection = 'desc';
         let currentPage = 1;
-        const perPage = 50;
+        const perPage = {PER_PAGE};
         let searchQuery = '';
-
+{split_loader}{SEARCH_JS}
         // Format functions
         function formatMarketCap(value) {{
             if (value >= 1e12) return `${{(value / 1e12).toFixed(2)}}T`;
@@ -163,92 +554,93 @@ def generate_html():
             return `${{value.toFixed(2)}}`;
         }}
 
-        function formatPrice(value, symbol) {{
-            if (symbol === '005930' || symbol === '000660') return `₩${{value.toLocaleString()}}`;
+        // 소스 실패로 마지막 정상 값을 쓴 자산: 관측 후 1시간이 지났으면 나이 표시
+        function staleBadge(asset) {{
+            if (!asset.asOf) return '';
+            const hours = (Date.now() - Date.parse(asset.asOf)) / 3600000;
+            if (!(hours >= 1)) return '';
+            const age = hours < 24 ? `${{Math.floor(hours)}}시간` : `${{Math.floor(hours / 24)}}일`;
+            return ` <span class="text-yellow-500" title="${{asset.asOf}} 기준 값">· ${{age}} 전 값</span>`;
+        }}
+
+        // 스프라이트에 있는 로고는 background-position으로, 없으면 원본 이미지 / 첫 글자
+        function logoHtml(asset) {{
+            const cell = LOGOS ? LOGOS.cells[asset.id] : undefined;
+            if (cell !== undefined) {{
+                const x = (cell % LOGOS.columns) * LOGOS.size;
+                const y = Math.floor(cell / LOGOS.columns) * LOGOS.size;
+                return `<div class="logo-sprite w-8 h-8 rounded-full bg-gray-800" role="img" aria-label="${{asset.name}}" style="background-position:-${{x}}px -${{y}}px"></div>`;
+            }}
+            if (asset.image) {{
+                return `<img src="${{asset.image}}" alt="${{asset.name}}" class="w-8 h-8 rounded-full bg-gray-800" onerror="this.outerHTML='<div class=\\'logo-fallback\\'>${{asset.symbol.charAt(0)}}</div>'">`;
+            }}
+            return `<div class="logo-fallback">${{asset.emoji || asset.symbol.charAt(0)}}</div>`;
+        }}
+
+        function formatPrice(asset) {{
+            // 현지 통화 주식(원화/리얄)은 거래 통화 가격으로 표시 (price는 달러 환산값)
+            if (asset.currency && asset.localPrice != null) {{
+                return asset.localPrice.toLocaleString('ko-KR', {{style: 'currency', currency: asset.currency}});
+            }}
+            const value = asset.price;
             if (value >= 1000) return `${{value.toLocaleString('en-US', {{maximumFractionDigits: 2}})}}`;
             if (value >= 1) return `${{value.toFixed(2)}}`;
             if (value >= 0.01) return `${{value.toFixed(4)}}`;
             return `${{value.toFixed(6)}}`;
         }}
 
-        // Create sparkline
-        function createSparkline(data, change7d) {{
-            const width = 100;
-            const height = 35;
-            const isPositive = change7d >= 0;
-            const color = isPositive ? '#22c55e' : '#ef4444';
-            
-            if (data && data.length > 10) {{
-                // Use actual sparkline data
-                const step = Math.floor(data.length / 20);
-                const sampled = data.filter((_, i) => i % step === 0).slice(-20);
-                const min = Math.min(...sampled);
-                const max = Math.max(...sampled);
-                const range = max - min || 1;
-                
-                const points = sampled.map((val, i) => {{
-                    const x = (i / (sampled.length - 1)) * width;
-                    const y = height - 5 - ((val - min) / range) * (height - 10);
-                    return `${{x}},${{y}}`;
-                }}).join(' ');
-                
-                return `<svg width="${{width}}" height="${{height}}" class="sparkline">
-                    <polyline fill="none" stroke="${{color}}" stroke-width="2" points="${{points}}" />
-                </svg>`;
-            }}
-            
-            // Generate fake sparkline based on change
-            const points = [];
-            for (let i = 0; i < 7; i++) {{
-                const progress = i / 6;
-                const y = isPositive 
-                    ? 28 - progress * 18 + (Math.random() - 0.5) * 8
-                    : 10 + progress * 18 + (Math.random() - 0.5) * 8;
-                points.push(`${{i * 15 + 5}},${{Math.max(5, Math.min(30, y))}}`);
+        // Sparkline paths are pre-rendered at build time (sparkPath)
+        function sparklineCell(asset) {{
+            const path = asset.sparkPath || SPARKLINES[asset.rank];
+            const color = asset.change7d >= 0 ? '#22c55e' : '#ef4444';
+            // Not loaded yet (split mode): empty placeholder until the chunk arrives
+            const line = path ? `<path fill="none" stroke="${{color}}" stroke-width="2" d="${{path}}" />` : '';
+            return `<svg width="100" height="35" class="sparkline">${{line}}</svg>`;
+        }}
+
+        // Rows of the current page: slices a build-time permutation (no sorting on the client).
+        // Ascending order reads the descending permutation from the end.
+        function pageOf(order, start) {{
+            const end = Math.min(start + perPage, order.length);
+            const rows = [];
+            for (let k = start; k < end; k++) {{
+                rows.push(ASSETS_DATA[sortDirection === 'desc' ? order[k] : order[order.length - 1 - k]]);
             }}
-            
-            return `<svg width="${{width}}" height="${{height}}" class="sparkline">
-                <polyline fill="none" stroke="${{color}}" stroke-width="2" points="${{points.join(' ')}}" />
-            </svg>`;
+            return rows;
         }}
 
-        // Get filtered and sorted data
-        function getFilteredData() {{
-            let filtered = ASSETS_DATA;
-            
-            if (currentFilter !== 'all') {{
-                filtered = filtered.filter(a => a.type === currentFilter);
+        function getPage() {{
+            const start = (currentPage - 1) * perPage;
+            if (!fullDataLoaded) {{
+                return {{ rows: ASSETS_DATA.slice(start, start + perPage), total: TYPE_COUNTS.total }};
             }}
             
+            let order = SORT_INDEXES[currentFilter][currentSort];
             if (searchQuery) {{
-                const query = searchQuery.toLowerCase();
-                filtered = filtered.filter(a => 
-                    a.name.toLowerCase().includes(query) || 
-                    a.symbol.toLowerCase().includes(query)
-                );
+                const matched = searchMatches(searchQuery.toLowerCase());
+                order = order.filter(i => matched.has(i));
             }}
-            
-            filtered.sort((a, b) => {{
-                const aVal = a[currentSort] || 0;
-                const bVal = b[currentSort] || 0;
-                return sortDirection === 'desc' ? bVal - aVal : aVal - bVal;
-            }});
-            
-            return filtered;
+            return {{ rows: pageOf(order, start), total: order.length }};
         }}
 
         // Render table
         function renderTable() {{
+            if (!fullDataLoaded && needsFullData()) {{
+                loadFullData();
+                return;
+            }}
+            
             const tbody = document.getElementById('assets-body');
             tbody.innerHTML = '';
             
-            const filtered = getFilteredData();
-            const totalPages = Math.ceil(filtered.length / perPage);
+            const {{ rows: paged, total }} = getPage();
+            const totalPages = Math.ceil(total / perPage);
             const start = (currentPage - 1) * perPage;
-            const paged = filtered.slice(start, start + perPage);
             
             paged.forEach((asset, index) => {{
-                const globalRank = start + index + 1;
+                // 전체 시가총액 순으로 볼 때는 롱테일을 포함한 실제 순위 (유형 필터 안에서는 위치 = typeRank)
+                const globalRank = (currentFilter === 'all' && currentSort === 'marketCap' && !searchQuery && asset.marketCapRank)
+                    || start + index + 1;
                 const rowClass = asset.type === 'metal' ? 'precious-metal' : 
                                asset.type === 'crypto' ? 'cryptocurrency' : '';
                 
@@ -258,29 +650,25 @@ def generate_html():
                 const row = document.createElement('tr');
                 row.className = `asset-row border-b border-gray-800 ${{rowClass}}`;
                 
-                const imgHtml = asset.image 
-                    ? `<img src="${{asset.image}}" alt="${{asset.name}}" class="w-8 h-8 rounded-full bg-gray-800" onerror="this.outerHTML='<div class=\\'logo-fallback\\'>${{asset.symbol.charAt(0)}}</div>'">`
-                    : `<div class="logo-fallback">${{asset.emoji || asset.symbol.charAt(0)}}</div>`;
-                
                 row.innerHTML = `
                     <td class="py-4 px-4 text-gray-400 font-medium">${{globalRank}}</td>
                     <td class="py-4 px-4">
                         <div class="flex items-center gap-3">
-                            ${{imgHtml}}
+                            ${{logoHtml(asset)}}
                             <div>
                                 <div class="font-semibold text-white">${{asset.name}}</div>
-                                <div class="text-xs text-gray-500">${{asset.symbol}}</div>
+                                <div class="text-xs text-gray-500">${{asset.symbol}}${{staleBadge(asset)}}</div>
                             </div>
                         </div>
                     </td>
                     <td class="py-4 px-4 text-right font-medium text-white">${{formatMarketCap(asset.marketCap)}}</td>
-                    <td class="py-4 px-4 text-right text-gray-300">${{formatPrice(asset.price, asset.symbol)}}</td>
+                    <td class="py-4 px-4 text-right text-gray-300">${{formatPrice(asset)}}</td>
                     <td class="py-4 px-4 text-right font-medium ${{asset.change24h >= 0 ? 'positive' : 'negative'}}">
                         ${{asset.change24h >= 0 ? '+' : ''}}${{asset.change24h.toFixed(2)}}%
                     </td>
                     <td class="py-4 px-4">
                         <div class="flex justify-center">
-                            ${{createSparkline(asset.sparkline, asset.change7d)}}
+                            ${{sparklineCell(asset)}}
                         </div>
                     </td>
                     <td class="py-4 px-4 text-center text-sm text-gray-400">${{typeLabel}}</td>
@@ -291,6 +679,7 @@ def generate_html():
             
             renderPagination(totalPages);
             updateStats();
+            if (DATA_MANIFEST) loadSparklines(paged);
         }}
 
         // Render pagination
@@ -311,10 +700,10 @@ def generate_html():
 
         // Update stats
         function updateStats() {{
-            document.getElementById('total-count').textContent = ASSETS_DATA.length;
-            document.getElementById('metal-count').textContent = ASSETS_DATA.filter(a => a.type === 'metal').length;
-            document.getElementById('stock-count').textContent = ASSETS_DATA.filter(a => a.type === 'stock').length;
-            document.getElementById('crypto-count').textContent = ASSETS_DATA.filter(a => a.type === 'crypto').length;
+            document.getElementById('total-count').textContent = TYPE_COUNTS.total;
+            document.getElementById('metal-count').textContent = TYPE_COUNTS.metal;
+            document.getElementById('stock-count').textContent = TYPE_COUNTS.stock;
+            document.getElementById('crypto-count').textContent = TYPE_COUNTS.crypto;
         }}
 
         // Sort function
@@ -343,23 +732,57 @@ def generate_html():
             }});
         }});
         
-        // Search
+        // Search (debounced); build the search keys and decode the 3-gram index as soon as the box is focused
+        document.getElementById('search-input').addEventListener('focus', () => {{
+            if (fullDataLoaded) prepareSearch();
+        }});
+        let searchTimer = null;
         document.getElementById('search-input').addEventListener('input', (e) => {{
-            searchQuery = e.target.value;
-            currentPage = 1;
-            renderTable();
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {{
+                searchQuery = e.target.value.trim();
+                currentPage = 1;
+                renderTable();
+            }}, {SEARCH_DEBOUNCE_MS});
         }});
     </script>
 </body>
 </html>'''
     
-    # HTML 파일 저장
-    output_path = Path(__file__).parent.parent / "index.html"
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    # HTML 파일 저장 (줄바꿈 고정)
+    with metrics.stage("write"):
+        previous_atlas = previous_logo_atlas(output_path) if atlas else None
+        with open(output_path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(html_content)
+        metrics.count_file(output_path)
+        # 현재 빌드와 직전 빌드가 참조하는 스프라이트만 남김 (열려 있던 이전 페이지용)
+        if atlas:
+            logos.prune(STATIC_DIR, {atlas["file"], previous_atlas})
     
+    set_github_output("changed", "true")
     print(f"✅ HTML 생성 완료: {output_path}")
+    return True
+
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="index.html 생성")
+    layout = parser.add_mutually_exclusive_group()
+    layout.add_argument("--columnar", action="store_true",
+                        help="데이터를 컬럼형(필드별 배열, 차트는 빌드 시 렌더링한 sparkPath)으로 임베드")
+    layout.add_argument("--split", action="store_true",
+                        help="첫 페이지만 임베드하고 나머지는 static/의 해시 파일로 분리")
+    parser.add_argument("--force", action="store_true",
+                        help="입력이 바뀌지 않았어도 다시 생성")
+    parser.add_argument("--logo-dir", type=Path,
+                        help="로고 파일 폴더 (<자산 id>.png 등, 있으면 다운로드 대신 사용)")
+    parser.add_argument("--no-logo-sprite", action="store_true",
+                        help="로고 스프라이트를 만들지 않고 행마다 원본 이미지 사용")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    generate_html()
+    args = parse_args()
+    generate_html(columnar=args.columnar, split=args.split, force=args.force,
+                  logo_sprite=not args.no_logo_sprite, logo_dir=args.logo_dir)
+    metrics.write("generate_html")
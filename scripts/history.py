@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+시세 히스토리 저장소 (SQLite, 추가 전용)
+- 실행마다 자산별 가격/시가총액/24시간 변동/순위를 (자산 ID, 시각) 키로 추가
+- 오래된 데이터는 주기적으로 다운샘플링 (7일 이후 시간당 1개, 90일 이후 하루 1개)
+- 조회: python scripts/history.py bitcoin 2026-01-01 2026-02-01
+"""
+
+import argparse
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+HISTORY_PATH = Path(__file__).parent.parent / "data" / "history.sqlite"
+
+# (이보다 오래된 데이터, 남길 간격) - 간격마다 마지막 포인트만 유지
+DOWNSAMPLE_TIERS = [
+    (7 * 86400, 3600),
+    (90 * 86400, 86400),
+]
+COMPACT_INTERVAL = 86400  # 다운샘플링 주기 (초)
+
+FIELDS = ("price", "market_cap", "change24h", "rank")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    asset_id   TEXT    NOT NULL,
+    ts         INTEGER NOT NULL,
+    price      REAL,
+    market_cap REAL,
+    change24h  REAL,
+    rank       INTEGER,
+    PRIMARY KEY (asset_id, ts)
+) WITHOUT ROWID;
+-- 시각 범위 조회용 (rolling.py가 새로 기간 밖으로 나간 포인트만 읽을 때, 다운샘플링)
+CREATE INDEX IF NOT EXISTS points_ts ON points (ts);
+CREATE TABLE IF NOT EXISTS assets (
+    asset_id TEXT PRIMARY KEY,
+    name     TEXT,
+    symbol   TEXT,
+    type     TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def connect(path=HISTORY_PATH):
+    """저장소 열기 (없으면 생성)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def to_timestamp(value):
+    """ISO 문자열/datetime/숫자 → UTC 초"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def append_snapshot(conn, assets, ts):
+    """한 번의 실행 결과 추가 (assets는 시가총액 순 정렬 상태, 같은 시각 재실행은 덮어씀)
+
+    순위는 marketCapRank(롱테일을 뺀 목록에서도 전체 순위)가 있으면 그 값, 없으면 목록 위치.
+    """
+    ts = to_timestamp(ts)
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (asset["id"], ts, asset.get("price"), asset.get("marketCap"), asset.get("change24h"),
+                 asset.get("marketCapRank", rank))
+                for rank, asset in enumerate(assets, 1)
+                if "asOf" not in asset  # 이번에 관측하지 않은 값(마지막 정상 값)은 기록하지 않음
+            ],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+            [(asset["id"], asset.get("name"), asset.get("symbol"), asset.get("type")) for asset in assets],
+        )
+    return ts
+
+
+def compact(conn, now=None, force=False):
+    """오래된 포인트 다운샘플링 (COMPACT_INTERVAL마다 한 번), 삭제한 행 수 반환"""
+    now = to_timestamp(now if now is not None else time.time())
+    row = conn.execute("SELECT value FROM meta WHERE key = 'lastCompacted'").fetchone()
+    if not force and row and now - int(row[0]) < COMPACT_INTERVAL:
+        return 0
+
+    deleted = 0
+    with conn:
+        for age, bucket in DOWNSAMPLE_TIERS:
+            cutoff = now - age
+            # 같은 버킷 안에 더 늦은 포인트가 있으면 삭제 (기본 키 범위 탐색 한 번)
+            deleted += conn.execute(
+                """
+                DELETE FROM points
+                WHERE ts < :cutoff
+                  AND EXISTS (
+                      SELECT 1 FROM points AS later
+                      WHERE later.asset_id = points.asset_id
+                        AND later.ts > points.ts
+                        AND later.ts < MIN(:cutoff, (points.ts / :bucket + 1) * :bucket)
+                  )
+                """,
+                {"cutoff": cutoff, "bucket": bucket},
+            ).rowcount
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('lastCompacted', ?)", (str(now),))
+
+    if deleted:
+        conn.execute("VACUUM")
+    return deleted
+
+
+def series(conn, asset_id, start, end, field="market_cap"):
+    """자산 하나의 [start, end] 구간 (시각, 값) 목록"""
+    if field not in FIELDS:
+        raise ValueError(f"알 수 없는 필드: {field}")
+    return conn.execute(
+        f"SELECT ts, {field} FROM points WHERE asset_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+        (asset_id, to_timestamp(start), to_timestamp(end)),
+    ).fetchall()
+
+
+def market_cap_between(conn, asset_id, start, end):
+    """자산 하나의 [start, end] 구간 시가총액 (시각, 시가총액) 목록"""
+    return series(conn, asset_id, start, end, "market_cap")
+
+
+def main():
+    """명령행 조회"""
+    parser = argparse.ArgumentParser(description="시세 히스토리 조회")
+    parser.add_argument("asset_id")
+    parser.add_argument("start", help="시작 (ISO 날짜/시각)")
+    parser.add_argument("end", help="끝 (ISO 날짜/시각)")
+    parser.add_argument("--field", default="market_cap", choices=FIELDS)
+    parser.add_argument("--db", default=HISTORY_PATH, type=Path)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    started = time.perf_counter()
+    rows = series(conn, args.asset_id, args.start, args.end, args.field)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for ts, value in rows:
+        print(f"{datetime.fromtimestamp(ts, timezone.utc).isoformat()}  {value}")
+    print(f"📊 {len(rows)}개 포인트 ({elapsed:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
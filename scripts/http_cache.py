@@ -0,0 +1,134 @@
+"""
+디스크 HTTP 응답 캐시
+- URL + 파라미터 기준 키
+- 엔드포인트별 TTL, ETag/Last-Modified 조건부 재검증
+- 전체 용량 제한 (가장 오래 사용하지 않은 항목부터 삭제)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlparse
+
+# 엔드포인트(경로 일부)별 TTL (초)
+ENDPOINT_TTLS = {
+    "/coins/markets": 300,
+    "/simple/price": 300,
+    "/api/v3/quote": 900,
+}
+DEFAULT_TTL = 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# 재검증/응답 복원에 필요한 헤더만 저장
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def ttl_for(url):
+    """URL 경로에 맞는 TTL 반환"""
+    path = urlparse(url).path
+    for fragment, ttl in ENDPOINT_TTLS.items():
+        if fragment in path:
+            return ttl
+    return DEFAULT_TTL
+
+
+def cache_key(url, params=None):
+    """URL과 파라미터(순서 무관)로 캐시 키 생성"""
+    query = urlencode(sorted((params or {}).items()))
+    return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """URL + 파라미터 기준 디스크 응답 캐시
+
+    항목마다 메타데이터(<key>.json)와 본문(<key>.body)을 저장하고,
+    메타데이터 파일의 수정 시각을 마지막 사용 시각으로 써서 LRU 삭제에 활용한다.
+    refresh=True면 저장된 항목을 읽지 않고 새로 받아 덮어쓴다.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, refresh=False):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def lookup(self, url, params=None):
+        """저장된 항목 반환: (메타데이터, 본문, 신선 여부) 또는 None"""
+        if self.refresh:
+            return None
+        meta_path, body_path = self._paths(cache_key(url, params))
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+
+        os.utime(meta_path)  # LRU 사용 시각 갱신
+        fresh = time.time() - meta["storedAt"] < ttl_for(url)
+        return meta, body, fresh
+
+    def revalidation_headers(self, meta):
+        """조건부 요청 헤더 (If-None-Match / If-Modified-Since)"""
+        headers = {}
+        if meta["headers"].get("ETag"):
+            headers["If-None-Match"] = meta["headers"]["ETag"]
+        if meta["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+        return headers
+
+    def store(self, url, params, status, headers, body):
+        """응답 저장 후 용량 초과분 정리"""
+        key = cache_key(url, params)
+        meta = {
+            "url": url.split("?")[0],  # 쿼리의 API 키는 저장하지 않음
+            "status": status,
+            "headers": {name: headers[name] for name in STORED_HEADERS if name in headers},
+            "storedAt": time.time(),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._paths(key)
+        _atomic_write(body_path, body)
+        _atomic_write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        self.evict()
+
+    def touch(self, url, params, meta):
+        """304 응답: 본문은 그대로 두고 저장 시각만 갱신"""
+        meta = dict(meta, storedAt=time.time())
+        meta_path, _ = self._paths(cache_key(url, params))
+        _atomic_write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래 쓰지 않은 항목 삭제"""
+        with self._lock:
+            entries = []
+            total = 0
+            for meta_path in self.directory.glob("*.json"):
+                body_path = meta_path.with_suffix(".body")
+                try:
+                    size = meta_path.stat().st_size + body_path.stat().st_size
+                    last_used = meta_path.stat().st_mtime
+                except OSError:
+                    continue
+                entries.append((last_used, size, meta_path, body_path))
+                total += size
+
+            entries.sort()
+            for _, size, meta_path, body_path in entries:
+                if total <= self.max_bytes:
+                    break
+                meta_path.unlink(missing_ok=True)
+                body_path.unlink(missing_ok=True)
+                total -= size
+
+
+def _atomic_write(path, data):
+    """임시 파일에 쓴 뒤 교체"""
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
@@ -0,0 +1,271 @@
+"""
+HTTP 요청 헬퍼
+- 공유 세션 (keep-alive 연결 풀, 호스트별 연결 수 제한)
+- 호스트별 토큰 버킷 rate limit
+- 일시적 오류는 지터를 섞은 지수 백오프로 재시도, 429는 Retry-After 만큼 대기
+- 디스크 응답 캐시 (http_cache) 연동
+- 현재 스레드에 걸린 실행 예산(deadline.Budget) 안으로 대기/타임아웃 제한, 서킷 브레이커 탐색 요청은 재시도 없음
+- 요청/재시도/연결 재사용 카운터 (metrics 단계별 지표에도 기록)
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import deadline
+import metrics
+
+# 호스트별 (초당 요청 수, 최대 버스트)
+# CoinGecko 무료 티어는 30 calls/min: 버스트 3 + 분당 27회로 어떤 1분 구간도 30회를 넘지 않음
+HOST_LIMITS = {
+    "api.coingecko.com": (27 / 60, 3),
+    "financialmodelingprep.com": (1.0, 1),
+}
+DEFAULT_LIMIT = (None, 1)  # 제한 없음
+
+MAX_CONNECTIONS_PER_HOST = 4
+
+# 재시도 (연결 오류, 타임아웃, 5xx, 429)
+MAX_RETRIES = 3
+RETRY_STATUSES = {500, 502, 503, 504}
+BACKOFF_BASE = 0.5  # 첫 재시도 최대 대기 (초), 시도마다 2배
+BACKOFF_MAX = 8.0
+DEFAULT_RETRY_AFTER = 60  # Retry-After 헤더가 없을 때 대기 시간 (초)
+
+
+class TokenBucket:
+    """토큰 버킷 방식의 스레드 안전 rate limiter
+
+    rate는 초당 충전되는 토큰 수(None이면 제한 없음), capacity는 최대 버스트 크기.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def acquire(self, budget=None):
+        """토큰 하나를 얻을 때까지 대기 (budget의 남은 시간보다 오래 기다려야 하면 DeadlineExceeded)"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self.rate is None:
+                    return
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            if budget is not None:
+                budget.check(delay)
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """지정한 시간 동안 요청 중단 (중단 중에는 토큰도 충전되지 않음)"""
+        with self._lock:
+            resume_at = time.monotonic() + seconds
+            self._paused_until = max(self._paused_until, resume_at)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# 응답 캐시 (http_cache.ResponseCache, None이면 사용 안 함)
+cache = None
+
+_session = None
+_session_lock = threading.Lock()
+
+_counters = {"requests": 0, "retries": 0, "cacheHits": 0, "bytesIn": 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _counters_lock:
+        _counters[name] += amount
+    metrics.count(name, amount)
+
+
+def create_session(max_connections_per_host=MAX_CONNECTIONS_PER_HOST):
+    """keep-alive 연결 풀을 쓰는 세션 생성 (호스트별 연결 수 초과 시 대기)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=max_connections_per_host, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """모든 수집 함수가 공유하는 기본 세션"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def get_stats(session=None):
+    """요청/재시도/캐시 적중 횟수와 연결 풀의 새 연결/재사용 횟수"""
+    session = session or get_session()
+    with _counters_lock:
+        stats = dict(_counters)
+
+    new_connections = pooled_requests = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            new_connections += pool.num_connections
+            pooled_requests += pool.num_requests
+
+    stats["newConnections"] = new_connections
+    stats["reusedConnections"] = max(0, pooled_requests - new_connections)
+    return stats
+
+
+def get_limiter(host):
+    """호스트별 리미터 반환 (없으면 생성)"""
+    with _limiters_lock:
+        if host not in _limiters:
+            rate, capacity = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+            _limiters[host] = TokenBucket(rate, capacity)
+        return _limiters[host]
+
+
+def retry_after_seconds(response):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+def _cached_response(url, meta, body):
+    """캐시 항목을 requests.Response로 복원"""
+    response = requests.Response()
+    response.status_code = meta["status"]
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response._content = body
+    response.url = url
+    response.encoding = "utf-8"
+    response.elapsed = timedelta(0)
+    response.from_cache = True
+    return response
+
+
+def backoff_delay(attempt):
+    """지수 백오프 + full jitter: 0 ~ min(BACKOFF_MAX, BACKOFF_BASE * 2^attempt)"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _send(session, url, params, timeout, headers=None, budget=None, retries=MAX_RETRIES):
+    """호스트 rate limit을 지키며 GET 요청 (일시적 오류와 429는 재시도, budget이 있으면 대기/타임아웃을 남은 시간 안으로)"""
+    host = urlparse(url).hostname
+    limiter = get_limiter(host)
+
+    for attempt in range(retries + 1):
+        limiter.acquire(budget)
+        request_timeout = budget.timeout(timeout) if budget is not None else timeout
+        _count("requests")
+        last_attempt = attempt == retries
+
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=request_timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last_attempt:
+                raise
+            delay = backoff_delay(attempt)
+            message = f"🔁 {host} 연결 오류 - {delay:.1f}초 후 재시도 ({attempt + 1}/{retries}): {e}"
+        else:
+            if last_attempt or (response.status_code != 429 and response.status_code not in RETRY_STATUSES):
+                _count("bytesIn", len(response.content))
+                return response
+            response.close()
+
+            if response.status_code == 429:
+                pause = retry_after_seconds(response)
+                message = f"⏳ {host} 요청 한도 초과(429) - {pause:.0f}초 후 재시도"
+                limiter.pause(pause)  # 같은 호스트의 다른 요청도 함께 대기 (예산은 다음 acquire에서 확인)
+                delay = 0
+            else:
+                delay = backoff_delay(attempt)
+                message = f"🔁 {host} {response.status_code} 응답 - {delay:.1f}초 후 재시도 ({attempt + 1}/{retries})"
+
+        if budget is not None:
+            budget.check(delay)
+        print(message)
+        _count("retries")
+        time.sleep(delay)
+
+
+def _request(session, url, params, timeout, headers=None):
+    """현재 스레드의 예산(없으면 제한 없음) 안에서 GET 요청하고 성공/실패를 예산에 기록
+
+    서킷 브레이커 탐색 요청은 재시도하지 않는다.
+    """
+    budget = deadline.current()
+    if budget is None:
+        return _send(session, url, params, timeout, headers)
+
+    probe = budget.start()
+    try:
+        response = _send(session, url, params, timeout, headers, budget, retries=0 if probe else MAX_RETRIES)
+    except Exception:
+        budget.finish(False, probe)
+        raise
+    budget.finish(response.status_code != 429 and response.status_code < 500, probe)
+    return response
+
+
+def get(url, params=None, timeout=30, session=None):
+    """GET 요청 (캐시가 켜져 있으면 TTL 안의 응답은 네트워크 없이 반환)"""
+    session = session or get_session()
+    if cache is None:
+        return _request(session, url, params, timeout)
+
+    cached = cache.lookup(url, params)
+    if cached:
+        meta, body, fresh = cached
+        if fresh:
+            _count("cacheHits")
+            return _cached_response(url, meta, body)
+
+        response = _request(session, url, params, timeout, headers=cache.revalidation_headers(meta))
+        if response.status_code == 304:
+            _count("cacheHits")
+            cache.touch(url, params, meta)
+            return _cached_response(url, meta, body)
+    else:
+        response = _request(session, url, params, timeout)
+
+    if response.status_code == 200:
+        cache.store(url, params, response.status_code, response.headers, response.content)
+    return response
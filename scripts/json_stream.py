@@ -0,0 +1,134 @@
+"""
+자산 JSON 스트리밍 쓰기/읽기
+- 자산 하나를 한 줄로 쓰는 JSON (전체 문서는 그대로 유효한 JSON)
+    {"lastUpdated":"...","assets":[
+    {...자산 1...},
+    {...자산 2...}
+    ],"totalAssets":2}
+- 전체 문서를 메모리에 문자열로 만들지 않고 자산 단위로 직렬화 → 임시 파일에 쓴 뒤 교체 (원자적)
+- orjson이 설치돼 있으면 사용, 없으면 표준 json (C 인코더 경로)
+  두 백엔드의 출력은 바이트 단위로 같음 (실수 표기가 다를 수 있는 문서만 표준 json으로, 숫자 키는 문자열로)
+- 읽기는 줄 단위로 자산을 하나씩 돌려줌 (다른 형식의 파일은 json.load로 읽음)
+"""
+
+import json
+import re
+from array import array
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+ASSETS_OPEN = ',"assets":['
+ASSETS_CLOSE = "],"
+
+# orjson 출력에서 표준 json(repr)과 표기가 다를 수 있는 실수
+# 지수 표기 (7.14e-6 ↔ 7.14e-06, 1e16 ↔ 1e+16), 0.0000x (0.00001 ↔ 1e-05)
+_EXPONENT = re.compile(rb"e(?<=\de)-?\d")  # 'e'로 시작해야 빠르게 찾음 (change7d 같은 키는 제외)
+_SMALL = re.compile(rb"\.0000\d")
+
+
+def _default(value):
+    """기본 타입이 아닌 값 (Asset 레코드, array 버퍼)"""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, array):
+        return value.tolist()
+    raise TypeError(f"JSON으로 쓸 수 없는 타입: {type(value).__name__}")
+
+
+def dumps(value):
+    """공백 없는 UTF-8 JSON bytes (백엔드와 관계없이 같은 bytes)"""
+    if orjson:
+        raw = orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        if not _EXPONENT.search(raw) and not _SMALL.search(raw):
+            return raw
+        # 표기가 다를 수 있는 값이 있으면 (문자열 안일 수도 있음) 표준 json으로 다시 씀
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def loads(data):
+    """JSON bytes/str → 값"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class AssetWriter:
+    """자산을 받는 대로 한 줄씩 쓰는 writer (with 블록이 정상 종료되면 path를 교체)
+
+    with AssetWriter(path, last_updated) as writer:
+        for asset in assets:
+            writer.write(asset)
+    """
+
+    def __init__(self, path, last_updated):
+        self.path = Path(path)
+        self.last_updated = last_updated
+        self.tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.tmp_path, "wb")
+        self._file.write(b'{"lastUpdated":' + dumps(self.last_updated) + ASSETS_OPEN.encode())
+        return self
+
+    def write(self, asset):
+        self._file.write((b",\n" if self.count else b"\n") + dumps(asset))
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._file.write(b"\n" + ASSETS_CLOSE.encode() + b'"totalAssets":' + dumps(self.count) + b"}\n")
+            self._file.close()
+            if exc_type is None:
+                self.tmp_path.replace(self.path)
+        finally:
+            if exc_type is not None:
+                self.tmp_path.unlink(missing_ok=True)
+        return False
+
+
+def write_assets(path, last_updated, assets):
+    """assets(반복 가능한 객체)를 path에 원자적으로 저장, 쓴 자산 수 반환"""
+    with AssetWriter(path, last_updated) as writer:
+        for asset in assets:
+            writer.write(asset)
+    return writer.count
+
+
+def iter_assets(path):
+    """(lastUpdated, 자산 반복자) - 스트리밍 형식이면 줄 단위로 하나씩 파싱"""
+    f = open(path, "rb")
+    header = f.readline().rstrip(b"\r\n")
+    if not header.endswith(ASSETS_OPEN.encode()):
+        f.close()
+        with open(path, "rb") as f:
+            data = loads(f.read())
+        return data["lastUpdated"], iter(data["assets"])
+
+    last_updated = loads(header[:-len(ASSETS_OPEN)] + b"}")["lastUpdated"]
+
+    def records():
+        with f:
+            for line in f:
+                line = line.rstrip(b"\r\n")
+                if line.startswith(ASSETS_CLOSE.encode()):
+                    return
+                yield loads(line.rstrip(b","))
+
+    return last_updated, records()
+
+
+def load_assets(path):
+    """{"lastUpdated", "totalAssets", "assets"} 사전으로 전부 읽기"""
+    last_updated, assets = iter_assets(path)
+    assets = list(assets)
+    return {"lastUpdated": last_updated, "totalAssets": len(assets), "assets": assets}
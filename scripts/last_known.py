@@ -0,0 +1,175 @@
+"""
+마지막 정상 시세 캐시 (last-known-good)
+- 자산별로 마지막으로 실제 받은 값과 관측 시각을 data/.cache/last_known_good.json에 저장
+- 소스가 실패하면 하드코딩 값 대신 캐시 값을 쓰고, 관측 시각(asOf)을 붙여 나이를 표시
+- 유형별 MAX_AGE보다 오래된 값은 쓰지 않음 (순위에서 빠짐, 소스를 받을 수단이 없을 때는 max_age로 제한 해제)
+- 유형별 FRESH_FOR 안에 전부 받아 둔 소스는 요청 자체를 건너뜀
+- 캐시 파일이 없으면 직전 공개 결과(data/assets.json)로 시작 (seed_row로 예전 형식의 행을 정리)
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import json_stream
+import metrics
+from records import Asset
+
+# 자산 유형 → (FRESH_FOR, MAX_AGE) 초
+POLICIES = {
+    "crypto": (5 * 60, 3 * 86400),
+    "metal": (15 * 60, 7 * 86400),
+    "stock": (15 * 60, 7 * 86400),  # 주말/휴장 동안에도 마지막 종가 유지
+}
+DERIVED_FIELDS = ("asOf", "marketCapRank", "typeRank")  # 저장하지 않음 (매 실행 다시 계산)
+
+
+def to_iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def from_iso(value):
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _age_text(seconds):
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}분"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}시간"
+    return f"{seconds / 86400:.1f}일"
+
+
+class LastKnownGood:
+    """자산별 마지막 정상 값 (JSON 파일)
+
+    assets: {자산 id: {"observedAt": 관측 시각(초), "asset": 자산 dict}}
+    sources: {자산 유형: {"fetchedAt": 마지막 완전 수집 시각, "signature": 요청 조건, "ids": [자산 id]}}
+    """
+
+    def __init__(self, path, seed_path=None, force=False, seed_row=None):
+        self.path = Path(path)
+        self.force = force  # True면 FRESH_FOR와 관계없이 항상 수집
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        if data is None:
+            data = self._seed(seed_path, seed_row) if seed_path else {}
+        self.assets = data.get("assets", {})
+        self.sources = data.get("sources", {})
+        self._lock = threading.Lock()  # 마감 뒤에 끝난 소스 스레드가 저장 중인 내용을 바꾸지 않도록
+
+    @staticmethod
+    def _seed(path, seed_row=None):
+        """직전 공개 결과를 관측 시각과 함께 캐시로 (소스는 모두 만료 상태)
+
+        seed_row: 행 → 캐시할 자산 dict (None이면 제외), 지금과 형식이 다른 예전 행을 정리할 때.
+        """
+        try:
+            last_updated, records = json_stream.iter_assets(path)
+            rows = list(records)
+        except (OSError, ValueError, KeyError):
+            return {}
+        published = from_iso(last_updated)
+        assets = {}
+        sources = {}
+        for row in rows:
+            observed = from_iso(row["asOf"]) if row.get("asOf") else published
+            if seed_row is not None:
+                row = seed_row(row)
+                if row is None:
+                    continue
+            assets[row["id"]] = {"observedAt": observed, "asset": row}
+            sources.setdefault(row["type"], {"fetchedAt": 0, "signature": None, "ids": []})["ids"].append(row["id"])
+        return {"assets": assets, "sources": sources}
+
+    def is_fresh(self, asset_type, signature=None, now=None):
+        """FRESH_FOR 안에 같은 조건으로 전부 받아 둔 소스인지"""
+        now = now if now is not None else time.time()
+        source = self.sources.get(asset_type)
+        if self.force or not source or source.get("signature") != signature:
+            return False
+        return now - source["fetchedAt"] < POLICIES[asset_type][0]
+
+    def cached(self, asset_type, ids, now=None, max_age=None):
+        """ids의 캐시 값 (asOf 표시, max_age(기본 MAX_AGE)보다 오래된 값은 제외) → (자산 목록, 제외한 id 목록)"""
+        now = now if now is not None else time.time()
+        max_age = POLICIES[asset_type][1] if max_age is None else max_age
+        assets, expired = [], []
+        for asset_id in ids:
+            entry = self.assets.get(asset_id)
+            if entry is None:
+                continue
+            if now - entry["observedAt"] > max_age:
+                expired.append(asset_id)
+                continue
+            row = {key: value for key, value in entry["asset"].items() if key not in DERIVED_FIELDS}
+            assets.append(Asset(**row, asOf=to_iso(entry["observedAt"])))
+        return assets, expired
+
+    def fetch(self, asset_type, func, signature=None, per_asset=False, now=None, max_age=None):
+        """소스 하나를 캐시와 함께 수집
+
+        FRESH_FOR 안이면 func를 부르지 않고 캐시 값을 돌려준다.
+        실패로 빠진 자산은 캐시 값으로 채운다: per_asset=True면 직전 목록에서 빠진 자산마다,
+        아니면(목록 전체를 한 번에 받는 소스) 결과가 비었을 때만.
+        max_age: 캐시 값 최대 나이 (기본 유형별 MAX_AGE, math.inf면 제한 없음 - 예: API 키가 없는 소스)
+        """
+        now = now if now is not None else time.time()
+        max_age = POLICIES[asset_type][1] if max_age is None else max_age
+        previous = self.sources.get(asset_type, {}).get("ids", [])
+        if self.is_fresh(asset_type, signature, now):
+            age = now - self.sources[asset_type]["fetchedAt"]
+            print(f"⏭️ {asset_type} {_age_text(age)} 전 수집 결과 사용 - 요청 건너뜀")
+            return self.cached(asset_type, previous, now, max_age)[0]
+
+        live = func()
+        received = {asset["id"] for asset in live}
+        missing = [asset_id for asset_id in previous if asset_id not in received] if per_asset or not live else []
+        served = self._serve(asset_type, missing, now, max_age)
+        if live and not missing:
+            with self._lock:
+                self.sources[asset_type] = {"fetchedAt": now, "signature": signature,
+                                            "ids": [asset["id"] for asset in live]}
+        return live + served
+
+    def fallback(self, asset_type, now=None, max_age=None):
+        """소스가 마감 안에 끝나지 않았을 때 직전 목록 전체의 캐시 값"""
+        now = now if now is not None else time.time()
+        max_age = POLICIES[asset_type][1] if max_age is None else max_age
+        return self._serve(asset_type, self.sources.get(asset_type, {}).get("ids", []), now, max_age)
+
+    def _serve(self, asset_type, ids, now, max_age):
+        """ids의 캐시 값 (사용/제외한 개수 출력)"""
+        served, expired = self.cached(asset_type, ids, now, max_age)
+        if served:
+            oldest = max(now - from_iso(asset["asOf"]) for asset in served)
+            print(f"♻️ {asset_type} {len(served)}개 마지막 정상 값 사용 (최대 {_age_text(oldest)} 전)")
+            metrics.count("fallbacks", len(served))
+        if expired:
+            print(f"⚠️ {asset_type} {len(expired)}개는 {_age_text(max_age)}보다 오래돼 제외: {', '.join(expired[:5])}")
+        return served
+
+    def record(self, assets, now=None):
+        """이번에 받은 값 저장 (asOf가 있는 값은 그 관측 시각으로, 더 최신일 때만)"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            for asset in assets:
+                observed = from_iso(asset["asOf"]) if "asOf" in asset else now
+                entry = self.assets.get(asset["id"])
+                if entry is not None and entry["observedAt"] >= observed:
+                    continue
+                row = {key: value for key, value in asset.to_dict().items() if key not in DERIVED_FIELDS}
+                self.assets[asset["id"]] = {"observedAt": observed, "asset": row}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with self._lock:
+            data = json.dumps({"assets": self.assets, "sources": self.sources}, ensure_ascii=False,
+                              separators=(",", ":"))
+        tmp_path.write_text(data, encoding="utf-8")
+        tmp_path.replace(self.path)
@@ -0,0 +1,253 @@
+"""
+로고 스프라이트 아틀라스
+- 자산 로고를 한 번만 받아 내용 해시 이름의 32px 타일로 data/.cache/logos/에 저장 (같은 로고는 한 타일)
+- 타일을 한 장의 스프라이트(WebP, Pillow가 WebP를 지원하지 않으면 PNG)로 묶고 자산 id → 칸 번호 맵 생성
+- 페이지는 행마다 로고를 요청하지 않고 CSS background-position으로 스프라이트의 한 칸을 표시
+- 로고 원본: logo_dir를 주면 그 폴더의 <자산 id>.<png|webp|jpg|jpeg|gif>만 (네트워크 없이),
+  아니면 LOGO_BASE 환경 변수({LOGO_BASE}/<자산 id>.png, 예: scripts/mock_api.py 대역 서버) 또는 자산의 image URL
+- 받은 로고는 LOGO_TTL 동안, 받지 못한 로고는 RETRY_AFTER 동안 다시 요청하지 않음 (페이지는 기존처럼 <img>)
+- 다운로드는 LOGO_BUDGET초 안에서만 (남은 로고는 다음 빌드에서)
+- Pillow가 없으면 아틀라스를 만들지 않음
+"""
+
+import hashlib
+import io
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import deadline
+import http_client
+import metrics
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow는 선택 사항
+    Image = None
+
+LOGO_SIZE = 32
+CACHE_DIR = Path(__file__).parent.parent / "data" / ".cache" / "logos"
+LOGO_TTL = 30 * 86400  # 받은 로고를 다시 받기까지 (초)
+RETRY_AFTER = 86400  # 받지 못한 로고를 다시 시도하기까지 (초)
+LOGO_BUDGET = 60  # 빌드 한 번의 다운로드 시간 예산 (초)
+LOGO_TIMEOUT = 10
+MAX_WORKERS = 8
+LOCAL_SUFFIXES = (".png", ".webp", ".jpg", ".jpeg", ".gif")
+WEBP_QUALITY = 90
+
+# 대역 서버 주소 (설정하면 image URL 대신 {LOGO_BASE}/<자산 id>.png)
+LOGO_BASE = os.environ.get("LOGO_BASE")
+
+
+def available():
+    return Image is not None
+
+
+def to_tile(raw, size=LOGO_SIZE):
+    """이미지 bytes → 가운데 맞춘 size×size RGBA PNG bytes (이미지가 아니면 OSError/ValueError)"""
+    with Image.open(io.BytesIO(raw)) as image:
+        image = image.convert("RGBA")
+        image.thumbnail((size, size), Image.LANCZOS)
+        tile = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        tile.paste(image, ((size - image.width) // 2, (size - image.height) // 2))
+    out = io.BytesIO()
+    tile.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+class LogoCache:
+    """다운로드 기록 (index.json) + 내용 해시별 타일 (<해시>.png)
+
+    index: {원본 URL: {"hash": 원본 내용 SHA-256 (실패면 None), "fetchedAt": 시각}}
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.dir = Path(cache_dir)
+        self.index_path = self.dir / "index.json"
+        try:
+            self.index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.index = {}
+
+    def tile_path(self, digest):
+        return self.dir / f"{digest}.png"
+
+    def store(self, raw):
+        """원본 bytes의 타일 저장 (이미 있으면 그대로) → 내용 해시"""
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self.tile_path(digest)
+        if not path.exists():
+            self.dir.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(to_tile(raw))
+        return digest
+
+    def cached(self, url, now):
+        """(재사용할 타일 해시 또는 None, 다시 받아야 하는지)"""
+        entry = self.index.get(url)
+        if entry is None:
+            return None, True
+        digest = entry["hash"]
+        if digest is None:
+            return None, now - entry["fetchedAt"] >= RETRY_AFTER
+        if not self.tile_path(digest).exists():
+            return None, True
+        return digest, now - entry["fetchedAt"] >= LOGO_TTL
+
+    def save(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.tmp")
+        tmp_path.write_text(json.dumps(self.index, separators=(",", ":")), encoding="utf-8")
+        tmp_path.replace(self.index_path)
+
+
+def _local_file(logo_dir, asset_id):
+    for suffix in LOCAL_SUFFIXES:
+        path = Path(logo_dir) / f"{asset_id}{suffix}"
+        if path.is_file():
+            return path
+    return None
+
+
+def logo_url(asset):
+    if LOGO_BASE:
+        return f"{LOGO_BASE.rstrip('/')}/{asset['id']}.png"
+    return asset.get("image")
+
+
+def _download(url):
+    """로고 원본 bytes (실패하면 None, 예산이 끝났으면 DeadlineExceeded)"""
+    try:
+        response = http_client.get(url, timeout=LOGO_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+    except deadline.DeadlineExceeded:
+        raise
+    except Exception as e:
+        print(f"  ⚠️ 로고 받기 실패: {url} ({e})")
+        return None
+
+
+def collect_tiles(assets, logo_dir=None, cache=None, budget=LOGO_BUDGET, now=None):
+    """자산 id → 타일 해시 (로고가 없거나 받지 못한 자산은 빠짐, logo_dir가 있으면 다운로드하지 않음)"""
+    cache = cache or LogoCache()
+    now = now if now is not None else time.time()
+    tiles = {}
+    pending = {}  # URL → [자산 id]
+
+    for asset in assets:
+        if logo_dir:
+            path = _local_file(logo_dir, asset["id"])
+            if path is None:
+                continue
+            try:
+                tiles[asset["id"]] = cache.store(path.read_bytes())
+            except (OSError, ValueError) as e:
+                print(f"  ⚠️ 로고 파일을 읽을 수 없음: {path} ({e})")
+            continue
+        url = logo_url(asset)
+        if not url:
+            continue
+        digest, stale = cache.cached(url, now)
+        if digest is not None:
+            tiles[asset["id"]] = digest
+        if stale:
+            pending.setdefault(url, []).append(asset["id"])
+
+    if pending:
+        print(f"🖼️ 로고 {len(pending)}개 받는 중...")
+
+        def fetch(url):
+            try:
+                return url, _download(url)
+            except deadline.DeadlineExceeded:
+                return url, False  # 이번 빌드에서는 건너뜀 (기록하지 않음)
+
+        with deadline.scope(deadline.Budget("logos", budget)):
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                results = list(executor.map(metrics.bind(deadline.bind(fetch)), pending))
+
+        skipped = 0
+        for url, raw in results:
+            if raw is False:
+                skipped += 1
+                continue
+            digest = None
+            if raw is not None:
+                try:
+                    digest = cache.store(raw)
+                except (OSError, ValueError) as e:  # 이미지가 아님
+                    print(f"  ⚠️ 로고 이미지를 읽을 수 없음: {url} ({e})")
+            cache.index[url] = {"hash": digest, "fetchedAt": now}
+            if digest is not None:
+                for asset_id in pending[url]:
+                    tiles[asset_id] = digest
+        if skipped:
+            print(f"  ⌛ 예산 {budget}초 초과 - 로고 {skipped}개는 다음 빌드에서")
+        cache.save()
+    return tiles
+
+
+def build_atlas(tiles, out_dir, cache=None, size=LOGO_SIZE):
+    """타일을 한 장으로 묶어 out_dir/logos.<해시>.<webp|png>에 저장
+
+    칸 순서는 타일 해시 순 (자산 순위가 바뀌어도 같은 로고 집합이면 같은 파일).
+    {"file": 파일 이름, "size", "columns", "width", "height", "cells": {자산 id: 칸 번호}} 반환 (타일이 없으면 None).
+    """
+    if not tiles:
+        return None
+    cache = cache or LogoCache()
+    digests = sorted(set(tiles.values()))
+    columns = math.ceil(math.sqrt(len(digests)))
+    rows = math.ceil(len(digests) / columns)
+    atlas = Image.new("RGBA", (columns * size, rows * size), (0, 0, 0, 0))
+    for cell, digest in enumerate(digests):
+        with Image.open(cache.tile_path(digest)) as tile:
+            atlas.paste(tile, ((cell % columns) * size, (cell // columns) * size))
+
+    out = io.BytesIO()
+    if features.check("webp"):
+        atlas.save(out, "WEBP", quality=WEBP_QUALITY, method=6)
+        suffix = "webp"
+    else:
+        atlas.save(out, "PNG", optimize=True)
+        suffix = "png"
+    raw = out.getvalue()
+    name = f"logos.{hashlib.sha256(raw).hexdigest()[:12]}.{suffix}"
+    path = Path(out_dir) / name
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(raw)
+        metrics.count_file(path)
+
+    cell_of = {digest: cell for cell, digest in enumerate(digests)}
+    return {
+        "file": name,
+        "size": size,
+        "columns": columns,
+        "width": atlas.width,
+        "height": atlas.height,
+        "cells": {asset_id: cell_of[digest] for asset_id, digest in sorted(tiles.items())},
+    }
+
+
+def prune(out_dir, keep):
+    """out_dir의 logos.* 중 keep(파일 이름)에 없는 아틀라스 삭제"""
+    for path in Path(out_dir).glob("logos.*"):
+        if path.name not in keep:
+            path.unlink()
+
+
+def build(assets, out_dir, logo_dir=None, cache_dir=CACHE_DIR, budget=LOGO_BUDGET):
+    """로고 수집 + 아틀라스 생성 (Pillow가 없거나 로고가 하나도 없으면 None)"""
+    if not available():
+        print("⚠️ Pillow 없음 - 로고 스프라이트를 만들지 않음 (행마다 로고 이미지 요청)")
+        return None
+    cache = LogoCache(cache_dir)
+    tiles = collect_tiles(assets, logo_dir, cache, budget)
+    atlas = build_atlas(tiles, out_dir, cache)
+    if atlas:
+        print(f"🖼️ 로고 스프라이트: {len(atlas['cells'])}개 자산, {atlas['width']}x{atlas['height']} → {atlas['file']}")
+    return atlas
@@ -0,0 +1,166 @@
+"""
+실행 지표 기록
+- 단계별 실행 시간, HTTP 요청/재시도/캐시 적중, 받은/쓴 바이트, 폴백 사용, 예산 초과, 자산 수
+- 카운터는 현재 스레드의 단계에 더해짐 (동시에 수집하는 소스도 소스별로 집계)
+- data/metrics/run_metrics.json (스크립트별 마지막 실행), run_metrics.prom (Prometheus textfile),
+  history.jsonl (최근 HISTORY_LIMIT회 실행)
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+METRICS_DIR = Path(__file__).parent.parent / "data" / "metrics"
+HISTORY_LIMIT = 1000
+PROMETHEUS_PREFIX = "marketcap"
+
+COUNTERS = ("requests", "retries", "cacheHits", "bytesIn", "bytesOut", "fallbacks", "deadlineExceeded")
+
+# Prometheus 지표 이름 → (단계 필드, 설명)
+PROMETHEUS_METRICS = {
+    "stage_duration_seconds": ("seconds", "단계 실행 시간"),
+    "stage_http_requests": ("requests", "HTTP 요청 수 (재시도 포함)"),
+    "stage_http_retries": ("retries", "HTTP 재시도 수"),
+    "stage_cache_hits": ("cacheHits", "HTTP 캐시 적중 수"),
+    "stage_bytes_in": ("bytesIn", "네트워크로 받은 바이트"),
+    "stage_bytes_out": ("bytesOut", "파일로 쓴 바이트"),
+    "stage_fallbacks": ("fallbacks", "폴백 데이터 사용 횟수"),
+    "stage_deadline_exceeded": ("deadlineExceeded", "실행 예산 부족으로 중단한 요청 수"),
+    "stage_assets": ("assets", "단계가 만든 자산 수"),
+}
+
+_local = threading.local()
+_lock = threading.Lock()
+_stages = []
+_started = time.time()
+
+
+@contextmanager
+def stage(name):
+    """이 블록(현재 스레드)의 시간과 카운터를 name 단계로 기록"""
+    record = {"name": name, "seconds": 0.0}
+    record.update((counter, 0) for counter in COUNTERS)
+    previous = getattr(_local, "stage", None)
+    _local.stage = record
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        _local.stage = previous
+        with _lock:
+            _stages.append(record)
+
+
+def bind(func):
+    """현재 스레드의 단계를 다른 스레드(스레드 풀 작업)에서도 쓰도록 func 감싸기 (카운터가 같은 단계에 더해짐)"""
+    record = getattr(_local, "stage", None)
+
+    def run(*args, **kwargs):
+        previous = getattr(_local, "stage", None)
+        _local.stage = record
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.stage = previous
+
+    return run
+
+
+def count(name, amount=1):
+    """현재 스레드 단계의 카운터 증가 (단계 밖이면 무시)"""
+    record = getattr(_local, "stage", None)
+    if record is not None:
+        with _lock:
+            record[name] = record.get(name, 0) + amount
+
+
+def count_file(path):
+    """쓴 파일 크기를 bytesOut에 더함"""
+    count("bytesOut", Path(path).stat().st_size)
+
+
+def reset():
+    """기록 초기화 (한 프로세스에서 여러 번 실행할 때)"""
+    global _started
+    with _lock:
+        _stages.clear()
+        _started = time.time()
+
+
+def snapshot(script):
+    """지금까지 기록한 단계로 실행 요약 생성"""
+    with _lock:
+        stages = [dict(record) for record in _stages]
+    totals = {counter: sum(record.get(counter, 0) for record in stages) for counter in COUNTERS}
+    return {
+        "script": script,
+        "startedAt": datetime.fromtimestamp(_started, timezone.utc).isoformat(),
+        "seconds": round(time.time() - _started, 4),
+        "totals": totals,
+        "stages": stages,
+    }
+
+
+def _prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(runs):
+    """{script: 실행 요약} → Prometheus textfile 형식"""
+    lines = []
+    for metric, (field, help_text) in PROMETHEUS_METRICS.items():
+        name = f"{PROMETHEUS_PREFIX}_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for script, run in sorted(runs.items()):
+            for record in run["stages"]:
+                if field in record:
+                    labels = f'script="{_prometheus_label(script)}",stage="{_prometheus_label(record["name"])}"'
+                    lines.append(f"{name}{{{labels}}} {record[field]}")
+
+    for metric, help_text, value in (
+        ("run_duration_seconds", "전체 실행 시간", lambda run: run["seconds"]),
+        ("run_started_timestamp_seconds", "실행 시작 시각", lambda run: datetime.fromisoformat(run["startedAt"]).timestamp()),
+    ):
+        name = f"{PROMETHEUS_PREFIX}_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for script, run in sorted(runs.items()):
+            lines.append(f'{name}{{script="{_prometheus_label(script)}"}} {value(run)}')
+    return "\n".join(lines) + "\n"
+
+
+def _atomic_write_text(path, text):
+    """임시 파일에 쓴 뒤 교체 (textfile collector가 쓰다 만 파일을 읽지 않도록)"""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def write(script, directory=METRICS_DIR):
+    """실행 요약을 run_metrics.json / run_metrics.prom / history.jsonl에 기록"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    run = snapshot(script)
+
+    latest_path = directory / "run_metrics.json"
+    try:
+        runs = json.loads(latest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        runs = {}
+    runs[script] = run
+    _atomic_write_text(latest_path, json.dumps(runs, ensure_ascii=False, indent=2) + "\n")
+    _atomic_write_text(directory / "run_metrics.prom", to_prometheus(runs))
+
+    history_path = directory / "history.jsonl"
+    try:
+        lines = history_path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        lines = []
+    lines.append(json.dumps(run, ensure_ascii=False, separators=(",", ":")))
+    _atomic_write_text(history_path, "\n".join(lines[-HISTORY_LIMIT:]) + "\n")
+    return run
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+CoinGecko / FMP 로컬 대역 서버
+- /api/v3/coins/markets, /api/v3/simple/price, /api/v3/quote/<심볼,...> 응답
+- /logos/<자산 id>.png: 자산 id로 색을 정한 단색 PNG 로고 (LOGO_BASE=http://127.0.0.1:8765/logos)
+- 기본 응답은 data/assets.json에서 만들고, --fixtures로 --record 해 둔 실제 응답 재생
+- --assets N이면 기록된 암호화폐를 복제해 N개까지 확장 (시가총액 순서 유지)
+- 지연, 429(Retry-After), 타임아웃(응답 지연), 느린 본문(1초에 1바이트씩), 깨진 JSON을 확률로 주입
+
+사용법:
+  python scripts/mock_api.py --port 8765 --assets 5000 --latency 200 --rate-429 0.1
+  COINGECKO_API=http://127.0.0.1:8765/api/v3 FMP_API=http://127.0.0.1:8765/api/v3 FMP_API_KEY=mock \\
+      python scripts/fetch_data.py --no-cache --crypto-limit 5000
+  python scripts/mock_api.py --record scripts/fixtures   # 실제 API 응답 기록 (네트워크 필요)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+DATA_PATH = Path(__file__).parent.parent / "data" / "assets.json"
+FIXTURE_FILES = {
+    "markets": "coins_markets.json",
+    "simple": "simple_price.json",
+    "quote": "quote.json",
+}
+MOCK_FX_RATES = {"USDKRW": 1400.0, "USDSAR": 3.75}  # FMP 환율 시세 (1달러당 현지 통화)
+HANG_SECONDS = 60  # fetch_data의 요청 타임아웃(최대 30초)보다 길게
+TRICKLE_INTERVAL = 1.0  # 느린 본문의 바이트 간격 (초, 소켓 읽기 타임아웃보다 짧게)
+LOGO_PIXELS = 64  # 대역 로고 크기 (빌드에서 32px로 줄임)
+
+
+def logo_png(asset_id, size=LOGO_PIXELS):
+    """자산 id 해시로 색을 정한 size×size 단색 PNG bytes (Pillow 없이)"""
+    color = hashlib.sha256(asset_id.encode("utf-8")).digest()[:3]
+    rows = b"".join(b"\x00" + color * size for _ in range(size))  # 필터 0 + RGB
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)  # 8비트 RGB
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def fixtures_from_assets(path=DATA_PATH):
+    """data/assets.json → API 응답 형식 (markets 목록, simple/price 사전, quote 목록)"""
+    from fetch_data import METAL_COINS
+
+    with open(path, "r", encoding="utf-8") as f:
+        assets = json.load(f)["assets"]
+
+    markets = []
+    quotes = []
+    simple = {}
+    for asset in assets:
+        if asset["type"] == "crypto":
+            markets.append({
+                "id": asset["id"],
+                "symbol": asset["symbol"].lower(),
+                "name": asset["name"],
+                "image": asset.get("image"),
+                "current_price": asset["price"],
+                "market_cap": asset["marketCap"],
+                "price_change_percentage_24h": asset["change24h"],
+                "price_change_percentage_7d_in_currency": asset.get("change7d"),
+                "sparkline_in_7d": {"price": asset.get("sparkline") or []},
+            })
+        elif asset["type"] == "stock":
+            # FMP처럼 한국(숫자 심볼 → .KS)/사우디(.SR) 시세는 현지 통화로 (가격은 localPrice, 시가총액은 환산)
+            symbol = f"{asset['symbol']}.KS" if asset["symbol"].isdigit() else asset["symbol"]
+            rate = MOCK_FX_RATES["USDKRW"] if symbol.endswith(".KS") else MOCK_FX_RATES["USDSAR"] if symbol.endswith(".SR") else 1
+            quotes.append({
+                "symbol": symbol,
+                "name": asset["name"],
+                "price": asset.get("localPrice", asset["price"]),
+                "marketCap": asset["marketCap"] * rate,
+                "changesPercentage": asset["change24h"],
+            })
+        elif asset["id"] in METAL_COINS:
+            simple[METAL_COINS[asset["id"]]] = {"usd": asset["price"], "usd_24h_change": asset["change24h"]}
+    quotes.extend({"symbol": symbol, "price": rate, "changesPercentage": 0} for symbol, rate in MOCK_FX_RATES.items())
+    return {"markets": markets, "simple": simple, "quote": quotes}
+
+
+def load_fixtures(directory):
+    """--record로 저장한 응답 읽기"""
+    directory = Path(directory)
+    return {
+        name: json.loads((directory / filename).read_text(encoding="utf-8"))
+        for name, filename in FIXTURE_FILES.items()
+    }
+
+
+def scale_markets(markets, count, seed=0):
+    """기록된 코인을 복제해 count개로 확장 (복제본은 원본보다 시가총액이 작아 순서 유지)"""
+    markets = sorted(markets, key=lambda coin: coin["market_cap"] or 0, reverse=True)
+    if count <= len(markets) or not markets:
+        return markets[:count]
+
+    rng = random.Random(seed)
+    scaled = list(markets)
+    generation = 1
+    while len(scaled) < count:
+        factor = 10 ** -generation  # 세대마다 시가총액 1/10
+        for coin in markets:
+            if len(scaled) >= count:
+                break
+            drift = 1 + rng.uniform(-0.05, 0.05)
+            scaled.append(dict(
+                coin,
+                id=f"{coin['id']}-{generation}",
+                symbol=f"{coin['symbol']}{generation}",
+                name=f"{coin['name']} {generation}",
+                current_price=(coin["current_price"] or 0) * drift,
+                market_cap=(coin["market_cap"] or 0) * factor * drift,
+                sparkline_in_7d={"price": [v * drift for v in coin["sparkline_in_7d"]["price"]]},
+            ))
+        generation += 1
+    return sorted(scaled, key=lambda coin: coin["market_cap"] or 0, reverse=True)
+
+
+class Faults:
+    """응답별 장애 주입 설정 (확률은 0~1)"""
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_429=0.0, retry_after=1,
+                 timeout_rate=0.0, malformed_rate=0.0, trickle_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.timeout_rate = timeout_rate
+        self.malformed_rate = malformed_rate
+        self.trickle_rate = trickle_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def pick(self):
+        """(지연 초, 장애 종류 또는 None)"""
+        with self._lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            roll = self._rng.random()
+        for fault, rate in (("429", self.rate_429), ("timeout", self.timeout_rate),
+                            ("malformed", self.malformed_rate), ("trickle", self.trickle_rate)):
+            if roll < rate:
+                return delay, fault
+            roll -= rate
+        return delay, None
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """CoinGecko / FMP 엔드포인트 흉내"""
+
+    server_version = "MockMarketAPI/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path.rstrip("/")
+
+        if path.endswith("/coins/markets"):
+            per_page = int(query.get("per_page", 100))
+            page = int(query.get("page", 1))
+            markets = self.server.fixtures["markets"]
+            body = markets[(page - 1) * per_page:page * per_page]
+        elif path.endswith("/simple/price"):
+            ids = query.get("ids", "").split(",")
+            body = {coin: prices for coin, prices in self.server.fixtures["simple"].items() if coin in ids}
+        elif "/logos/" in path:
+            body = logo_png(unquote(path.rsplit("/", 1)[1]).removesuffix(".png"))
+        elif "/quote/" in path:
+            symbols = unquote(path.rsplit("/quote/", 1)[1]).split(",")
+            if not query.get("apikey"):
+                return self._send(401, {"Error Message": "Invalid API KEY."})
+            quotes = {quote["symbol"]: quote for quote in self.server.fixtures["quote"]}
+            body = [quotes[symbol] for symbol in symbols if symbol in quotes]
+        else:
+            return self._send(404, {"error": "not found"})
+
+        delay, fault = self.server.faults.pick()
+        time.sleep(delay)
+        if fault == "429":
+            return self._send(429, {"status": {"error_code": 429}},
+                              {"Retry-After": str(self.server.faults.retry_after)})
+        if fault == "timeout":
+            time.sleep(HANG_SECONDS)
+        if isinstance(body, bytes):
+            raw, content_type = body, "image/png"
+        else:
+            raw, content_type = json.dumps(body, ensure_ascii=False).encode("utf-8"), "application/json"
+        if fault == "malformed":
+            raw = raw[:len(raw) // 2]
+        self._send_raw(200, raw, content_type=content_type, trickle=fault == "trickle")
+
+    def _send(self, status, body, headers=None):
+        self._send_raw(status, json.dumps(body).encode("utf-8"), headers)
+
+    def _send_raw(self, status, raw, headers=None, content_type="application/json", trickle=False):
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(raw)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            if not trickle:
+                self.wfile.write(raw)
+                return
+            for i in range(len(raw)):  # 읽기 타임아웃에는 걸리지 않고 전체 응답은 한없이 느림
+                self.wfile.write(raw[i:i + 1])
+                self.wfile.flush()
+                time.sleep(TRICKLE_INTERVAL)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 타임아웃으로 먼저 끊은 경우
+
+
+def create_server(fixtures, faults=None, host="127.0.0.1", port=0, verbose=False):
+    """서버 생성 (port=0이면 빈 포트), serve_forever는 호출하는 쪽에서"""
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.fixtures = fixtures
+    server.faults = faults or Faults()
+    server.verbose = verbose
+    return server
+
+
+def base_url(server):
+    """COINGECKO_API / FMP_API에 넣을 주소"""
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/api/v3"
+
+
+def record(directory, crypto_limit=250):
+    """실제 API 응답을 fixture로 저장 (FMP는 FMP_API_KEY 환경 변수가 있을 때만)"""
+    import fetch_data
+    import http_client
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    recorded = {"markets": fetch_data.fetch_crypto_pages(crypto_limit)}
+
+    response = http_client.get(f"{fetch_data.COINGECKO_API}/simple/price", params={
+        "ids": ",".join(fetch_data.METAL_COINS.values()), "vs_currencies": "usd", "include_24hr_change": "true",
+    })
+    response.raise_for_status()
+    recorded["simple"] = response.json()
+
+    recorded["quote"] = []
+    api_key = os.environ.get("FMP_API_KEY")
+    if api_key:
+        symbols = ",".join(symbol for symbol, *_ in fetch_data.TOP_STOCKS)
+        response = http_client.get(f"{fetch_data.FMP_API}/quote/{symbols}?apikey={api_key}")
+        response.raise_for_status()
+        recorded["quote"] = response.json()
+
+    for name, filename in FIXTURE_FILES.items():
+        (directory / filename).write_text(json.dumps(recorded[name], ensure_ascii=False), encoding="utf-8")
+        print(f"💾 {directory / filename}")
+
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="CoinGecko / FMP 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, help="--record로 저장한 응답 폴더 (없으면 data/assets.json 사용)")
+    parser.add_argument("--assets", type=int, help="/coins/markets 전체 코인 수 (기록된 코인 복제)")
+    parser.add_argument("--latency", type=float, default=0, help="응답 지연 (ms)")
+    parser.add_argument("--jitter", type=float, default=0, help="지연 ± 흔들림 (ms)")
+    parser.add_argument("--rate-429", type=float, default=0, help="429 응답 확률")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 응답의 Retry-After (초)")
+    parser.add_argument("--timeout-rate", type=float, default=0, help=f"{HANG_SECONDS}초 동안 응답하지 않을 확률")
+    parser.add_argument("--malformed-rate", type=float, default=0, help="깨진 JSON 응답 확률")
+    parser.add_argument("--trickle-rate", type=float, default=0,
+                        help=f"본문을 {TRICKLE_INTERVAL:g}초에 1바이트씩 보낼 확률")
+    parser.add_argument("--seed", type=int, help="장애 주입 난수 시드")
+    parser.add_argument("--verbose", action="store_true", help="요청 로그 출력")
+    parser.add_argument("--record", type=Path, metavar="DIR", help="실제 API 응답을 DIR에 기록하고 종료")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """서버 실행"""
+    args = parse_args(argv)
+    if args.record:
+        record(args.record)
+        return
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else fixtures_from_assets()
+    if args.assets:
+        fixtures["markets"] = scale_markets(fixtures["markets"], args.assets)
+    faults = Faults(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        timeout_rate=args.timeout_rate,
+        malformed_rate=args.malformed_rate,
+        trickle_rate=args.trickle_rate,
+        seed=args.seed,
+    )
+    server = create_server(fixtures, faults, args.host, args.port, args.verbose)
+    print(f"🧪 대역 서버: {base_url(server)} (코인 {len(fixtures['markets'])}개, 주식 {len(fixtures['quote'])}개)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+시가총액 순위 계산 (상위 N개 선정)
+- 소스별 목록은 이미 시가총액 내림차순 (CoinGecko order=market_cap_desc 등)이므로 전체를 다시 정렬하지 않고
+  소스 수(k) 크기의 힙으로 k-way merge (O(n log k))
+- 한 번 훑으면서 전체 순위(marketCapRank)와 유형별 순위(typeRank)를 함께 기록
+- 전체 상위 top_n개 또는 유형별 상위 top_per_type개에 들면 메인 목록, 나머지는 롱테일로 분리
+  (롱테일은 spill 함수로 바로 넘겨 메모리에 모으지 않을 수 있음)
+"""
+
+import heapq
+
+DEFAULT_TOP_N = 1000
+DEFAULT_TOP_PER_TYPE = 250
+
+
+def market_cap(asset):
+    return asset.get("marketCap") or 0
+
+
+def presorted(assets):
+    """시가총액 내림차순 목록 (이미 정렬돼 있으면 O(n) 확인만, 아니면 안정 정렬)"""
+    if any(market_cap(a) < market_cap(b) for a, b in zip(assets, assets[1:])):
+        return sorted(assets, key=market_cap, reverse=True)
+    return assets
+
+
+def merge(streams):
+    """시가총액 내림차순 스트림들을 하나로 병합 (시가총액이 같으면 앞 스트림 먼저)"""
+    heap = []
+    iterators = [iter(stream) for stream in streams]
+    for index, iterator in enumerate(iterators):
+        for asset in iterator:
+            heap.append((-market_cap(asset), index, asset))
+            break
+    heapq.heapify(heap)
+
+    while heap:
+        _, index, asset = heap[0]
+        yield asset
+        following = next(iterators[index], None)
+        if following is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (-market_cap(following), index, following))
+
+
+def rank(streams, top_n=DEFAULT_TOP_N, top_per_type=DEFAULT_TOP_PER_TYPE, spill=None):
+    """병합 순서대로 순위를 매겨 (메인 목록, 롱테일 목록) 반환
+
+    spill이 있으면 롱테일 자산을 하나씩 spill(asset)로 넘기고 롱테일 목록은 비워 둔다.
+    메인 목록은 유형별로 보면 각 유형의 앞부분이므로 유형 필터 안의 순서가 곧 typeRank다.
+    """
+    top, tail = [], []
+    type_counts = {}
+    for global_rank, asset in enumerate(merge(streams), 1):
+        type_rank = type_counts[asset["type"]] = type_counts.get(asset["type"], 0) + 1
+        asset["marketCapRank"] = global_rank
+        asset["typeRank"] = type_rank
+        if global_rank <= top_n or type_rank <= top_per_type:
+            top.append(asset)
+        elif spill is not None:
+            spill(asset)
+        else:
+            tail.append(asset)
+    return top, tail
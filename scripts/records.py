@@ -0,0 +1,173 @@
+"""
+자산 레코드
+- 모든 소스가 같은 Asset(__slots__) 레코드를 만들고, 숫자 필드 검증/정리는 validate()로 한 번에
+- 스파크라인은 받은 리스트를 그대로 참조하고 (복사하지 않음), 다운샘플링 결과부터 array 버퍼로 보관 (float 객체 리스트보다 작음)
+- 드물게 쓰는 선택 필드는 클래스 기본값(None)으로 두고 값이 있을 때만 인스턴스 __dict__에 저장
+- dict처럼 asset["key"], asset.get(), keys()/items()로 읽고 쓸 수 있어 기존 단계(다운샘플링, 순위, 히스토리)를 그대로 사용
+- 값이 None인 선택 필드는 없는 키로 취급하고 JSON에도 쓰지 않음
+"""
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy는 선택 사항
+    np = None
+
+# JSON 출력 순서
+FIELDS = (
+    "id", "name", "symbol", "price", "marketCap", "change24h", "change7d", "type", "country",
+    "emoji", "image", "sparkline", "currency", "localPrice", "asOf",
+    "change30d", "changeYtd", "rankChange7d", "rankChange30d", "marketCapRank", "typeRank",
+)
+# 대부분의 자산에 값이 있는 필드만 슬롯으로 (나머지는 클래스 기본값 None)
+SLOTS = (
+    "id", "name", "symbol", "price", "marketCap", "change24h", "change7d", "type", "country",
+    "image", "sparkline", "marketCapRank", "typeRank",
+)
+OPTIONAL_FIELDS = tuple(key for key in FIELDS if key not in SLOTS)
+TYPES = ("stock", "metal", "crypto")
+NON_NEGATIVE_FIELDS = ("price", "marketCap")
+CHANGE_FIELDS = ("change24h", "change7d")
+CHANGE_DIGITS = 2
+
+_FIELD_SET = frozenset(FIELDS)
+
+
+def _series(values):
+    """스파크라인 값 → array 버퍼 (모두 정수면 'q', 아니면 'd' / None은 버림)
+
+    다운샘플링 등으로 스파크라인을 새로 넣을 때만 사용 (받은 원본은 그대로 참조).
+    """
+    if isinstance(values, array):
+        return values
+    if not values:
+        return array("d")
+    try:
+        return array("q" if type(values[0]) is int else "d", values)
+    except TypeError:  # None 또는 정수/실수 혼합
+        return array("d", (v for v in values if v is not None))
+
+
+class Asset:
+    """자산 하나 (가격/시가총액은 달러, 현지 통화 주식은 currency/localPrice도 기록)
+
+    asOf는 이번 실행에서 받지 못해 이전 관측 값을 쓴 경우의 관측 시각 (ISO 8601).
+    sparkline은 받은 값(리스트, None 포함 가능) 또는 asset["sparkline"] = ...로 넣은 array 버퍼.
+    """
+
+    __slots__ = SLOTS + ("__dict__",)  # __dict__는 선택 필드를 처음 넣을 때 생김
+
+    emoji = currency = localPrice = asOf = None
+    change30d = changeYtd = rankChange7d = rankChange30d = None
+
+    def __init__(self, id, name, symbol, type, price=0, marketCap=0, change24h=0, change7d=0,
+                 country="-", sparkline=None, **optional):
+        if not id:
+            raise ValueError(f"자산 id가 없습니다: {name}")
+        if type not in TYPES:
+            raise ValueError(f"알 수 없는 자산 유형: {type}")
+        self.id = id
+        self.name = name
+        self.symbol = symbol
+        self.type = type
+        self.price = price
+        self.marketCap = marketCap
+        self.change24h = change24h
+        self.change7d = change7d
+        self.country = country
+        self.sparkline = sparkline if sparkline is not None else ()
+        self.image = self.marketCapRank = self.typeRank = None
+        for key, value in optional.items():
+            if key not in _FIELD_SET:
+                raise TypeError(f"알 수 없는 자산 필드: {key}")
+            setattr(self, key, value)
+
+    def __getitem__(self, key):
+        value = getattr(self, key) if key in _FIELD_SET else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        setattr(self, key, _series(value) if key == "sparkline" else value)
+
+    def __contains__(self, key):
+        return key in _FIELD_SET and getattr(self, key) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in _FIELD_SET else None
+        return default if value is None else value
+
+    def keys(self):
+        return [key for key in FIELDS if getattr(self, key) is not None]
+
+    def items(self):
+        return [(key, value) for key in FIELDS if (value := getattr(self, key)) is not None]
+
+    def to_dict(self):
+        """JSON으로 쓸 dict (스파크라인은 리스트)"""
+        row = {key: value for key in FIELDS if (value := getattr(self, key)) is not None}
+        sparkline = self.sparkline
+        row["sparkline"] = sparkline.tolist() if isinstance(sparkline, array) else list(sparkline)
+        return row
+
+    def copy(self):
+        clone = Asset.__new__(Asset)
+        for key in SLOTS:
+            setattr(clone, key, getattr(self, key))
+        for key in OPTIONAL_FIELDS:
+            if (value := getattr(self, key)) is not None:
+                setattr(clone, key, value)
+        sparkline = self.sparkline
+        clone.sparkline = array(sparkline.typecode, sparkline) if isinstance(sparkline, array) else list(sparkline)
+        return clone
+
+    def __repr__(self):
+        return f"Asset({self.id!r}, {self.type}, marketCap={self.marketCap!r})"
+
+
+def _clean(value, non_negative, digits):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if not math.isfinite(value) or (non_negative and value < 0):
+        return 0.0
+    return round(value, digits) if digits is not None else value
+
+
+def validate(assets):
+    """숫자 필드 일괄 정리 (제자리): None/NaN/무한대/숫자 아님 → 0, 음수 가격·시가총액 → 0, 변동률은 소수 둘째 자리
+
+    NumPy가 있으면 필드별로 한 번에 처리한다.
+    """
+    for field in NON_NEGATIVE_FIELDS + CHANGE_FIELDS:
+        non_negative = field in NON_NEGATIVE_FIELDS
+        digits = CHANGE_DIGITS if field in CHANGE_FIELDS else None
+        raw = [getattr(asset, field) for asset in assets]
+        values = None
+        if np is not None and raw:
+            try:
+                values = np.array(raw, dtype=np.float64)
+            except (TypeError, ValueError):
+                values = None  # 문자열 등이 섞여 있으면 하나씩
+        if values is not None:
+            values[~np.isfinite(values)] = 0.0  # None은 NaN으로 변환됨
+            if non_negative:
+                np.maximum(values, 0.0, out=values)
+            if digits is not None:
+                values = np.round(values, digits)
+            values = values.tolist()
+        else:
+            values = [_clean(value, non_negative, digits) for value in raw]
+        for asset, old, value in zip(assets, raw, values):
+            if type(old) is not float or old != value:  # 이미 같은 float면 받은 객체를 그대로 둠
+                setattr(asset, field, value)
+    return assets
@@ -0,0 +1,126 @@
+"""
+기간 수익률 / 순위 변동 (히스토리 기반)
+- 7일, 30일, 연초 대비(YTD) 가격 변동률과 7일/30일 순위 변동
+- 기간마다 자산별 기준점(기간 시작 직전 포인트)을 anchors 테이블에 유지하고,
+  새 스냅샷마다 지난번 이후 기간 경계를 새로 넘은 포인트만 읽어 기준점을 앞으로 이동 (points의 ts 인덱스로 범위 탐색)
+- 변동률은 NumPy가 있으면 전체 자산을 한 번에 계산
+"""
+
+from datetime import datetime, timezone
+
+import history
+
+try:
+    import numpy as np
+except ImportError:  # NumPy는 선택 사항
+    np = None
+
+DAY = 86400
+
+# 필드 이름 → 기간 (초), None은 연초 기준
+WINDOWS = {
+    "change7d": 7 * DAY,
+    "change30d": 30 * DAY,
+    "changeYtd": None,
+}
+RANK_FIELDS = {"change7d": "rankChange7d", "change30d": "rankChange30d"}
+
+# 실행 시각이 조금씩 달라도 하루 전/7일 전 실행을 기준점으로 쓰도록 허용하는 오차 (스냅샷 간격 대비 비율)
+# 하루 한 번 실행이면 6시간, 스케줄러가 15분마다 쌓으면 3.75분
+ANCHOR_SLACK = 0.25
+SNAPSHOT_INTERVAL = DAY  # 기본 스냅샷 간격 (매일 실행하는 워크플로우)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS anchors (
+    field    TEXT    NOT NULL,
+    asset_id TEXT    NOT NULL,
+    ts       INTEGER NOT NULL,
+    price    REAL,
+    rank     INTEGER,
+    PRIMARY KEY (field, asset_id)
+) WITHOUT ROWID;
+"""
+
+
+def window_cutoff(field, now, interval=SNAPSHOT_INTERVAL):
+    """기간 시작 시각 (이 시각 이전의 마지막 포인트가 기준점, interval은 스냅샷 간격)"""
+    seconds = WINDOWS[field]
+    if seconds is None:
+        year_start = datetime(datetime.fromtimestamp(now, timezone.utc).year, 1, 1, tzinfo=timezone.utc)
+        return int(year_start.timestamp())
+    return now - seconds + int(interval * ANCHOR_SLACK)
+
+
+def advance_anchors(conn, now, interval=SNAPSHOT_INTERVAL):
+    """기간별 기준점을 now 기준으로 이동 (지난 경계 이후 새로 기간 밖으로 나간 포인트만 읽음)"""
+    conn.executescript(SCHEMA)
+    now = history.to_timestamp(now)
+    with conn:
+        for field in WINDOWS:
+            cutoff = window_cutoff(field, now, interval)
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (f"anchorCutoff:{field}",)).fetchone()
+            since = int(row[0]) if row else -1
+            if cutoff == since:
+                continue
+            if cutoff < since:  # 시계가 뒤로 간 경우 처음부터 다시
+                conn.execute("DELETE FROM anchors WHERE field = ?", (field,))
+                since = -1
+
+            # MAX(ts)와 함께 고른 price/rank는 그 행의 값 (SQLite 집계 규칙)
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO anchors
+                SELECT ?, asset_id, MAX(ts), price, rank FROM points
+                WHERE ts > ? AND ts < ?
+                GROUP BY asset_id
+                """,
+                (field, since, cutoff),
+            )
+            conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"anchorCutoff:{field}", str(cutoff)))
+
+
+def load_anchors(conn, field, asset_ids):
+    """자산 순서대로 (기준 가격, 기준 순위) 목록 (기준점이 없으면 None)"""
+    anchors = {
+        asset_id: (price, rank)
+        for asset_id, price, rank in conn.execute(
+            "SELECT asset_id, price, rank FROM anchors WHERE field = ?", (field,)
+        )
+    }
+    return [anchors.get(asset_id, (None, None)) for asset_id in asset_ids]
+
+
+def percent_changes(current, base):
+    """(현재/기준 - 1) × 100, 소수 둘째 자리 (기준이 없거나 가격이 0이면 None)"""
+    if np is not None:
+        cur = np.array(current, dtype=np.float64)
+        ref = np.array([b if b and c else np.nan for c, b in zip(current, base)], dtype=np.float64)
+        changes = np.round((cur / ref - 1) * 100, 2)
+        return [None if np.isnan(c) else float(c) for c in changes]
+    return [round((c / b - 1) * 100, 2) if b and c else None for c, b in zip(current, base)]
+
+
+def apply_windows(conn, assets, now, interval=SNAPSHOT_INTERVAL):
+    """시가총액 순으로 정렬된 assets에 기간 변동률/순위 변동 기록 (기준점이 없으면 기존 값 유지)
+
+    append_snapshot 이후 호출한다. interval은 스냅샷 간격(기준점 허용 오차에 사용).
+    기준점이 생긴 자산 수를 기간별로 반환.
+    """
+    advance_anchors(conn, now, interval)
+    asset_ids = [asset["id"] for asset in assets]
+    prices = [asset.get("price") or 0 for asset in assets]
+
+    covered = {}
+    for field in WINDOWS:
+        anchors = load_anchors(conn, field, asset_ids)
+        changes = percent_changes(prices, [price for price, _ in anchors])
+        rank_field = RANK_FIELDS.get(field)
+        covered[field] = 0
+        for rank, (asset, change, (_, base_rank)) in enumerate(zip(assets, changes, anchors), 1):
+            if change is None:
+                continue
+            asset[field] = change
+            if rank_field and base_rank is not None:
+                asset[rank_field] = base_rank - asset.get("marketCapRank", rank)  # 양수면 순위 상승
+            covered[field] += 1
+    return covered
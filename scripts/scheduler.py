@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+상주 스케줄러 (fetch_data.py + generate_html.py를 한 프로세스에서 소스별 주기로 실행)
+- 소스별 갱신 주기: 암호화폐 60초, 주식 15분, 귀금속 1시간 (--interval 소스=초로 변경)
+- 주기가 된 소스만 수집해 메모리의 데이터셋(소스별 자산 목록)에 합침
+- 받은 값이 직전과 같으면 아무것도 쓰지 않고, 바뀐 경우에만 assets.json 등을 저장하고 index.html 생성
+- 히스토리 스냅샷은 --history-interval(기본 15분)마다만 추가 (1분마다 쌓지 않음)
+- 한 번의 수집은 가장 짧은 주기(와 --deadline) 안에 끝나도록 예산 제한
+- SIGTERM / Ctrl+C로 진행 중인 수집을 마치고 종료
+
+사용법:
+  python scripts/scheduler.py
+  python scripts/scheduler.py --interval crypto=30 --interval metals=7200 --html split -- --crypto-limit 500
+  (-- 뒤의 옵션은 fetch_data.py 옵션)
+"""
+
+import argparse
+import hashlib
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+
+import deadline
+import fetch_data
+import generate_html
+import http_client
+import json_stream
+import last_known
+import metrics
+from http_cache import ResponseCache
+from sparkline import downsample_sparklines
+
+# 소스별 기본 갱신 주기 (초)
+INTERVALS = {
+    "crypto": 60,
+    "stocks": 15 * 60,
+    "metals": 60 * 60,
+}
+HISTORY_INTERVAL = 15 * 60  # 히스토리 스냅샷 최소 간격 (초)
+DUE_SLACK = 1.0  # 이 시간 안에 주기가 되는 소스는 한 번에 수집 (초)
+
+
+def fingerprint(assets):
+    """이번에 받은 값의 해시 (순위 등 매번 다시 계산하는 필드 제외)"""
+    rows = [
+        {key: value for key, value in asset.to_dict().items() if key not in last_known.DERIVED_FIELDS}
+        for asset in assets
+    ]
+    return hashlib.sha256(json_stream.dumps(rows)).hexdigest()
+
+
+def parse_interval(value):
+    """'crypto=60' → ("crypto", 60.0)"""
+    name, _, seconds = value.partition("=")
+    if name not in INTERVALS:
+        raise argparse.ArgumentTypeError(f"알 수 없는 소스: {name} ({', '.join(INTERVALS)} 중 하나)")
+    try:
+        seconds = float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"주기는 초 단위 숫자여야 합니다: {value}")
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"주기는 0보다 커야 합니다: {value}")
+    return name, seconds
+
+
+class Scheduler:
+    """소스별 주기 수집 + 변경 시에만 결과 저장/HTML 생성
+
+    dataset: {소스 이름: 자산 목록} (마지막으로 받은 값, 마지막 정상 값 포함)
+    """
+
+    def __init__(self, args, intervals, history_interval=HISTORY_INTERVAL, html_layout="inline"):
+        self.args = args
+        self.intervals = intervals
+        self.history_interval = history_interval
+        self.html_layout = html_layout
+        self.session = http_client.get_session()
+        # 주기는 스케줄러가 정하므로 마지막 정상 값의 FRESH_FOR로 건너뛰지 않음
+        self.known = last_known.LastKnownGood(fetch_data.LAST_KNOWN_PATH, seed_path=fetch_data.OUTPUT_PATH, force=True,
+                                              seed_row=fetch_data.seed_row)
+        self.breakers = deadline.CircuitBreakers(fetch_data.BREAKER_PATH)
+        self.dataset = {}
+        self.fingerprints = {}
+        self.next_due = {name: 0.0 for name in intervals}
+        self.last_history = None
+        self.stopping = threading.Event()
+
+    def due(self, now):
+        """주기가 된 (또는 DUE_SLACK 안에 될) 소스"""
+        return [name for name in self.intervals if self.next_due[name] <= now + DUE_SLACK]
+
+    def tick(self, due):
+        """due 소스 수집 → 바뀐 게 있으면 저장 + HTML 생성, 바뀌었는지 반환"""
+        metrics.reset()
+        started = time.monotonic()
+        run_deadline = deadline.RunDeadline(min(self.args.deadline, min(self.intervals.values())))
+        for name in due:
+            self.next_due[name] = started + self.intervals[name]
+
+        sources = fetch_data.create_sources(self.args, self.known, self.breakers, run_deadline, self.session)
+        selected = [(name, func) for name, func in sources if name in due]
+        results = fetch_data.run_sources(selected, serial=self.args.serial, timeout=run_deadline.fetch_remaining(),
+                                         fallback=fetch_data.source_fallback(self.known))
+        self.breakers.save()
+
+        received = [asset for assets in results for asset in assets]
+        if self.args.sparkline_points:
+            with metrics.stage("downsample"):
+                downsample_sparklines(received, self.args.sparkline_points)
+        self.known.record(received)
+        self.known.save()
+
+        changed = []
+        for (name, _), assets in zip(selected, results):
+            digest = fingerprint(assets)
+            if digest != self.fingerprints.get(name):
+                changed.append(name)
+            self.fingerprints[name] = digest
+            self.dataset[name] = assets
+
+        clock = datetime.now(timezone.utc).strftime("%H:%M:%S")
+        if not changed:
+            print(f"⏭️ [{clock}] {', '.join(due)} 변경 없음 ({time.monotonic() - started:.1f}초)")
+            return False
+
+        source_assets = [self.dataset.get(name, []) for name, _ in sources]
+        missing = fetch_data.missing_sources(sources, source_assets)
+        if missing and (not self.args.allow_partial or not any(source_assets)):
+            print(f"❌ [{clock}] {', '.join(missing)} 자산이 없습니다 - 기존 결과 유지")
+            return False
+
+        append_history = self.last_history is None or time.monotonic() - self.last_history >= self.history_interval
+        fetch_data.publish(source_assets, self.args, append_history=append_history,
+                           history_interval=self.history_interval)
+        if append_history:
+            self.last_history = time.monotonic()
+        generate_html.generate_html(
+            columnar=self.html_layout == "columnar",
+            split=self.html_layout == "split",
+        )
+        run = metrics.write("scheduler")
+        print(f"🔄 [{clock}] {', '.join(changed)} 변경 → 결과 갱신 ({run['seconds']:.1f}초)")
+        return True
+
+    def run(self):
+        """stop()이 불릴 때까지 주기가 된 소스를 수집"""
+        print("⏰ 스케줄러 시작: " + ", ".join(f"{name} {seconds:g}초" for name, seconds in self.intervals.items()))
+        while not self.stopping.is_set():
+            due = self.due(time.monotonic())
+            if due:
+                try:
+                    self.tick(due)
+                except Exception as e:  # 한 번의 실패로 상주 프로세스를 끝내지 않음
+                    print(f"❌ 갱신 실패 ({', '.join(due)}): {e}")
+            self.stopping.wait(max(0.0, min(self.next_due.values()) - time.monotonic()))
+        print("👋 스케줄러 종료")
+
+    def stop(self, *_):
+        self.stopping.set()
+
+
+def parse_args(argv=None):
+    """스케줄러 옵션 (-- 뒤 또는 모르는 옵션은 fetch_data.py 옵션으로)"""
+    parser = argparse.ArgumentParser(description="소스별 주기로 시가총액 데이터 수집 / HTML 생성")
+    parser.add_argument("--interval", type=parse_interval, action="append", default=[], metavar="소스=초",
+                        help="소스별 갱신 주기 (기본: " + ", ".join(f"{k}={v}" for k, v in INTERVALS.items()) + ")")
+    parser.add_argument("--history-interval", type=float, default=HISTORY_INTERVAL,
+                        help="히스토리 스냅샷 최소 간격 (초)")
+    parser.add_argument("--html", choices=("inline", "columnar", "split"), default="inline",
+                        help="index.html 데이터 임베드 방식 (generate_html.py 옵션과 같음)")
+    args, rest = parser.parse_known_args(argv)
+    if rest[:1] == ["--"]:
+        rest = rest[1:]
+    return args, fetch_data.parse_args(rest)
+
+
+def main(argv=None):
+    args, fetch_args = parse_args(argv)
+    intervals = dict(INTERVALS, **dict(args.interval))
+    if not fetch_args.no_cache:
+        # 주기는 스케줄러가 정하므로 TTL 안의 캐시 응답을 쓰지 않고 받은 응답만 저장
+        http_client.cache = ResponseCache(fetch_data.CACHE_DIR / "http", refresh=True)
+
+    scheduler = Scheduler(fetch_args, intervals, args.history_interval, args.html)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    scheduler.run()
+
+
+if __name__ == "__main__":
+    fetch_data.finish(main())
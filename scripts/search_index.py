@@ -0,0 +1,74 @@
+"""
+검색 인덱스
+- 검색 키: 이름/심볼(소문자)과 한글 이름의 초성 (예: 삼성전자 → ㅅㅅㅈㅈ)
+- 검색 키의 3-gram → 자산 위치 목록 (3글자 이상 검색어는 후보만 부분 문자열 확인)
+- 빌드 시 만들어 압축한 형태로 페이지(--split이면 해시 데이터 파일)에 넣고, 페이지는 처음 검색할 때 한 번 풀어 씀
+  {"gramSize": 3, "postings": {위치 목록: 그 위치 목록을 가진 3-gram을 이어 붙인 문자열}}
+  위치 목록은 오름차순 위치의 차이를 36진수로 쓰고 ','로 연결 (예: [3, 40, 41] → "3,10,1")
+"""
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+HANGUL_FIRST = 0xAC00  # '가'
+HANGUL_LAST = 0xD7A3  # '힣'
+SYLLABLES_PER_CHOSEONG = 21 * 28  # 중성 × 종성
+GRAM_SIZE = 3
+BMP_LAST = 0xFFFF  # 이보다 큰 문자(이모지 등)는 JS 문자열에서 두 글자라 인덱스에 넣지 않음 (페이지는 전체 검색)
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def choseong(text):
+    """한글 음절을 초성으로 바꾼 문자열 (한글 외 문자는 그대로)"""
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_FIRST <= code <= HANGUL_LAST:
+            chars.append(CHOSEONG[(code - HANGUL_FIRST) // SYLLABLES_PER_CHOSEONG])
+        else:
+            chars.append(ch)
+    return "".join(chars)
+
+
+def search_keys(asset):
+    """자산의 검색 키 목록 (이름, 심볼, 이름 초성 - 중복 제외)"""
+    name = asset["name"].lower()
+    keys = [name, asset["symbol"].lower(), choseong(name)]
+    return list(dict.fromkeys(keys))
+
+
+def base36(n):
+    digits = ""
+    while True:
+        n, digit = divmod(n, 36)
+        digits = DIGITS[digit] + digits
+        if not n:
+            return digits
+
+
+def encode_positions(positions):
+    """오름차순 위치 목록 → 차이를 36진수로 쓴 문자열"""
+    previous = 0
+    parts = []
+    for position in positions:
+        parts.append(base36(position - previous))
+        previous = position
+    return ",".join(parts)
+
+
+def build_search_index(assets):
+    """3-gram 인덱스 (같은 위치 목록을 가진 3-gram끼리 묶고 위치 목록은 차이로 압축)"""
+    grams = {}
+    for i, asset in enumerate(assets):
+        seen = set()
+        for key in search_keys(asset):
+            for start in range(len(key) - GRAM_SIZE + 1):
+                gram = key[start:start + GRAM_SIZE]
+                if max(map(ord, gram)) <= BMP_LAST:
+                    seen.add(gram)
+        for gram in seen:
+            grams.setdefault(gram, []).append(i)
+
+    postings = {}
+    for gram in sorted(grams):
+        encoded = encode_positions(grams[gram])
+        postings[encoded] = postings.get(encoded, "") + gram
+    return {"gramSize": GRAM_SIZE, "postings": postings}
@@ -0,0 +1,203 @@
+"""
+스파크라인 다운샘플링 / 렌더링
+- LTTB (Largest-Triangle-Three-Buckets)로 모양을 유지하면서 포인트 수 축소
+- NumPy가 있으면 길이가 같은 스파크라인을 한 번에 벡터 연산
+- 100×35px 차트에 필요한 정밀도로 반올림
+- 빌드 시 SVG path 문자열로 미리 렌더링 (데이터 없는 자산은 고정 시드 추정 차트)
+"""
+
+import math
+import random
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy는 선택 사항
+    np = None
+
+SPARKLINE_POINTS = 20  # 기본 목표 포인트 수 (MIN_CHART_POINTS 이상이어야 실제 차트로 그려짐)
+
+# index.html 스파크라인 SVG 크기
+CHART_WIDTH = 100
+CHART_HEIGHT = 35
+CHART_PADDING = 5
+VALUE_LEVELS = (CHART_HEIGHT - 2 * CHART_PADDING) * 10  # 세로 0.1px 단위 해상도
+MIN_CHART_POINTS = 11  # 이보다 짧으면 실제 차트 대신 추정 차트
+
+
+def _bucket_bounds(n, target):
+    """LTTB 버킷별 (후보 구간, 다음 버킷 평균 구간) 인덱스"""
+    every = (n - 2) / (target - 2)
+    for i in range(target - 2):
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        avg_start = range_end
+        avg_end = min(int((i + 2) * every) + 1, n)
+        yield range_start, range_end, avg_start, avg_end
+
+
+def lttb(values, target=SPARKLINE_POINTS):
+    """LTTB 다운샘플링 (x는 인덱스, 첫/마지막 포인트는 항상 유지)"""
+    n = len(values)
+    if target >= n or target < 3:
+        return list(values)
+
+    sampled = [values[0]]
+    a = 0
+    for range_start, range_end, avg_start, avg_end in _bucket_bounds(n, target):
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = sum(values[avg_start:avg_end]) / (avg_end - avg_start)
+        a_y = values[a]
+
+        best_area = -1.0
+        best = range_start
+        for j in range(range_start, range_end):
+            area = abs((a - avg_x) * (values[j] - a_y) - (a - j) * (avg_y - a_y))
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled.append(values[best])
+        a = best
+
+    sampled.append(values[-1])
+    return sampled
+
+
+def _lttb_numpy(matrix, target):
+    """같은 길이의 스파크라인 여러 개(행렬)를 한 번에 LTTB"""
+    rows, n = matrix.shape
+    row_index = np.arange(rows)
+    picked = np.empty((rows, target), dtype=matrix.dtype)
+    picked[:, 0] = matrix[:, 0]
+    picked[:, -1] = matrix[:, -1]
+
+    a = np.zeros(rows, dtype=np.int64)
+    for k, (range_start, range_end, avg_start, avg_end) in enumerate(_bucket_bounds(n, target), 1):
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = matrix[:, avg_start:avg_end].mean(axis=1)
+        a_y = matrix[row_index, a]
+
+        js = np.arange(range_start, range_end)
+        area = np.abs(
+            (a - avg_x)[:, None] * (matrix[:, range_start:range_end] - a_y[:, None])
+            - (a[:, None] - js[None, :]) * (avg_y - a_y)[:, None]
+        )
+        a = js[area.argmax(axis=1)]
+        picked[:, k] = matrix[row_index, a]
+
+    return picked
+
+
+def round_for_chart(values):
+    """차트 세로 해상도(0.1px)에 맞춰 반올림 (그 이하 자릿수는 화면에 보이지 않음)"""
+    if not values:
+        return values
+    lo, hi = min(values), max(values)
+    span = (hi - lo) or abs(hi) or 1.0
+    decimals = -math.floor(math.log10(span / VALUE_LEVELS))
+    if decimals <= 0:
+        return [int(round(v, decimals)) for v in values]
+    return [round(v, decimals) for v in values]
+
+
+def downsample_sparklines(assets, target=SPARKLINE_POINTS):
+    """자산 목록의 sparkline을 target 포인트로 줄이고 반올림 (제자리 수정)"""
+    if target < 3:
+        raise ValueError(f"스파크라인 포인트 수는 3 이상이어야 합니다: {target}")
+
+    series = {}
+    for asset in assets:
+        values = asset.get("sparkline") or []
+        if not isinstance(values, array) and None in values:  # array 버퍼(이미 넣은 스파크라인)에는 None이 없음
+            values = [v for v in values if v is not None]
+        if len(values) > target:
+            series.setdefault(len(values), []).append((asset, values))
+        else:
+            asset["sparkline"] = round_for_chart(values)
+
+    for group in series.values():
+        if np is not None:
+            matrix = np.array([values for _, values in group], dtype=np.float64)
+            downsampled = _lttb_numpy(matrix, target).tolist()
+        else:
+            downsampled = [lttb(values, target) for _, values in group]
+
+        for (asset, _), values in zip(group, downsampled):
+            asset["sparkline"] = round_for_chart(values)
+
+    return assets
+
+
+def has_chart_data(values):
+    """실제 차트를 그릴 만큼 포인트가 있는지"""
+    return len(values or []) >= MIN_CHART_POINTS
+
+
+def _sample_for_chart(values):
+    """차트에 쓸 포인트 선택 (이미 줄인 데이터는 그대로, 긴 원본은 균등 간격으로 SPARKLINE_POINTS개)"""
+    if len(values) <= SPARKLINE_POINTS:
+        return list(values)
+    step = len(values) // SPARKLINE_POINTS
+    return [v for i, v in enumerate(values) if i % step == 0][-SPARKLINE_POINTS:]
+
+
+def _format_path(points):
+    """[(x, y), ...] → SVG path d 문자열 (소수점 한 자리)"""
+    return "M" + "L".join(f"{round(x, 1):g},{round(y, 1):g}" for x, y in points)
+
+
+def chart_path(values):
+    """실제 가격 데이터로 SVG path 생성"""
+    sampled = _sample_for_chart(values)
+    lo, hi = min(sampled), max(sampled)
+    span = (hi - lo) or 1
+    last = len(sampled) - 1
+    drawable = CHART_HEIGHT - 2 * CHART_PADDING
+    return _format_path(
+        ((i / last) * CHART_WIDTH, CHART_HEIGHT - CHART_PADDING - ((v - lo) / span) * drawable)
+        for i, v in enumerate(sampled)
+    )
+
+
+def estimated_path(change7d, seed):
+    """데이터 없는 자산(주식/귀금속)용 추정 차트: 7일 변동 방향 + 시드 고정 흔들림"""
+    rng = random.Random(seed)
+    points = []
+    for i in range(7):
+        progress = i / 6
+        wobble = (rng.random() - 0.5) * 8
+        y = 28 - progress * 18 + wobble if change7d >= 0 else 10 + progress * 18 + wobble
+        points.append((i * 15 + 5, max(5, min(30, y))))
+    return _format_path(points)
+
+
+def sparkline_paths(assets):
+    """자산별 SVG path 문자열 목록 (길이가 같은 실제 데이터는 NumPy로 한 번에 좌표 계산)"""
+    paths = [None] * len(assets)
+    groups = {}
+    for i, asset in enumerate(assets):
+        values = asset.get("sparkline") or []
+        if not isinstance(values, array) and None in values:  # array 버퍼(이미 넣은 스파크라인)에는 None이 없음
+            values = [v for v in values if v is not None]
+        if has_chart_data(values):
+            sampled = _sample_for_chart(values)
+            groups.setdefault(len(sampled), []).append((i, sampled))
+        else:
+            paths[i] = estimated_path(asset.get("change7d") or 0, asset.get("id", i))
+
+    for length, group in groups.items():
+        if np is None:
+            for i, sampled in group:
+                paths[i] = chart_path(sampled)
+            continue
+
+        matrix = np.array([sampled for _, sampled in group], dtype=np.float64)
+        lo = matrix.min(axis=1, keepdims=True)
+        span = matrix.max(axis=1, keepdims=True) - lo
+        span[span == 0] = 1
+        xs = (np.arange(length) / (length - 1) * CHART_WIDTH).tolist()
+        ys = (CHART_HEIGHT - CHART_PADDING - ((matrix - lo) / span) * (CHART_HEIGHT - 2 * CHART_PADDING)).tolist()
+        for (i, _), row in zip(group, ys):
+            paths[i] = _format_path(zip(xs, row))
+
+    return paths
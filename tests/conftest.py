@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# scripts/의 모듈을 최상위 모듈로 import (스크립트가 서로 import하는 방식과 같게)
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
@@ -0,0 +1,86 @@
+"""delta.py / delta.js: 델타를 적용하면 현재 문서와 같아지는지 (순위 이동, 추가, 삭제, 필드 삭제)"""
+
+import json
+import random
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from delta import apply_delta, diff
+
+DELTA_JS = Path(__file__).parent.parent / "delta.js"
+
+NODE_RUNNER = """
+const fs = require('fs');
+const vm = require('vm');
+vm.runInThisContext(fs.readFileSync(process.argv[2], 'utf8'));
+const cases = JSON.parse(fs.readFileSync(process.argv[3], 'utf8'));
+process.stdout.write(JSON.stringify(cases.map(([base, delta]) => applyDelta(base, delta))));
+"""
+
+
+def asset(i, rng):
+    row = {"id": f"coin-{i}", "name": f"코인 {i}", "symbol": f"C{i}", "price": round(rng.uniform(0.01, 1000), 2),
+           "marketCap": rng.randint(1, 10**12), "change24h": round(rng.uniform(-10, 10), 2), "type": "crypto"}
+    if rng.random() < 0.5:
+        row["asOf"] = "2026-01-30T00:00:00+00:00"
+    return row
+
+
+def document(assets, last_updated):
+    return {"lastUpdated": last_updated, "totalAssets": len(assets), "assets": assets}
+
+
+def make_case(seed):
+    """base → current: 일부 삭제, 필드 변경/삭제(asOf), 새 자산 추가, 순서 섞기"""
+    rng = random.Random(seed)
+    base = [asset(i, rng) for i in range(rng.randint(0, 60))]
+    current = []
+    for row in base:
+        if rng.random() < 0.1:
+            continue  # 삭제
+        row = dict(row)
+        if rng.random() < 0.5:
+            row["price"] = round(row["price"] * rng.uniform(0.9, 1.1), 2)
+        if rng.random() < 0.3:
+            row.pop("asOf", None)
+        current.append(row)
+    current += [asset(1000 + i, rng) for i in range(rng.randint(0, 5))]
+    if rng.random() < 0.5:
+        rng.shuffle(current)
+    else:  # 몇 개만 이동
+        for _ in range(rng.randint(0, 4)):
+            if current:
+                current.insert(rng.randrange(len(current)), current.pop(rng.randrange(len(current))))
+    return document(base, "2026-01-30T00:00:00+00:00"), document(current, "2026-01-31T00:00:00+00:00")
+
+
+CASES = [make_case(seed) for seed in range(40)]
+
+
+def test_apply_delta_round_trip():
+    for base, current in CASES:
+        assert apply_delta(base, diff(base, current)) == current
+
+
+def test_apply_delta_rejects_other_base():
+    base, current = CASES[1]
+    delta = diff(base, current)
+    with pytest.raises(ValueError):
+        apply_delta(dict(base, lastUpdated="2026-01-29T00:00:00+00:00"), delta)
+
+
+def test_delta_js_matches_python(tmp_path):
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node 없음")
+    runner = tmp_path / "run.js"
+    runner.write_text(NODE_RUNNER, encoding="utf-8")
+    fixtures = tmp_path / "cases.json"
+    fixtures.write_text(json.dumps([[base, diff(base, current)] for base, current in CASES], ensure_ascii=False),
+                        encoding="utf-8")
+
+    result = subprocess.run([node, runner, DELTA_JS, fixtures], capture_output=True, check=True)
+    assert json.loads(result.stdout) == [apply_delta(base, diff(base, current)) for base, current in CASES]
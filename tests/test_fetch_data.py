@@ -0,0 +1,87 @@
+"""fetch_data.py: FMP API 키 없이 직전 assets.json만 있을 때 주식 공개, 암호화폐 페이지 이어받기/중복 제거, 수집 마감"""
+
+import json
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import deadline
+import fetch_data
+import last_known
+
+ASSETS_PATH = Path(__file__).parent.parent / "data" / "assets.json"
+PUBLISHED = "2020-01-31T04:48:23+00:00"  # 주식 MAX_AGE(7일)보다 훨씬 오래된 공개 시각
+
+
+def test_no_key_serves_seeded_stocks(tmp_path, monkeypatch):
+    data = json.loads(ASSETS_PATH.read_text(encoding="utf-8"))
+    stocks = [row for row in data["assets"] if row["type"] == "stock"]
+    seed_path = tmp_path / "assets.json"
+    seed_path.write_text(json.dumps({"lastUpdated": PUBLISHED, "assets": stocks}, ensure_ascii=False),
+                         encoding="utf-8")
+    monkeypatch.delenv("FMP_API_KEY", raising=False)
+
+    known = last_known.LastKnownGood(tmp_path / "last_known_good.json", seed_path=seed_path,
+                                     seed_row=fetch_data.seed_row)
+    breakers = deadline.CircuitBreakers(tmp_path / "circuit_breakers.json")
+    sources = fetch_data.create_sources(SimpleNamespace(crypto_limit=50), known, breakers, deadline.RunDeadline(10))
+    served = dict(sources)["stocks"]()
+
+    expected = {row["id"] for row in stocks if row["id"] in fetch_data.STOCK_SYMBOLS}
+    assert expected
+    assert {asset["id"] for asset in served} == expected
+    assert {asset["asOf"] for asset in served} == {last_known.to_iso(last_known.from_iso(PUBLISHED))}
+    assert not fetch_data.missing_sources([("stocks", None)], [served])
+
+
+class PageResponse:
+    def __init__(self, coins):
+        self.coins = coins
+        self.elapsed = timedelta(milliseconds=1)
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.coins
+
+
+def test_crypto_pages_drop_duplicates_and_stale_progress(tmp_path, monkeypatch):
+    coin_pages = {1: ["a", "b"], 2: ["b", "c"], 3: ["d"]}  # b가 수집 중 2페이지로 밀려남
+    requested = []
+
+    def get(url, params=None, **kwargs):
+        requested.append(params["page"])
+        return PageResponse([{"id": coin_id} for coin_id in coin_pages[params["page"]]])
+
+    monkeypatch.setattr(fetch_data, "CRYPTO_PAGE_SIZE", 2)
+    monkeypatch.setattr(fetch_data.http_client, "get", get)
+    progress_dir = tmp_path / "crypto_pages"
+
+    # 1페이지는 캐시 TTL보다 오래전에, 2페이지는 방금 받은 채 중단된 수집
+    now = time.time()
+    pages = {1: [{"id": "x"}, {"id": "y"}], 2: [{"id": "b"}, {"id": "c"}]}
+    fetched_at = {1: now - fetch_data.PAGE_PROGRESS_MAX_AGE - 1, 2: now}
+    for page in pages:
+        fetch_data._save_page_progress(progress_dir, "5:2", fetched_at, pages, page)
+
+    coins = fetch_data.fetch_crypto_pages(5, progress_dir=progress_dir)
+
+    assert requested == [1, 3]
+    assert [coin["id"] for coin in coins] == ["a", "b", "c", "d"]
+    assert not progress_dir.exists()
+
+
+def test_run_sources_does_not_wait_past_timeout():
+    release = threading.Event()
+    sources = [("crypto", lambda: release.wait() and []), ("metals", lambda: [])]
+    started = time.monotonic()
+    try:
+        results = fetch_data.run_sources(sources, timeout=0.2, fallback=lambda name: [f"{name} 마지막 정상 값"])
+    finally:
+        release.set()
+
+    assert time.monotonic() - started < 1
+    assert results == [["crypto 마지막 정상 값"], []]
@@ -0,0 +1,70 @@
+"""last_known.py: LastKnownGood.fetch가 빠진 자산을 마지막 정상 값으로 채우는 규칙"""
+
+import pytest
+
+import last_known
+from records import Asset
+
+NOW = 1_800_000_000
+DAY = 86400
+
+
+def coin(asset_id, price, asset_type="crypto"):
+    return Asset(id=asset_id, name=asset_id, symbol=asset_id.upper(), price=price, marketCap=price * 10,
+                 change24h=0.0, type=asset_type)
+
+
+@pytest.fixture
+def known(tmp_path):
+    """a, b, c를 NOW - 1일에 받아 둔 캐시"""
+    cache = last_known.LastKnownGood(tmp_path / "last_known_good.json")
+    observed = NOW - DAY
+    for asset_type in ("crypto", "stock"):
+        assets = [coin(f"{asset_type}-{name}", 1.0, asset_type) for name in "abc"]
+        cache.fetch(asset_type, lambda: assets, now=observed)
+        cache.record(assets, now=observed)
+    cache.save()
+    return last_known.LastKnownGood(tmp_path / "last_known_good.json")
+
+
+def ids(assets):
+    return [(asset["id"], asset.get("asOf")) for asset in assets]
+
+
+def test_fresh_source_skips_request(known):
+    fresh_for = last_known.POLICIES["crypto"][0]
+    known.sources["crypto"]["fetchedAt"] = NOW - fresh_for + 1
+
+    def fail():
+        raise AssertionError("FRESH_FOR 안에서는 요청하지 않음")
+
+    assert [asset["id"] for asset in known.fetch("crypto", fail, now=NOW)] == ["crypto-a", "crypto-b", "crypto-c"]
+
+
+def test_per_asset_fills_only_missing(known):
+    as_of = last_known.to_iso(NOW - DAY)
+    served = known.fetch("stock", lambda: [coin("stock-a", 2.0, "stock")], per_asset=True, now=NOW)
+    assert ids(served) == [("stock-a", None), ("stock-b", as_of), ("stock-c", as_of)]
+    assert known.sources["stock"]["fetchedAt"] == NOW - DAY  # 일부만 받았으면 완전 수집 시각은 그대로
+
+
+def test_whole_list_source_falls_back_only_when_empty(known):
+    live = known.fetch("crypto", lambda: [coin("crypto-a", 2.0)], now=NOW)
+    assert ids(live) == [("crypto-a", None)]
+    assert known.sources["crypto"] == {"fetchedAt": NOW, "signature": None, "ids": ["crypto-a"]}
+
+    known.sources["crypto"]["ids"] = ["crypto-a", "crypto-b"]
+    assert [asset["id"] for asset in known.fetch("crypto", lambda: [], now=NOW)] == ["crypto-a", "crypto-b"]
+
+
+def test_expired_values_are_dropped_unless_max_age_lifted(known):
+    later = NOW + last_known.POLICIES["stock"][1]
+    assert known.fetch("stock", lambda: [], per_asset=True, now=later) == []
+    served = known.fetch("stock", lambda: [], per_asset=True, now=later, max_age=float("inf"))
+    assert [asset["id"] for asset in served] == ["stock-a", "stock-b", "stock-c"]
+
+
+def test_fallback_serves_previous_list(known):
+    assert ids(known.fallback("crypto", now=NOW)) == [
+        (f"crypto-{name}", last_known.to_iso(NOW - DAY)) for name in "abc"
+    ]
@@ -0,0 +1,52 @@
+"""ranking.py: k-way 병합 순위가 전체 정렬 후 순위 매기기와 같은지"""
+
+import random
+
+import ranking
+
+
+def make_streams(seed):
+    """유형별 시가총액 내림차순 목록 (같은 시가총액 포함)"""
+    rng = random.Random(seed)
+    streams = []
+    for index, asset_type in enumerate(("metal", "crypto", "stock")):
+        caps = sorted((rng.choice([rng.randint(1, 1000), 500]) for _ in range(rng.randint(0, 80))), reverse=True)
+        streams.append([{"id": f"{asset_type}-{i}", "type": asset_type, "marketCap": cap} for i, cap in enumerate(caps)])
+    return streams
+
+
+def reference(streams, top_n, top_per_type):
+    """전체를 (시가총액 내림차순, 스트림 순서, 스트림 안 순서)로 정렬해 순위 매기기"""
+    rows = sorted(
+        ((asset, index, position) for index, stream in enumerate(streams) for position, asset in enumerate(stream)),
+        key=lambda row: (-row[0]["marketCap"], row[1], row[2]),
+    )
+    top, tail, type_counts = [], [], {}
+    for global_rank, (asset, _, _) in enumerate(rows, 1):
+        type_rank = type_counts[asset["type"]] = type_counts.get(asset["type"], 0) + 1
+        row = (asset["id"], global_rank, type_rank)
+        (top if global_rank <= top_n or type_rank <= top_per_type else tail).append(row)
+    return top, tail
+
+
+def ranked(assets):
+    return [(asset["id"], asset["marketCapRank"], asset["typeRank"]) for asset in assets]
+
+
+def test_rank_matches_full_sort():
+    for seed in range(30):
+        streams = make_streams(seed)
+        for top_n, top_per_type in ((1000, 250), (20, 5), (0, 0)):
+            expected = reference(streams, top_n, top_per_type)
+            top, tail = ranking.rank([[dict(asset) for asset in stream] for stream in streams], top_n, top_per_type)
+            assert (ranked(top), ranked(tail)) == expected
+
+            spilled = []
+            top, tail = ranking.rank([[dict(asset) for asset in stream] for stream in streams], top_n, top_per_type,
+                                     spill=spilled.append)
+            assert (ranked(top), ranked(spilled), tail) == (*expected, [])
+
+
+def test_presorted_sorts_unsorted_input():
+    assets = [{"marketCap": cap} for cap in (3, None, 5, 1)]
+    assert [asset["marketCap"] for asset in ranking.presorted(assets)] == [5, 3, 1, None]
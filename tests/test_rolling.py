@@ -0,0 +1,46 @@
+"""rolling.py: 기준점 갱신이 ts 인덱스로 범위 탐색하는지, 허용 오차가 스냅샷 간격에 맞는지"""
+
+import history
+import rolling
+
+DAY = rolling.DAY
+QUARTER_HOUR = 15 * 60
+
+
+def snapshot(conn, ts):
+    """가격을 시각(초)으로 기록 (기준점 가격으로 어느 시각의 포인트인지 확인)"""
+    assets = [{"id": "bitcoin", "price": float(ts), "marketCap": 1.0, "change24h": 0.0}]
+    history.append_snapshot(conn, assets, ts)
+    return assets
+
+
+def test_anchor_advance_uses_ts_index(tmp_path):
+    conn = history.connect(tmp_path / "history.sqlite")
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT asset_id, MAX(ts), price, rank FROM points WHERE ts > ? AND ts < ? GROUP BY asset_id",
+        (0, 1),
+    ))
+    assert "USING INDEX points_ts" in plan
+    assert "SCAN points" not in plan
+
+
+def test_change7d_window_matches_snapshot_interval(tmp_path):
+    conn = history.connect(tmp_path / "history.sqlite")
+    start = 1_700_000_000 // DAY * DAY
+    now = start + 8 * DAY
+    for ts in range(start, now, QUARTER_HOUR):
+        snapshot(conn, ts)
+    assets = snapshot(conn, now)
+
+    rolling.apply_windows(conn, assets, now, QUARTER_HOUR)
+    anchor_price = rolling.load_anchors(conn, "change7d", ["bitcoin"])[0][0]
+    assert 0 <= (now - 7 * DAY) - anchor_price < QUARTER_HOUR  # 6.75일이 아니라 7일 전 포인트
+
+    # 매일 실행이면 6시간 늦게 실행해도 7일 전 같은 시각대 실행이 기준점
+    daily = history.connect(tmp_path / "daily.sqlite")
+    for day in range(8):
+        snapshot(daily, start + day * DAY)
+    late = start + 8 * DAY + 5 * 3600
+    assets = snapshot(daily, late)
+    rolling.apply_windows(daily, assets, late)
+    assert rolling.load_anchors(daily, "change7d", ["bitcoin"])[0][0] == start + DAY
@@ -0,0 +1,65 @@
+"""generate_html.py --split: json_stream 백엔드(orjson / 표준 json)와 관계없이 같은 파일을 만드는지"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import generate_html
+import json_stream
+
+ASSETS_PATH = Path(__file__).parent.parent / "data" / "assets.json"
+
+
+def write_fixture(path):
+    """저장소의 assets.json + 지수 표기가 나오는 작은/큰 값과 차트가 있는 코인 (2페이지 이상)"""
+    data = json.loads(ASSETS_PATH.read_text(encoding="utf-8"))
+    for i in range(generate_html.PER_PAGE + 10):
+        data["assets"].append({
+            "id": f"tiny-{i}",
+            "name": f"작은 코인 {i}",
+            "symbol": f"T{i}",
+            "price": 7.14e-06 * (i + 1),
+            "marketCap": 1.2345e16 + i,
+            "change24h": 0.00001 * i,
+            "change7d": -2.5e-10,
+            "type": "crypto",
+            "country": "-",
+            "sparkline": [1e-05 * (1 + (j % 7)) for j in range(24)],
+        })
+    data["totalAssets"] = len(data["assets"])
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def build(tmp_path, monkeypatch, backend):
+    out_dir = tmp_path / backend
+    static_dir = out_dir / "static"
+    monkeypatch.setattr(json_stream, "orjson", pytest.importorskip("orjson") if backend == "orjson" else None)
+    monkeypatch.setattr(generate_html, "STATIC_DIR", static_dir)
+    monkeypatch.setattr(generate_html, "STATIC_INDEX", static_dir / "build.json")
+    monkeypatch.delenv("GITHUB_OUTPUT", raising=False)
+
+    data_path = tmp_path / "assets.json"
+    if not data_path.exists():
+        write_fixture(data_path)
+    out_dir.mkdir()
+    assert generate_html.generate_html(split=True, force=True, data_path=data_path,
+                                       output_path=out_dir / "index.html", logo_sprite=False)
+    return {path.relative_to(out_dir).as_posix(): path.read_bytes() for path in sorted(out_dir.rglob("*"))
+            if path.is_file()}
+
+
+def test_split_backends_identical(tmp_path, monkeypatch):
+    stdlib = build(tmp_path, monkeypatch, "json")
+    fast = build(tmp_path, monkeypatch, "orjson")
+
+    assert sorted(fast) == sorted(stdlib)
+    for name in stdlib:
+        assert fast[name] == stdlib[name], name
+
+    spark = [name for name in stdlib if name.startswith("static/spark.")]
+    assert len(spark) >= 2
+    data_name = next(name for name in stdlib if name.startswith("static/data."))
+    data = json.loads(stdlib[data_name])
+    assert sorted(data["spark"]) == [str(page) for page in range(1, len(spark) + 1)]
+    assert b"7.14e-06" in stdlib[data_name]